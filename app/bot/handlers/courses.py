@@ -12,8 +12,9 @@ from app.crud.course import (
 )
 from app.crud.user import get_or_create_user, get_user_by_telegram_id
 from app.db.database import get_db
+from app.services.youtube_service import parse_playlist_id
 from app.worker.celery_app import celery_app
-from app.worker.tasks import generate_course_task
+from app.worker.tasks import generate_course_task, generate_playlist_course_task
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -23,6 +24,8 @@ router = Router()
 class CourseCreation(StatesGroup):
     waiting_for_topic = State()
     waiting_for_difficulty = State()
+    waiting_for_playlist = State()
+    waiting_for_playlist_order = State()
 
 
 # ==================== СОЗДАНИЕ КУРСА ====================
@@ -42,7 +45,12 @@ async def start_course_creation(
 
     keyboard = types.InlineKeyboardMarkup(
         inline_keyboard=[
-            [types.InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_main")]
+            [
+                types.InlineKeyboardButton(
+                    text="📃 Из плейлиста YouTube", callback_data="create_from_playlist"
+                )
+            ],
+            [types.InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_main")],
         ]
     )
 
@@ -204,6 +212,149 @@ async def process_difficulty(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
+# ==================== КУРС ИЗ ПЛЕЙЛИСТА ====================
+
+
+@router.callback_query(F.data == "create_from_playlist")
+@router.message(Command("playlist"))
+async def start_playlist_course(
+    callback_or_message: types.CallbackQuery | types.Message, state: FSMContext
+):
+    """Начать создание курса из плейлиста"""
+    if isinstance(callback_or_message, types.CallbackQuery):
+        message = callback_or_message.message
+        await callback_or_message.answer()
+    else:
+        message = callback_or_message
+
+    keyboard = types.InlineKeyboardMarkup(
+        inline_keyboard=[
+            [types.InlineKeyboardButton(text="⬅️ Назад", callback_data="create_course")]
+        ]
+    )
+
+    await message.answer(
+        "📃 <b>Курс из плейлиста YouTube</b>\n\n"
+        "Пришлите ссылку на плейлист, например:\n"
+        "<code>https://www.youtube.com/playlist?list=PL...</code>\n\n"
+        "Уроки пойдут в порядке автора плейлиста.",
+        reply_markup=keyboard,
+        parse_mode="HTML",
+    )
+    await state.set_state(CourseCreation.waiting_for_playlist)
+
+
+@router.message(CourseCreation.waiting_for_playlist)
+async def process_playlist(message: types.Message, state: FSMContext):
+    """Обработать ссылку на плейлист"""
+    playlist_id = parse_playlist_id(message.text or "")
+
+    if not playlist_id:
+        await message.answer(
+            "❌ Не похоже на ссылку на плейлист. "
+            "Нужна ссылка с параметром <code>list=</code>. Попробуйте еще раз:",
+            parse_mode="HTML",
+        )
+        return
+
+    await state.update_data(playlist_id=playlist_id)
+
+    keyboard = types.InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                types.InlineKeyboardButton(
+                    text="📃 Как у автора", callback_data="playlist_order_keep"
+                ),
+                types.InlineKeyboardButton(
+                    text="🧠 От простого к сложному",
+                    callback_data="playlist_order_smart",
+                ),
+            ],
+            [
+                types.InlineKeyboardButton(
+                    text="⬅️ Назад", callback_data="create_from_playlist"
+                )
+            ],
+        ]
+    )
+
+    await message.answer(
+        f"✅ <b>Плейлист:</b> <code>{playlist_id}</code>\n\n"
+        "📊 <b>В каком порядке расположить уроки?</b>",
+        reply_markup=keyboard,
+        parse_mode="HTML",
+    )
+    await state.set_state(CourseCreation.waiting_for_playlist_order)
+
+
+@router.callback_query(F.data.startswith("playlist_order_"))
+async def process_playlist_order(callback: types.CallbackQuery, state: FSMContext):
+    """Отправить создание курса из плейлиста в Celery"""
+    resort = callback.data == "playlist_order_smart"
+
+    data = await state.get_data()
+    playlist_id = data.get("playlist_id")
+    if not playlist_id:
+        await callback.answer("❌ Сначала пришлите ссылку на плейлист", show_alert=True)
+        return
+
+    db = next(get_db())
+    try:
+        user = get_or_create_user(
+            db,
+            {
+                "telegram_id": callback.from_user.id,
+                "username": callback.from_user.username,
+                "first_name": callback.from_user.first_name,
+                "last_name": callback.from_user.last_name,
+            },
+        )
+
+        result = generate_playlist_course_task.delay(
+            playlist=playlist_id, user_id=user.id, resort=resort
+        )
+        task_id = result.id
+
+        keyboard = types.InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    types.InlineKeyboardButton(
+                        text="🔄 Проверить статус",
+                        callback_data=f"check_status_{task_id}",
+                    )
+                ],
+                [
+                    types.InlineKeyboardButton(
+                        text="📚 Мои курсы", callback_data="my_courses"
+                    )
+                ],
+            ]
+        )
+
+        await callback.message.answer(
+            f"✅ <b>Задача отправлена!</b>\n\n"
+            f"📃 <b>Плейлист:</b> <code>{playlist_id}</code>\n"
+            f"📋 <b>ID задачи:</b> <code>{task_id[:12]}...</code>\n\n"
+            "Я пришлю уведомление когда курс будет готов.",
+            reply_markup=keyboard,
+            parse_mode="HTML",
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка отправки задачи в Celery: {e}")
+        await callback.message.answer(
+            f"❌ <b>Ошибка при создании курса:</b>\n"
+            f"{str(e)[:200]}\n\n"
+            "Попробуйте позже или обратитесь к администратору.",
+            parse_mode="HTML",
+        )
+    finally:
+        db.close()
+
+    await state.clear()
+    await callback.answer()
+
+
 # ==================== ПРОВЕРКА СТАТУСА ====================
 
 
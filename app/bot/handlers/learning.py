@@ -4,6 +4,7 @@ from app.crud.course import (
     enroll_user_to_course,
     get_course_by_id,
     get_user_progress_for_course,
+    mark_course_opened,
     update_course_progress,
 )
 from app.crud.user import get_user_by_telegram_id, mark_lesson_completed
@@ -29,6 +30,7 @@ async def start_learning(callback: types.CallbackQuery):
 
         # Записываем пользователя на курс если еще не записан
         enroll_user_to_course(db, user.id, course_id)
+        mark_course_opened(db, user.id, course_id)
 
         # Получаем первый урок
         if course.modules and course.modules[0].lessons:
@@ -100,6 +102,7 @@ async def complete_lesson_handler(callback: types.CallbackQuery):
         # Обновляем прогресс курса
         course_id = lesson.module.course_id
         user_course = update_course_progress(db, user.id, course_id)
+        mark_course_opened(db, user.id, course_id)
 
         # Получаем курс для информации
         course = get_course_by_id(db, course_id)
@@ -66,6 +66,7 @@ async def cmd_help(message: types.Message):
 /help - Показать это сообщение
 /courses - Мои курсы
 /newcourse - Создать новый курс
+/playlist - Курс из плейлиста YouTube
 /profile - Мой профиль
 /stats - Статистика обучения
 
@@ -14,6 +14,65 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     PROJECT_NAME: str = "Learning Bot"
 
+    # Кэш ответов YouTube API (таблица в основной БД)
+    YOUTUBE_CACHE_ENABLED: bool = True
+    YOUTUBE_SEARCH_CACHE_TTL: int = 6 * 60 * 60  # секунды
+    YOUTUBE_VIDEO_CACHE_TTL: int = 24 * 60 * 60  # секунды
+    YOUTUBE_CACHE_MAX_ENTRIES: int = 10000  # на каждый вид записей
+
+    # Асинхронный HTTP клиент YouTube (aiohttp) вместо googleapiclient
+    YOUTUBE_ASYNC_CLIENT: bool = False
+    YOUTUBE_API_BASE_URL: str = "https://www.googleapis.com/youtube/v3"
+    YOUTUBE_MAX_CONCURRENCY: int = 8  # одновременных запросов к API
+    YOUTUBE_HTTP_TIMEOUT: int = 15  # секунды
+
+    # Квота YouTube Data API (единицы)
+    YOUTUBE_QUOTA_ENABLED: bool = True
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    YOUTUBE_MINUTE_QUOTA: int = 1800
+    YOUTUBE_QUOTA_MAX_WAIT: int = 30  # секунды ожидания поминутной квоты
+
+    # Склейка одинаковых запросов к YouTube между воркерами через Redis
+    YOUTUBE_SINGLEFLIGHT_REDIS: bool = True
+
+    # Каталог видео: сколько секунд детали считаются свежими
+    VIDEO_CATALOG_TTL: int = 24 * 60 * 60
+
+    # Фоновое обновление статистики видео из активных курсов
+    STATS_REFRESH_INTERVAL: int = 60 * 60
+    STATS_REFRESH_MAX_VIDEOS: int = 5000  # за один проход
+    STATS_REFRESH_QUOTA_RESERVE: int = 3000  # единиц квоты, оставляемых генерации
+
+    # Репутация каналов (channels.list) - данные живут неделю
+    CHANNEL_REPUTATION_ENABLED: bool = True
+    CHANNEL_CACHE_TTL: int = 7 * 24 * 60 * 60
+
+    # Генерация курса
+    COURSE_MAX_LESSONS: int = 15
+    COURSE_MAX_CANDIDATES: int = 100  # сколько видео максимум читать из поиска
+    COURSE_SEARCH_PAGE_SIZE: int = 50  # полная страница search.list
+    COURSE_SEARCH_MODE: str = "single"  # single / fanout
+    MODULE_GROUPING: str = "fixed"  # fixed - по 5 подряд / clusters - по похожести
+    DIFFICULTY_MODEL_PATH: Optional[str] = None  # каталог модели, None - правила
+    DEDUPE_ENABLED: bool = True  # склеивать перезаливы и копии одного видео
+    DEDUPE_MIN_SIMILARITY: float = 0.7  # похожесть заголовков, с которой видео - копии
+
+    # Курсы из плейлистов
+    PLAYLIST_MAX_VIDEOS: int = 200
+    PLAYLIST_RESORT: bool = False  # по умолчанию сохраняем порядок автора
+
+    # Субтитры видео (для оценки сложности по тексту)
+    TRANSCRIPTS_ENABLED: bool = True
+    TRANSCRIPTS_DIR: str = "./data/transcripts"
+    TRANSCRIPT_LANGUAGES: str = "ru,en"  # в порядке предпочтения
+    TRANSCRIPT_MAX_WORKERS: int = 8
+    TRANSCRIPT_TIMEOUT: float = 5  # секунд на один HTTP запрос
+    TRANSCRIPT_BUDGET: float = 10  # секунд на весь этап при генерации курса
+
+    # Стоп-слова: встроенный список, NLTK (если данные уже скачаны) - дополнительно
+    NLTK_STOPWORDS: bool = False
+    TEXT_ANALYSIS_CACHE_SIZE: int = 50000  # записей анализа заголовков, 0 - выключен
+
     # Новое поле для админов
     ADMIN_USER_IDS: Optional[str] = None  # Или List[int] = []
 
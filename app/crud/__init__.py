@@ -1,3 +1,8 @@
+from .channel import (
+    get_channels_by_youtube_ids,
+    update_channel_completion,
+    upsert_channels,
+)
 from .course import (
     create_course,
     enroll_user_to_course,
@@ -7,6 +12,7 @@ from .course import (
     get_popular_courses,
     get_user_courses,
     get_user_progress_for_course,
+    mark_course_opened,
     search_courses,
 )
 from .user import (
@@ -18,6 +24,13 @@ from .user import (
     mark_lesson_completed,
     update_watch_time,
 )
+from .video import (
+    get_fresh_video_details,
+    get_video_fingerprints,
+    get_videos_by_youtube_ids,
+    get_videos_to_refresh,
+    upsert_videos,
+)
 
 __all__ = [
     # User
@@ -38,4 +51,15 @@ __all__ = [
     "get_user_courses",
     "get_course_statistics",
     "get_user_progress_for_course",
+    "mark_course_opened",
+    # Video
+    "get_videos_by_youtube_ids",
+    "get_fresh_video_details",
+    "get_video_fingerprints",
+    "get_videos_to_refresh",
+    "upsert_videos",
+    # Channel
+    "get_channels_by_youtube_ids",
+    "upsert_channels",
+    "update_channel_completion",
 ]
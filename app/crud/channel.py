@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.db.models import Channel, Lesson, UserProgress, Video
+
+# Поля статистики канала из channels.list
+CHANNEL_FIELDS = ("title", "subscriber_count", "video_count", "view_count")
+
+
+def get_channels_by_youtube_ids(
+    db: Session, youtube_ids: List[str]
+) -> Dict[str, Channel]:
+    """Получить каналы по их YouTube ID"""
+    if not youtube_ids:
+        return {}
+    channels = db.query(Channel).filter(Channel.youtube_id.in_(list(youtube_ids))).all()
+    return {channel.youtube_id: channel for channel in channels}
+
+
+def upsert_channels(
+    db: Session, details: Dict[str, Optional[Dict]]
+) -> Dict[str, Channel]:
+    """Добавить или обновить статистику каналов (без commit).
+
+    None вместо статистики - канал недоступен: запись (с нулевой статистикой
+    для нового канала) только получает fetched_at, чтобы его не запрашивали
+    заново до конца TTL.
+    """
+    channels = get_channels_by_youtube_ids(db, list(details))
+    now = datetime.now()
+
+    for youtube_id, values in details.items():
+        channel = channels.get(youtube_id)
+        if channel is None:
+            channel = Channel(
+                youtube_id=youtube_id, lessons_started=0, lessons_completed=0
+            )
+            db.add(channel)
+            channels[youtube_id] = channel
+
+        for field in CHANNEL_FIELDS:
+            if values and values.get(field) is not None:
+                setattr(channel, field, values[field])
+        channel.fetched_at = now
+
+    db.flush()
+    return channels
+
+
+def update_channel_completion(db: Session) -> Dict[str, Channel]:
+    """Пересчитать, сколько уроков каждого канала начали и завершили наши пользователи"""
+    rows = (
+        db.query(
+            Video.channel_id,
+            func.count(UserProgress.id),
+            func.sum(case((UserProgress.completed.is_(True), 1), else_=0)),
+        )
+        .join(Lesson, Lesson.id == UserProgress.lesson_id)
+        .join(Video, Video.id == Lesson.video_id)
+        .filter(Video.channel_id.isnot(None))
+        .group_by(Video.channel_id)
+        .all()
+    )
+
+    channels = get_channels_by_youtube_ids(db, [row[0] for row in rows])
+    for channel_id, started, completed in rows:
+        channel = channels.get(channel_id)
+        if channel is not None:
+            channel.lessons_started = started
+            channel.lessons_completed = completed or 0
+
+    db.flush()
+    return channels
@@ -108,6 +108,14 @@ def enroll_user_to_course(db: Session, user_id: int, course_id: int) -> UserCour
     return user_course
 
 
+def mark_course_opened(db: Session, user_id: int, course_id: int):
+    """Запомнить, что пользователь открыл курс (для приоритета обновления статистики)"""
+    db.query(UserCourse).filter(
+        UserCourse.user_id == user_id, UserCourse.course_id == course_id
+    ).update({UserCourse.last_opened_at: datetime.now()}, synchronize_session=False)
+    db.commit()
+
+
 def get_user_courses(db: Session, user_id: int) -> List[Tuple[Course, UserCourse]]:
     """Получить курсы пользователя с информацией о прогрессе"""
     user_courses = (
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from typing import AbstractSet, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.db.models import Lesson, Module, UserCourse, Video
+
+# Поля словаря видео, которые хранятся в каталоге
+CATALOG_FIELDS = (
+    "title",
+    "description",
+    "channel",
+    "channel_id",
+    "thumbnail",
+    "published_at",
+    "duration",
+    "view_count",
+    "like_count",
+    "fingerprint",
+)
+
+
+def get_videos_by_youtube_ids(db: Session, youtube_ids: List[str]) -> Dict[str, Video]:
+    """Получить видео каталога по их YouTube ID"""
+    if not youtube_ids:
+        return {}
+    videos = db.query(Video).filter(Video.youtube_id.in_(list(youtube_ids))).all()
+    return {video.youtube_id: video for video in videos}
+
+
+def get_video_fingerprints(db: Session, titles: Dict[str, str]) -> Dict[str, str]:
+    """Сохраненные отпечатки видео каталога по словарю {YouTube ID: заголовок}.
+
+    Отпечаток считается по заголовку, поэтому для видео, у которого заголовок
+    в каталоге другой, он не отдается.
+    """
+    if not titles:
+        return {}
+    rows = (
+        db.query(Video.youtube_id, Video.title, Video.fingerprint)
+        .filter(Video.youtube_id.in_(list(titles)), Video.fingerprint.isnot(None))
+        .all()
+    )
+    return {
+        youtube_id: fingerprint
+        for youtube_id, title, fingerprint in rows
+        if title == titles[youtube_id]
+    }
+
+
+def get_fresh_video_details(
+    db: Session, youtube_ids: List[str], max_age_seconds: int
+) -> Dict[str, Dict]:
+    """Детали (длительность, просмотры, лайки) видео, которые каталог знает недавно"""
+    fresh_after = datetime.now() - timedelta(seconds=max_age_seconds)
+    return {
+        youtube_id: {
+            "duration": video.duration,
+            "view_count": video.view_count,
+            "like_count": video.like_count,
+        }
+        for youtube_id, video in get_videos_by_youtube_ids(db, youtube_ids).items()
+        if video.fetched_at
+        and video.fetched_at >= fresh_after
+        and video.duration is not None
+    }
+
+
+def upsert_videos(
+    db: Session,
+    videos: List[Dict],
+    fetched: bool = False,
+    fetched_ids: Optional[AbstractSet[str]] = None,
+) -> Dict[str, Video]:
+    """Добавить или обновить видео в каталоге (без commit).
+
+    fetched=True - детали всех видео только что получены из videos.list,
+    fetched_ids - то же для отдельных видео; у них fetched_at - текущее время.
+    Детали из каталога или кэша YouTube могут быть старыми, поэтому возраст
+    существующих записей не меняется, а новые записи остаются без fetched_at.
+    """
+    catalog = get_videos_by_youtube_ids(db, [v["id"] for v in videos if v.get("id")])
+    now = datetime.now()
+
+    for video_data in videos:
+        youtube_id = video_data.get("id")
+        if not youtube_id:
+            continue
+
+        fresh = "view_count" in video_data and (
+            fetched or (fetched_ids is not None and youtube_id in fetched_ids)
+        )
+        video = catalog.get(youtube_id)
+        if video is None:
+            # Без свежих деталей - None, а не значение колонки по умолчанию
+            video = Video(youtube_id=youtube_id, fetched_at=now if fresh else None)
+            db.add(video)
+            catalog[youtube_id] = video
+
+        for field in CATALOG_FIELDS:
+            if video_data.get(field) is not None:
+                setattr(video, field, video_data[field])
+        if fresh:
+            video.fetched_at = now
+
+    db.flush()
+    return catalog
+
+
+def mark_videos_missing(db: Session, youtube_ids: List[str]) -> None:
+    """Отметить проверенными видео, которых нет в ответе videos.list (без commit).
+
+    Удаленные и закрытые видео сохраняют последние известные значения, но
+    получают новый fetched_at: иначе обновление запрашивало бы их каждый проход.
+    """
+    if not youtube_ids:
+        return
+    db.query(Video).filter(Video.youtube_id.in_(list(youtube_ids))).update(
+        {Video.fetched_at: datetime.now()}, synchronize_session=False
+    )
+    db.flush()
+
+
+def get_videos_to_refresh(
+    db: Session, max_age_seconds: int, limit: Optional[int] = None
+) -> List[Video]:
+    """Устаревшие видео из активных (незавершенных) курсов.
+
+    Сначала видео курсов, которые открывали последними, затем самые старые данные.
+    """
+    stale_before = datetime.now() - timedelta(seconds=max_age_seconds)
+    last_opened = func.max(UserCourse.last_opened_at)
+    query = (
+        db.query(Video)
+        .join(Lesson, Lesson.video_id == Video.id)
+        .join(Module, Module.id == Lesson.module_id)
+        .join(UserCourse, UserCourse.course_id == Module.course_id)
+        .filter(
+            UserCourse.completed.is_(False),
+            or_(Video.fetched_at.is_(None), Video.fetched_at < stale_before),
+        )
+        .group_by(Video.id)
+        .order_by(last_opened.is_(None), last_opened.desc(), Video.fetched_at)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -24,9 +24,33 @@ def init_db():
     print("🗄️ Создание таблиц базы данных...")
 
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     print("✅ Таблицы созданы")
 
 
+def add_missing_columns(bind=None):
+    """Добавить в существующие таблицы новые nullable-колонки.
+
+    create_all создает только отсутствующие таблицы, а миграций в проекте нет.
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+
+
 def get_db():
     """Получить сессию базы данных (для зависимостей)"""
     db = SessionLocal()
@@ -76,8 +76,48 @@ class Lesson(Base):
     description = Column(Text)
     duration_minutes = Column(Integer)
     estimated_difficulty = Column(String)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=True, index=True)
 
     user_progress = relationship("UserProgress", backref="lesson")
+    video = relationship("Video", backref="lessons")
+
+
+class Video(Base):
+    """Общий каталог видео YouTube: одна строка на видео, уроки ссылаются на нее"""
+
+    __tablename__ = "videos"
+
+    id = Column(Integer, primary_key=True, index=True)
+    youtube_id = Column(String, unique=True, index=True)
+    title = Column(String)
+    description = Column(Text)
+    channel = Column(String)
+    channel_id = Column(String, nullable=True, index=True)
+    thumbnail = Column(String)
+    published_at = Column(String, nullable=True)
+    duration = Column(Integer)
+    view_count = Column(Integer, default=0)
+    like_count = Column(Integer, default=0)
+    # Отпечаток заголовка (MinHash, hex) для поиска перезаливов
+    fingerprint = Column(String, nullable=True)
+    fetched_at = Column(DateTime, default=datetime.now)
+
+
+class Channel(Base):
+    """Репутация канала: статистика YouTube и доходимость уроков у наших пользователей"""
+
+    __tablename__ = "channels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    youtube_id = Column(String, unique=True, index=True)
+    title = Column(String)
+    subscriber_count = Column(Integer, default=0)
+    video_count = Column(Integer, default=0)
+    view_count = Column(Integer, default=0)
+    lessons_started = Column(Integer, default=0)
+    lessons_completed = Column(Integer, default=0)
+    score = Column(Float, default=0.0)
+    fetched_at = Column(DateTime, default=datetime.now)
 
 
 class UserCourse(Base):
@@ -89,6 +129,7 @@ class UserCourse(Base):
     enrolled_at = Column(DateTime, default=datetime.now)
     completed = Column(Boolean, default=False)
     completion_percentage = Column(Float, default=0.0)
+    last_opened_at = Column(DateTime, nullable=True, index=True)
 
 
 class UserProgress(Base):
@@ -116,3 +157,34 @@ class UserNotification(Base):
     # Связи
     user = relationship("User", backref="notifications")
     course = relationship("Course", backref="notifications")
+
+
+class YouTubeCacheEntry(Base):
+    __tablename__ = "youtube_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, index=True)
+    kind = Column(String, index=True)  # search / video
+    value = Column(JSON)
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, index=True)
+    last_accessed_at = Column(DateTime, default=datetime.now, index=True)
+
+
+class YouTubeCacheStat(Base):
+    __tablename__ = "youtube_cache_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, unique=True, index=True)
+    hits = Column(Integer, default=0)
+    misses = Column(Integer, default=0)
+
+
+class YouTubeQuotaUsage(Base):
+    __tablename__ = "youtube_quota_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(String, unique=True, index=True)  # по тихоокеанскому времени
+    units_used = Column(Integer, default=0)
+    requests = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
@@ -32,3 +32,19 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/stats/youtube-cache")
+async def youtube_cache_stats():
+    """Попадания и промахи кэша YouTube API"""
+    from app.services.youtube_cache import YouTubeCache
+
+    return YouTubeCache().get_stats()
+
+
+@app.get("/stats/text-analysis")
+async def text_analysis_stats():
+    """Попадания и промахи кэша анализа заголовков"""
+    from app.services.text_analyzer import get_analysis_memo
+
+    return get_analysis_memo().get_stats()
@@ -0,0 +1,94 @@
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.channel import (
+    get_channels_by_youtube_ids,
+    update_channel_completion,
+    upsert_channels,
+)
+from app.db.models import Channel
+from app.services.quota import QuotaExceededError
+from app.services.youtube_service import YouTubeService
+
+logger = logging.getLogger(__name__)
+
+# Пока у канала мало своих данных, считаем доходимость средней
+PRIOR_COMPLETION = 0.5
+PRIOR_LESSONS = 10
+
+
+def channel_score(channel: Channel) -> float:
+    """Репутация канала от 0 до 1: аудитория, объем канала и доходимость уроков"""
+    audience = min(1.0, math.log10((channel.subscriber_count or 0) + 1) / 7)
+    catalog = min(1.0, math.log10((channel.video_count or 0) + 1) / 3)
+    completion = (
+        (channel.lessons_completed or 0) + PRIOR_COMPLETION * PRIOR_LESSONS
+    ) / ((channel.lessons_started or 0) + PRIOR_LESSONS)
+    return round(0.5 * audience + 0.2 * catalog + 0.3 * completion, 4)
+
+
+class ChannelReputation:
+    """Таблица репутации каналов с редким обновлением через channels.list.
+
+    Оценка считается заранее и хранится в таблице, поэтому при генерации
+    курса почти всегда обходится одним запросом к БД.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        youtube: Optional[YouTubeService] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.db = db
+        self.youtube = youtube or YouTubeService()
+        self.ttl = ttl or settings.CHANNEL_CACHE_TTL
+
+    def scores(self, channel_ids: List[str]) -> Dict[str, float]:
+        """Оценки каналов; неизвестные и устаревшие сначала догружаются из API"""
+        channel_ids = [
+            channel_id for channel_id in dict.fromkeys(channel_ids) if channel_id
+        ]
+        channels = get_channels_by_youtube_ids(self.db, channel_ids)
+
+        stale_before = datetime.now() - timedelta(seconds=self.ttl)
+        stale = [
+            channel_id
+            for channel_id in channel_ids
+            if channel_id not in channels
+            or channels[channel_id].fetched_at is None
+            or channels[channel_id].fetched_at < stale_before
+        ]
+        if stale:
+            channels.update(self._fetch(stale))
+
+        return {channel_id: channel.score for channel_id, channel in channels.items()}
+
+    def refresh_completion(self) -> int:
+        """Пересчитывает доходимость и оценки по прогрессу пользователей"""
+        channels = update_channel_completion(self.db)
+        for channel in channels.values():
+            channel.score = channel_score(channel)
+        self.db.commit()
+        return len(channels)
+
+    def _fetch(self, channel_ids: List[str]) -> Dict[str, Channel]:
+        try:
+            details = self.youtube.fetch_channels(channel_ids)
+        except QuotaExceededError as e:
+            # Репутация - дополнительный сигнал, без нее курс все равно строится
+            logger.warning(f"Channel reputation skipped: {e}")
+            return {}
+        if not details:
+            return {}
+
+        channels = upsert_channels(self.db, details)
+        for channel in channels.values():
+            channel.score = channel_score(channel)
+        self.db.commit()
+        return channels
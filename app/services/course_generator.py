@@ -1,32 +1,113 @@
+import time
 from datetime import datetime
-from typing import Dict, List
+from itertools import islice
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.crud.video import (
+    get_fresh_video_details,
+    get_video_fingerprints,
+    upsert_videos,
+)
 from app.db.models import Course, Lesson, Module
-from app.services.youtube_service import YouTubeService
+from app.services.channel_reputation import ChannelReputation
+from app.services.dedupe import (
+    collapse_duplicates,
+    fingerprint_similarity,
+    video_fingerprint,
+)
+from app.services.transcripts import TranscriptFetcher, get_transcript_fetcher
+from app.services.youtube_service import YouTubeService, parse_playlist_id
 
 from .smart_sorter import SmartVideoSorter
 
 
 class CourseGenerator:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        youtube: Optional[YouTubeService] = None,
+        transcripts: Optional[TranscriptFetcher] = None,
+        reputation: Optional[ChannelReputation] = None,
+    ):
         self.db = db
-        self.youtube = YouTubeService()
+        self.youtube = youtube or YouTubeService()
+        if transcripts is None and settings.TRANSCRIPTS_ENABLED:
+            transcripts = get_transcript_fetcher()
+        self.transcripts = transcripts
+        if reputation is None and settings.CHANNEL_REPUTATION_ENABLED:
+            reputation = ChannelReputation(db, self.youtube)
+        self.reputation = reputation
         self.sorter = SmartVideoSorter()
+        # ID видео, детали которых в этой генерации пришли из videos.list
+        self._fetched_ids = set()
 
     def generate_course(
-        self, topic: str, difficulty: str, user_id: int = None
+        self,
+        topic: str,
+        difficulty: str,
+        user_id: int = None,
+        search_mode: Optional[str] = None,
     ) -> Course:
-        """Генерация курса с умной сортировкой"""
+        """Генерация курса с умной сортировкой
+
+        search_mode: "single" - один запрос с постраничным чтением,
+        "fanout" - несколько узких запросов параллельно (по умолчанию из настроек).
+        """
+        search_mode = search_mode or settings.COURSE_SEARCH_MODE
+        self._fetched_ids = set()
 
-        # 1. Поиск видео
-        query = self._build_search_query(topic, difficulty)
-        videos = self.youtube.search_videos(query, max_results=15)
+        page_size = settings.COURSE_SEARCH_PAGE_SIZE
+        if search_mode == "fanout":
+            queries = self._build_search_queries(topic)
+
+            # 0. Не начинаем, если квоты YouTube API заведомо не хватит
+            self.youtube.ensure_quota(
+                self.youtube.estimate_search_cost(page_size) * len(queries)
+            )
+
+            # 1. Поиск видео: узкие запросы параллельно, один общий набор кандидатов
+            videos = self.youtube.search_many(
+                queries,
+                max_results=page_size,
+                known_details=self._catalog_details,
+                on_fetched=self._fetched_ids.update,
+            )
+        else:
+            # Худший случай: постраничный поиск дочитает до COURSE_MAX_CANDIDATES
+            self.youtube.ensure_quota(
+                self.youtube.estimate_search_cost(
+                    settings.COURSE_MAX_CANDIDATES, page_size=page_size
+                )
+            )
+
+            # 1. Поиск видео: читаем страницы, пока не наберем кандидатов нужного уровня
+            query = self._build_search_query(topic, difficulty)
+            videos = self._collect_candidates(query, topic, difficulty)
 
         if not videos:
             raise ValueError(f"Не найдено видео по теме: {topic}")
 
+        # Перезаливы одного видео не должны стать разными уроками
+        videos = self._collapse_duplicates(videos)
+
+        # Репутацию каналов и субтитры получают только прошедшие дешевый отбор.
+        # Субтитры уточняют сложность еще до выбора уроков, общий бюджет
+        # времени делится между всеми порциями кандидатов
+        deadline = time.monotonic() + (
+            self.transcripts.budget if self.transcripts else 0
+        )
+
+        def prepare(candidates: List[Dict]):
+            self._attach_channel_scores(candidates)
+            self._attach_readability(candidates, deadline)
+
+        videos = self.sorter.select_top(
+            videos, topic, difficulty, settings.COURSE_MAX_LESSONS, prepare=prepare
+        )
+
         # 2. Умная сортировка
         sorted_videos = self.sorter.sort_videos(videos, topic, difficulty)
 
@@ -40,6 +121,187 @@ class CourseGenerator:
 
         return course
 
+    def generate_course_from_playlist(
+        self,
+        playlist: str,
+        difficulty: str = "beginner",
+        user_id: int = None,
+        resort: Optional[bool] = None,
+    ) -> Course:
+        """Курс из плейлиста YouTube (ссылка или ID).
+
+        По умолчанию сохраняется порядок автора плейлиста, resort=True
+        пересортирует уроки SmartVideoSorter от простого к сложному.
+        """
+        playlist_id = parse_playlist_id(playlist)
+        if not playlist_id:
+            raise ValueError(f"Не удалось распознать плейлист: {playlist}")
+        if resort is None:
+            resort = settings.PLAYLIST_RESORT
+
+        max_videos = settings.PLAYLIST_MAX_VIDEOS
+        self._fetched_ids = set()
+        self.youtube.ensure_quota(self.youtube.estimate_playlist_cost(max_videos))
+
+        # 1. Видео плейлиста: 1 единица квоты за страницу из 50 элементов
+        videos = self.youtube.get_playlist_videos(
+            playlist_id,
+            max_results=max_videos,
+            known_details=self._catalog_details,
+            on_fetched=self._fetched_ids.update,
+        )
+        if not videos:
+            raise ValueError(f"В плейлисте нет доступных видео: {playlist_id}")
+
+        info = self.youtube.get_playlist_info(playlist_id) or {}
+        topic = info.get("title") or playlist_id
+
+        self._attach_channel_scores(videos)
+        self._attach_readability(videos)
+
+        # 2. Авторский порядок или умная сортировка
+        if resort:
+            sorted_videos = self.sorter.sort_videos(videos, topic, difficulty)
+        else:
+            sorted_videos = self.sorter.annotate_videos(videos, topic)
+
+        # 3. Группировка в модули и структура курса
+        modules_videos = self.sorter.group_into_modules(sorted_videos, module_size=5)
+        return self._create_course_structure(
+            topic,
+            difficulty,
+            modules_videos,
+            user_id,
+            sorting_method="smart" if resort else "playlist",
+        )
+
+    def _collect_candidates(
+        self, query: str, topic: str, difficulty: str
+    ) -> List[Dict]:
+        """Собирает кандидатов из постраничного поиска с ранней остановкой"""
+        stream = iter(
+            self.youtube.iter_search_videos(
+                query,
+                max_results=settings.COURSE_MAX_CANDIDATES,
+                page_size=settings.COURSE_SEARCH_PAGE_SIZE,
+                known_details=self._catalog_details,
+                on_fetched=self._fetched_ids.update,
+            )
+        )
+        # Модель оценивает страницу одним вызовом, правилам хватает по одному видео:
+        # так поиск не дочитывается дальше нужного
+        batch_size = 1
+        if self.sorter.difficulty_model is not None:
+            batch_size = settings.COURSE_SEARCH_PAGE_SIZE
+
+        candidates = []
+        # Отпечатки засчитанных видео: копии одного видео потом схлопнутся,
+        # поэтому до остановки считаются как одно
+        matching = []
+        while True:
+            batch = list(islice(stream, batch_size))
+            if not batch:
+                return candidates
+            levels = self.sorter.estimate_difficulties(batch, topic)
+            if settings.DEDUPE_ENABLED:
+                self._attach_fingerprints(
+                    [
+                        video
+                        for video, level in zip(batch, levels)
+                        if level == difficulty
+                    ]
+                )
+            for video, level in zip(batch, levels):
+                candidates.append(video)
+                if level == difficulty and not self._is_counted_copy(video, matching):
+                    matching.append(video.get("fingerprint"))
+                    if len(matching) >= settings.COURSE_MAX_LESSONS:
+                        return candidates
+
+    def _is_counted_copy(self, video: Dict, fingerprints: List[Optional[str]]) -> bool:
+        """Почти такое же видео уже засчитано среди кандидатов"""
+        fingerprint = video.get("fingerprint")
+        if not settings.DEDUPE_ENABLED or not fingerprint:
+            return False
+        return any(
+            counted
+            and fingerprint_similarity(fingerprint, counted)
+            >= settings.DEDUPE_MIN_SIMILARITY
+            for counted in fingerprints
+        )
+
+    def _collapse_duplicates(self, videos: List[Dict]) -> List[Dict]:
+        """Оставляет лучшую копию из почти одинаковых видео.
+
+        Отпечатки берутся из каталога, новые считаются и сохраняются туда же,
+        чтобы в следующих генерациях проверка стоила одного запроса к БД.
+        """
+        if not settings.DEDUPE_ENABLED:
+            return videos
+
+        self._attach_fingerprints(videos)
+        return collapse_duplicates(videos, settings.DEDUPE_MIN_SIMILARITY)
+
+    def _attach_fingerprints(self, videos: List[Dict]):
+        """Отпечатки заголовков: из каталога, если заголовок не менялся, иначе новые.
+
+        Видео, у которых отпечаток уже есть, пропускаются.
+        """
+        pending = [video for video in videos if not video.get("fingerprint")]
+        if not pending:
+            return
+
+        known = get_video_fingerprints(
+            self.db,
+            {video["id"]: video.get("title") for video in pending if video.get("id")},
+        )
+        computed = []
+        for video in pending:
+            fingerprint = known.get(video.get("id"))
+            if fingerprint is None:
+                fingerprint = video_fingerprint(video, self.sorter.analyzer)
+                if fingerprint and video.get("id"):
+                    computed.append(video)
+            video["fingerprint"] = fingerprint
+        if computed:
+            upsert_videos(self.db, computed, fetched_ids=self._fetched_ids)
+
+    def _attach_channel_scores(self, videos: List[Dict]):
+        """Репутация канала как готовый признак для сортировщика"""
+        if self.reputation is None:
+            return
+
+        scores = self.reputation.scores([video.get("channel_id") for video in videos])
+        for video in videos:
+            if video.get("channel_id") in scores:
+                video["channel_score"] = scores[video["channel_id"]]
+
+    def _attach_readability(self, videos: List[Dict], deadline: Optional[float] = None):
+        """Оценка простоты текста по субтитрам (в пределах бюджета времени).
+
+        deadline - момент time.monotonic(), после которого субтитры берутся
+        только с диска; без него на вызов отводится весь бюджет.
+        """
+        if self.transcripts is None:
+            return
+
+        budget = None if deadline is None else max(0.0, deadline - time.monotonic())
+        transcripts = self.transcripts.fetch_many(
+            [video["id"] for video in videos], budget=budget
+        )
+        for video in videos:
+            text = transcripts.get(video["id"])
+            if text:
+                # Текст нужен и модели сложности, и оценке простоты
+                video["transcript"] = text
+                video["readability"] = self.sorter.analyzer.calculate_readability_score(
+                    text
+                )
+
+    def _catalog_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Детали видео, которые уже есть в каталоге и еще не устарели"""
+        return get_fresh_video_details(self.db, video_ids, settings.VIDEO_CATALOG_TTL)
+
     def _build_search_query(self, topic: str, difficulty: str) -> str:
         """Формирует поисковый запрос"""
         difficulty_terms = {
@@ -51,6 +313,14 @@ class CourseGenerator:
         terms = difficulty_terms.get(difficulty, "")
         return f"{topic} {terms} обучение урок"
 
+    def _build_search_queries(self, topic: str) -> List[str]:
+        """Узкие запросы по уровням для параллельного поиска"""
+        return [
+            f"{topic} основы для начинающих",
+            f"{topic} практика примеры",
+            f"{topic} продвинутый уровень",
+        ]
+
     def _create_course_structure(
         self,
         topic: str,
@@ -58,6 +328,7 @@ class CourseGenerator:
         modules_videos: List[List[Dict]],
         user_id: int = None,
         # <-- добавить user_id
+        sorting_method: str = "smart",
     ) -> Course:
         """Создает структуру курса в БД"""
 
@@ -73,7 +344,7 @@ class CourseGenerator:
                 for module in modules_videos
             ),
             created_at=datetime.now(),
-            sorting_method="smart",
+            sorting_method=sorting_method,
             created_by=user_id,
             is_public=False if user_id else True,
         )
@@ -81,6 +352,13 @@ class CourseGenerator:
         self.db.add(course)
         self.db.flush()
 
+        # Метаданные видео храним один раз в каталоге, уроки на него ссылаются
+        catalog = upsert_videos(
+            self.db,
+            [video for module in modules_videos for video in module],
+            fetched_ids=self._fetched_ids,
+        )
+
         # Создаем модули и уроки
         for module_idx, module_videos in enumerate(modules_videos, 1):
             module_topic = module_videos[0].get("module_topic", f"Модуль {module_idx}")
@@ -99,19 +377,16 @@ class CourseGenerator:
             for lesson_idx, video in enumerate(module_videos, 1):
                 estimated_diff = video.get("estimated_difficulty", "intermediate")
 
+                catalog_video = catalog.get(video.get("id"))
+
                 lesson = Lesson(
                     module_id=module.id,
+                    video_id=catalog_video.id if catalog_video else None,
                     title=video["title"],
                     order_index=lesson_idx,
                     content_type="video",
                     content_url=video["url"],
-                    content_data={
-                        "duration": video.get("duration"),
-                        "views": video.get("view_count"),
-                        "channel": video.get("channel"),
-                        "thumbnail": video.get("thumbnail"),
-                        "youtube_id": video.get("id"),
-                    },
+                    content_data={"youtube_id": video.get("id")},
                     description=video.get("description", ""),
                     duration_minutes=video.get("duration", 600) // 60,
                     estimated_difficulty=estimated_diff,
@@ -0,0 +1,99 @@
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.text_analyzer import TextAnalyzer
+
+# MinHash: 32 значения по 16 бит из одного blake2b-хэша слова (64 байта)
+SIGNATURE_SIZE = 32
+# LSH: 16 полос по 2 значения - копии почти наверняка делят хотя бы одну корзину
+BAND_ROWS = 2
+# После MinHash - 8 hex-символов хэша чисел из заголовка
+NUMBERS_SIZE = 8
+
+
+def video_fingerprint(video: Dict, analyzer: TextAnalyzer) -> Optional[str]:
+    """Отпечаток заголовка в hex: MinHash слов и хэш чисел, None - если слов нет.
+
+    Доля совпадающих значений MinHash у двух отпечатков оценивает похожесть
+    (Жаккара) наборов слов. Числа должны совпасть точно: "Урок 1" и "Урок 2"
+    остаются разными видео, даже если остальные слова одинаковые.
+    """
+    stream = analyzer.tokenize(video.get("title") or "")
+    words, numbers = set(), set()
+    for token, stopword in zip(stream.tokens, stream.stopwords):
+        if token.isdigit():
+            numbers.add(token.lstrip("0") or "0")
+        elif not stopword:
+            words.add(token)
+    if not words:
+        return None
+
+    hashes = np.frombuffer(
+        b"".join(
+            hashlib.blake2b(word.encode(), digest_size=SIGNATURE_SIZE * 2).digest()
+            for word in words
+        ),
+        dtype=">u2",
+    ).reshape(len(words), SIGNATURE_SIZE)
+    numbers_hash = hashlib.blake2b(
+        " ".join(sorted(numbers)).encode(), digest_size=NUMBERS_SIZE // 2
+    ).hexdigest()
+    return hashes.min(axis=0).astype(">u2").tobytes().hex() + numbers_hash
+
+
+def fingerprint_similarity(first: str, second: str) -> float:
+    """Оценка похожести заголовков по двум отпечаткам (от 0 до 1)"""
+    if first[-NUMBERS_SIZE:] != second[-NUMBERS_SIZE:]:
+        return 0.0
+    a = np.frombuffer(bytes.fromhex(first[:-NUMBERS_SIZE]), dtype=">u2")
+    b = np.frombuffer(bytes.fromhex(second[:-NUMBERS_SIZE]), dtype=">u2")
+    return float(np.mean(a == b))
+
+
+def collapse_duplicates(videos: List[Dict], min_similarity: float = 0.7) -> List[Dict]:
+    """Оставляет из каждой группы почти одинаковых видео лучшую копию.
+
+    Отпечатки (video["fingerprint"]) режутся на полосы, видео сравниваются
+    только внутри общих корзин LSH - в среднем O(1) сравнений на видео.
+    Лучшая копия - с большим числом просмотров, затем лайков, затем более ранняя.
+    Порядок оставшихся видео не меняется.
+    """
+    parent = list(range(len(videos)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    band_width = BAND_ROWS * 4  # hex-символов в полосе
+    buckets: Dict[tuple, List[int]] = {}
+    for i, video in enumerate(videos):
+        fingerprint = video.get("fingerprint")
+        if not fingerprint:
+            continue
+        numbers = fingerprint[-NUMBERS_SIZE:]
+        for start in range(0, len(fingerprint) - NUMBERS_SIZE, band_width):
+            # Видео с разными числами в заголовке даже не сравниваем
+            key = (start, fingerprint[start : start + band_width], numbers)
+            bucket = buckets.setdefault(key, [])
+            for j in bucket:
+                if find(i) != find(j) and (
+                    fingerprint_similarity(fingerprint, videos[j]["fingerprint"])
+                    >= min_similarity
+                ):
+                    parent[find(i)] = find(j)
+            bucket.append(i)
+
+    best: Dict[int, int] = {}
+    for i in range(len(videos)):
+        root = find(i)
+        if root not in best or _quality(videos[i]) > _quality(videos[best[root]]):
+            best[root] = i
+    return [videos[i] for i in sorted(best.values())]
+
+
+def _quality(video: Dict) -> tuple:
+    return (video.get("view_count") or 0, video.get("like_count") or 0)
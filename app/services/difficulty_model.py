@@ -0,0 +1,185 @@
+import argparse
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("beginner", "intermediate", "advanced")
+
+COEF_FILE = "coef.npy"
+INTERCEPT_FILE = "intercept.npy"
+META_FILE = "meta.json"
+
+
+def video_text(video: Dict) -> str:
+    """Текст видео для модели: заголовок, описание и субтитры (что есть)"""
+    return "\n".join(
+        video.get(field) or "" for field in ("title", "description", "transcript")
+    )
+
+
+def _vectorizer(n_features: int, ngram_range: Tuple[int, int]):
+    # sklearn нужен, только когда модель сложности включена
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Без словаря: вектор считается одинаково при обучении и в любом процессе
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=tuple(ngram_range),
+        token_pattern=r"(?u)\b\w+\b",
+        alternate_sign=False,
+    )
+
+
+class DifficultyModel:
+    """Линейный классификатор сложности: HashingVectorizer + логистическая регрессия.
+
+    Артефакт - каталог с весами coef.npy (float32, классы x признаки),
+    intercept.npy и meta.json. Веса открываются через mmap: процессы-воркеры
+    делят одни страницы памяти, а загрузка не читает файл целиком.
+    """
+
+    def __init__(
+        self,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        n_features: int,
+        ngram_range: Tuple[int, int] = (1, 2),
+    ):
+        self.coef = coef
+        self.intercept = intercept
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.vectorizer = _vectorizer(n_features, self.ngram_range)
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2**15,
+        ngram_range: Tuple[int, int] = (1, 2),
+        regularization: float = 10.0,
+    ) -> "DifficultyModel":
+        """Обучение на размеченных текстах (метки - из LABELS)"""
+        from sklearn.linear_model import LogisticRegression
+
+        targets = np.array([LABELS.index(label) for label in labels])
+        if len(set(targets.tolist())) != len(LABELS):
+            raise ValueError("Нужны примеры всех уровней сложности")
+
+        vectorizer = _vectorizer(n_features, ngram_range)
+        classifier = LogisticRegression(C=regularization, max_iter=1000)
+        classifier.fit(vectorizer.transform(texts), targets)
+        return cls(
+            classifier.coef_.astype(np.float32),
+            classifier.intercept_.astype(np.float32),
+            n_features,
+            ngram_range,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "DifficultyModel":
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if tuple(meta["labels"]) != LABELS:
+            raise ValueError(f"Неизвестные метки модели: {meta['labels']}")
+        return cls(
+            np.load(os.path.join(path, COEF_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, INTERCEPT_FILE)),
+            meta["n_features"],
+            meta["ngram_range"],
+        )
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, COEF_FILE), np.asarray(self.coef, np.float32))
+        np.save(
+            os.path.join(path, INTERCEPT_FILE), np.asarray(self.intercept, np.float32)
+        )
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "labels": LABELS,
+                    "n_features": self.n_features,
+                    "ngram_range": self.ngram_range,
+                },
+                f,
+            )
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Вероятности классов LABELS (тексты x классы) одним умножением матриц"""
+        if not texts:
+            return np.zeros((0, len(LABELS)))
+        logits = self.vectorizer.transform(texts) @ self.coef.T + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Индексы меток в LABELS и уверенность (вероятность выбранной метки)"""
+        probabilities = self.predict_proba(texts)
+        classes = probabilities.argmax(axis=1)
+        return classes, probabilities[np.arange(len(classes)), classes]
+
+    def predict_videos(self, videos: List[Dict]) -> List[str]:
+        classes, _ = self.predict([video_text(video) for video in videos])
+        return [LABELS[i] for i in classes]
+
+
+_model: Optional[DifficultyModel] = None
+_model_loaded = False
+_lock = threading.Lock()
+
+
+def get_difficulty_model() -> Optional[DifficultyModel]:
+    """Модель процесса (None - если не настроена или не загрузилась)"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _lock:
+            if not _model_loaded:
+                path = settings.DIFFICULTY_MODEL_PATH
+                if path:
+                    try:
+                        _model = DifficultyModel.load(path)
+                    except (OSError, ValueError, KeyError) as e:
+                        # Без модели сортировщик работает по правилам
+                        logger.warning(f"Difficulty model unavailable: {e}")
+                _model_loaded = True
+    return _model
+
+
+def load_labeled(path: str) -> Tuple[List[str], List[str]]:
+    """Тексты и метки из JSONL: title, description, transcript, difficulty"""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                texts.append(video_text(item))
+                labels.append(item["difficulty"])
+    return texts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обучение модели сложности видео")
+    parser.add_argument("dataset", help="JSONL с полями title/description/difficulty")
+    parser.add_argument("output", help="каталог артефакта (DIFFICULTY_MODEL_PATH)")
+    parser.add_argument("--features", type=int, default=2**15)
+    args = parser.parse_args()
+
+    texts, labels = load_labeled(args.dataset)
+    model = DifficultyModel.train(texts, labels, n_features=args.features)
+    model.save(args.output)
+    print(f"Модель сохранена в {args.output} ({len(texts)} примеров)")
+
+
+if __name__ == "__main__":
+    main()
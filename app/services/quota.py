@@ -0,0 +1,231 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import YouTubeQuotaUsage
+
+logger = logging.getLogger(__name__)
+
+# Стоимость вызовов YouTube Data API в единицах квоты
+ENDPOINT_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "playlists.list": 1,
+}
+
+try:
+    from zoneinfo import ZoneInfo
+
+    # Дневная квота YouTube обнуляется в полночь по тихоокеанскому времени
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+class QuotaExceededError(Exception):
+    """Квоты YouTube API не хватает на запрос"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class MinuteQuotaExceededError(QuotaExceededError):
+    """Исчерпан поминутный лимит: квота вернется через retry_after секунд"""
+
+
+class TokenBucket:
+    """Простой token bucket: capacity единиц, пополняется равномерно"""
+
+    def __init__(self, capacity: int, refill_per_second: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def try_take(self, amount: int) -> float:
+        """Забирает amount единиц; если не хватает - возвращает, сколько ждать"""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.refill_per_second,
+            )
+            self.updated_at = now
+
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.refill_per_second
+
+
+class QuotaScheduler:
+    """Планировщик вызовов YouTube API с учетом квоты.
+
+    Поминутный бюджет - token bucket в памяти процесса (короткие всплески
+    ждут своей очереди), дневной - журнал в БД, общий для всех воркеров.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        daily_limit: Optional[int] = None,
+        per_minute_limit: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.session_factory = session_factory
+        self.daily_limit = daily_limit or settings.YOUTUBE_DAILY_QUOTA
+        self.per_minute_limit = per_minute_limit or settings.YOUTUBE_MINUTE_QUOTA
+        self.max_wait = (
+            settings.YOUTUBE_QUOTA_MAX_WAIT if max_wait is None else max_wait
+        )
+        self.sleep = sleep
+        self.minute_bucket = TokenBucket(
+            self.per_minute_limit, self.per_minute_limit / 60.0, clock=clock
+        )
+
+    def cost(self, endpoint: str, calls: int = 1) -> int:
+        """Стоимость calls вызовов endpoint в единицах квоты"""
+        return ENDPOINT_COSTS.get(endpoint, 1) * calls
+
+    def acquire(self, endpoint: str, calls: int = 1):
+        """Резервирует квоту под вызов или бросает QuotaExceededError"""
+        units = self.cost(endpoint, calls)
+        if units > self.per_minute_limit:
+            raise QuotaExceededError(
+                f"{endpoint} стоит {units} единиц - больше поминутного лимита"
+            )
+
+        # Поминутный лимит: ждем, если ждать недолго
+        waited = 0.0
+        while True:
+            wait = self.minute_bucket.try_take(units)
+            if wait == 0:
+                break
+            if waited + wait > self.max_wait:
+                raise MinuteQuotaExceededError(
+                    "Поминутная квота YouTube API исчерпана", retry_after=wait
+                )
+            self.sleep(wait)
+            waited += wait
+
+        # Дневной лимит: атомарно списываем из журнала в БД
+        if not self._reserve_daily(units, calls):
+            raise QuotaExceededError(
+                "Дневная квота YouTube API исчерпана",
+                retry_after=self.seconds_until_reset(),
+            )
+
+    def remaining(self) -> int:
+        """Сколько единиц дневной квоты осталось"""
+        db = self.session_factory()
+        try:
+            usage = (
+                db.query(YouTubeQuotaUsage)
+                .filter(YouTubeQuotaUsage.day == self._today())
+                .first()
+            )
+            return self.daily_limit - (usage.units_used if usage else 0)
+        except Exception as e:
+            logger.warning(f"Quota ledger unavailable: {e}")
+            return self.daily_limit
+        finally:
+            db.close()
+
+    def ensure_budget(self, units: int):
+        """Отказывает заранее, если на операцию не хватит дневной квоты"""
+        remaining = self.remaining()
+        if remaining < units:
+            raise QuotaExceededError(
+                f"Недостаточно квоты YouTube API: нужно {units}, осталось {remaining}",
+                retry_after=self.seconds_until_reset(),
+            )
+
+    def mark_exhausted(self):
+        """API сам ответил quotaExceeded - считаем дневную квоту израсходованной"""
+        db = self.session_factory()
+        try:
+            self._ensure_row(db)
+            db.execute(
+                update(YouTubeQuotaUsage)
+                .where(YouTubeQuotaUsage.day == self._today())
+                .values(units_used=self.daily_limit, updated_at=datetime.now())
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Quota ledger update failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.now(QUOTA_TIMEZONE)
+        midnight = (now + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return math.ceil((midnight - now).total_seconds())
+
+    def _today(self) -> str:
+        return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+    def _reserve_daily(self, units: int, calls: int = 1) -> bool:
+        db = self.session_factory()
+        try:
+            self._ensure_row(db)
+            result = db.execute(
+                update(YouTubeQuotaUsage)
+                .where(
+                    YouTubeQuotaUsage.day == self._today(),
+                    YouTubeQuotaUsage.units_used + units <= self.daily_limit,
+                )
+                .values(
+                    units_used=YouTubeQuotaUsage.units_used + units,
+                    requests=YouTubeQuotaUsage.requests + calls,
+                    updated_at=datetime.now(),
+                )
+            )
+            db.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            # Журнал недоступен - не блокируем работу, поминутный лимит все равно действует
+            logger.warning(f"Quota ledger unavailable: {e}")
+            db.rollback()
+            return True
+        finally:
+            db.close()
+
+    def _ensure_row(self, db):
+        day = self._today()
+        if db.query(YouTubeQuotaUsage.id).filter(YouTubeQuotaUsage.day == day).first():
+            return
+        try:
+            db.add(YouTubeQuotaUsage(day=day, units_used=0, requests=0))
+            db.commit()
+        except IntegrityError:
+            # Строку дня одновременно создал другой воркер
+            db.rollback()
+
+
+_scheduler: Optional[QuotaScheduler] = None
+
+
+def get_quota_scheduler() -> QuotaScheduler:
+    """Общий планировщик процесса: поминутный bucket должен быть один"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = QuotaScheduler()
+    return _scheduler
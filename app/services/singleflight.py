@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд не трогать Redis после ошибки подключения
+REDIS_RETRY_DELAY = 30
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Склейка одинаковых одновременных запросов.
+
+    Внутри процесса одинаковые вызовы ждут первый и получают его результат.
+    Между воркерами то же самое делается через Redis: лидер берет блокировку
+    SET NX, кладет результат в ключ с коротким TTL, остальные его дожидаются.
+    Результат должен сериализоваться в JSON.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        lock_ttl: float = 30,
+        result_ttl: float = 15,
+        poll_interval: float = 0.05,
+        prefix: str = "singleflight",
+    ):
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[tuple, asyncio.Future] = {}
+        # После ошибки Redis какое-то время не пытаемся к нему подключаться
+        self._redis_retry_at = 0.0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Выполняет fn один раз на все одновременные вызовы с этим key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, coro_fn: Callable[[], Any]) -> Any:
+        """То же, что do, для корутин (coro_fn возвращает новую корутину)"""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self._async_calls.get(call_key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self._async_calls[call_key] = loop.create_future()
+        try:
+            result = await self._do_shared_async(key, coro_fn)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Если ждущих нет, исключение не должно считаться потерянным
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[call_key]
+
+    # ==================== МЕЖДУ ПРОЦЕССАМИ ====================
+
+    def _do_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        if not self._redis_available():
+            return fn()
+
+        found, result = self._redis_result(key)
+        if found:
+            return result
+
+        token = self._redis_lock(key)
+        if token:
+            try:
+                result = fn()
+                self._redis_publish(key, result)
+                return result
+            finally:
+                self._redis_unlock(key, token)
+
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            found, result = self._redis_result(key)
+            if found:
+                return result
+            if not self._redis_locked(key):
+                break
+
+        # Лидер упал или не успел - выполняем сами
+        return fn()
+
+    async def _do_shared_async(self, key: str, coro_fn: Callable[[], Any]) -> Any:
+        if not self._redis_available():
+            return await coro_fn()
+
+        found, result = await asyncio.to_thread(self._redis_result, key)
+        if found:
+            return result
+
+        token = await asyncio.to_thread(self._redis_lock, key)
+        if token:
+            try:
+                result = await coro_fn()
+                await asyncio.to_thread(self._redis_publish, key, result)
+                return result
+            finally:
+                await asyncio.to_thread(self._redis_unlock, key, token)
+
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            found, result = await asyncio.to_thread(self._redis_result, key)
+            if found:
+                return result
+            if not await asyncio.to_thread(self._redis_locked, key):
+                break
+
+        return await coro_fn()
+
+    # Ошибки Redis не должны ломать запрос: без Redis просто нет склейки между воркерами
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, error: Exception):
+        logger.warning(f"Single-flight redis unavailable: {error}")
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_DELAY
+
+    def _redis_result(self, key: str):
+        try:
+            raw = self.redis.get(f"{self.prefix}:result:{key}")
+        except Exception as e:
+            self._redis_failed(e)
+            return False, None
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    def _redis_lock(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis.set(
+                f"{self.prefix}:lock:{key}",
+                token,
+                nx=True,
+                px=int(self.lock_ttl * 1000),
+            )
+        except Exception as e:
+            self._redis_failed(e)
+            # Без Redis каждый процесс сам себе лидер
+            return token
+        return token if acquired else None
+
+    def _redis_locked(self, key: str) -> bool:
+        try:
+            return bool(self.redis.exists(f"{self.prefix}:lock:{key}"))
+        except Exception:
+            return False
+
+    def _redis_publish(self, key: str, result: Any):
+        try:
+            self.redis.set(
+                f"{self.prefix}:result:{key}",
+                json.dumps(result, ensure_ascii=False),
+                px=int(self.result_ttl * 1000),
+            )
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _redis_unlock(self, key: str, token: str):
+        lock_key = f"{self.prefix}:lock:{key}"
+        try:
+            # Снимаем только свою блокировку (чужая могла появиться после TTL)
+            current = self.redis.get(lock_key)
+            if current is not None and _as_str(current) == token:
+                self.redis.delete(lock_key)
+        except Exception:
+            pass
+
+
+def _as_str(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+_singleflight: Optional[SingleFlight] = None
+
+
+def get_singleflight() -> SingleFlight:
+    """Общий SingleFlight процесса (Redis - если включен в настройках)"""
+    global _singleflight
+    if _singleflight is None:
+        redis_client = None
+        if settings.YOUTUBE_SINGLEFLIGHT_REDIS:
+            import redis
+
+            redis_client = redis.Redis.from_url(
+                settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=2
+            )
+        _singleflight = SingleFlight(redis_client)
+    return _singleflight
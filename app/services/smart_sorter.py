@@ -1,6 +1,40 @@
-from typing import Dict, List
+import heapq
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from .text_analyzer import TextAnalyzer
+import numpy as np
+
+from app.core.config import settings
+
+from .difficulty_model import get_difficulty_model, video_text
+from .text_analyzer import TextAnalyzer, TokenStream
+from .video_record import field_values
+
+# Сколько разобранных заголовков держит один сортировщик
+TOKEN_CACHE_SIZE = 10000
+
+# Корзины признаков для векторной оценки (те же пороги, что в _calculate_video_score)
+DURATION_BINS = [300, 900, 1800]  # < 5, < 15, < 30 минут, дольше
+DURATION_SCORES = np.array([1.0, 0.8, 0.5, 0.2])
+VIEWS_BINS = [1000, 10000, 100000]  # границы входят в нижнюю корзину
+VIEWS_SCORES = np.array([0.3, 0.5, 0.7, 0.9])
+READABILITY_BINS = [0.45, 0.75]
+READABILITY_LEVELS = np.array([3.0, 2.0, 1.0])  # advanced, intermediate, beginner
+
+LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3}
+
+# Веса столбцов: сложность, длительность, популярность, релевантность, канал
+SCORE_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1, 0.1])
+
+
+def _weighted_sum(features: np.ndarray) -> np.ndarray:
+    """features @ SCORE_WEIGHTS со сложением столбцов слева направо.
+
+    Произведение через BLAS округляет по-разному в зависимости от числа строк
+    и их положения в пачке, а select_top сравнивает оценки, посчитанные
+    разными пачками. Здесь оценка строки от пачки не зависит.
+    """
+    return (features * SCORE_WEIGHTS).sum(axis=1)
 
 
 class SmartVideoSorter:
@@ -8,6 +42,18 @@ class SmartVideoSorter:
 
     def __init__(self):
         self.analyzer = TextAnalyzer()
+        # Обученная модель сложности, если настроена; иначе - правила по заголовку
+        self.difficulty_model = get_difficulty_model()
+        # Заголовок разбирается один раз на все этапы: отбор, оценка, модули
+        self._streams: Dict[str, TokenStream] = {}
+
+    def _tokens(self, text: str) -> TokenStream:
+        stream = self._streams.get(text)
+        if stream is None:
+            if len(self._streams) >= TOKEN_CACHE_SIZE:
+                self._streams.clear()
+            stream = self._streams[text] = self.analyzer.tokenize(text)
+        return stream
 
     def sort_videos(
         self, videos: List[Dict], topic: str, target_difficulty: str
@@ -16,39 +62,235 @@ class SmartVideoSorter:
         if not videos:
             return videos
 
-        # 1. Оцениваем сложность каждого видео
-        scored_videos = []
-        for video in videos:
-            score = self._calculate_video_score(video, topic, target_difficulty)
-            scored_videos.append((score, video))
+        # 1. Оцениваем все видео разом
+        scores = self.score_videos(videos, topic, target_difficulty)
 
-        # 2. Сортируем по оценке (от простого к сложному)
-        scored_videos.sort(key=lambda x: x[0])
+        # 2. Сортируем по оценке (от простого к сложному), равные - в исходном порядке
+        order = np.argsort(scores, kind="stable")
 
         # 3. Группируем по сложности для создания модулей
-        sorted_videos = [video for _, video in scored_videos]
+        sorted_videos = [videos[i] for i in order]
 
         # 4. Добавляем метаданные
-        for i, video in enumerate(sorted_videos):
+        return self.annotate_videos(sorted_videos, topic)
+
+    def annotate_videos(self, videos: List[Dict], topic: str) -> List[Dict]:
+        """Проставляет порядковый номер и оценку сложности, не меняя порядок"""
+        difficulties = self.estimate_difficulties(videos, topic)
+        for i, (video, difficulty) in enumerate(zip(videos, difficulties)):
             video["order"] = i + 1
-            video["estimated_difficulty"] = self._estimate_difficulty(video, topic)
+            video["estimated_difficulty"] = difficulty
+
+        return videos
+
+    def estimate_difficulties(self, videos: List[Dict], topic: str) -> List[str]:
+        """Сложность каждого видео списка (с моделью - одним вызовом на список)"""
+        if self.difficulty_model is not None:
+            return self.difficulty_model.predict_videos(videos)
+        return [self._estimate_difficulty(video, topic) for video in videos]
+
+    def select_best(
+        self, videos: List[Dict], topic: str, target_difficulty: str, limit: int
+    ) -> List[Dict]:
+        """Оставляет limit видео с лучшей оценкой (в исходном порядке)"""
+        if len(videos) <= limit:
+            return videos
+
+        scores = self.score_videos(videos, topic, target_difficulty)
+        best = np.argsort(-scores, kind="stable")[:limit]
+        return [videos[i] for i in np.sort(best)]
+
+    def score_videos(
+        self, videos: List[Dict], topic: str, target_difficulty: str
+    ) -> np.ndarray:
+        """Оценки всех видео: матрица признаков, умноженная на SCORE_WEIGHTS.
+
+        Совпадают с _calculate_video_score до бита, поэтому равные оценки
+        не меняются местами.
+        """
+        return _weighted_sum(self.video_features(videos, topic, target_difficulty))
 
-        return sorted_videos
+    def video_features(
+        self, videos: List[Dict], topic: str, target_difficulty: str
+    ) -> np.ndarray:
+        """Матрица признаков (видео x столбцы SCORE_WEIGHTS), значения от 0 до 1"""
+        return np.column_stack(
+            [
+                self._difficulty_feature(videos, target_difficulty),
+                *self._cheap_features(videos, topic),
+            ]
+        )
+
+    def select_top(
+        self,
+        candidates: Iterable[Dict],
+        topic: str,
+        target_difficulty: str,
+        limit: int,
+        prepare: Optional[Callable[[List[Dict]], None]] = None,
+        chunk_size: int = 256,
+    ) -> List[Dict]:
+        """Лучшие limit видео из потока кандидатов (в порядке потока).
+
+        Результат тот же, что у select_best на всем списке, но в памяти только
+        куча из limit видео и одна пачка. Сначала вся пачка получает дешевую
+        оценку сверху: без анализа заголовка, с наилучшей сложностью.
+        Полную оценку видео получают порциями по limit от самых многообещающих,
+        поэтому куча сразу заполняется сильными кандидатами. Кто по дешевой
+        оценке не обгоняет худшее видео в куче, отбрасывается, остальным
+        prepare дописывает дорогие признаки (например, репутацию канала).
+        """
+        if limit <= 0:
+            return []
+
+        # (оценка, -номер в потоке, видео): сверху худшее из лучших,
+        # при равной оценке раньше вытесняется пришедшее позже
+        heap = []
+        position = 0
+        iterator = iter(candidates)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            numbers = np.arange(position, position + len(chunk))
+            position += len(chunk)
+
+            bound = self._score_bound(chunk, topic)
+            # По убыванию границы, равные - в порядке потока
+            order = np.lexsort((numbers, -bound))
+            for start in range(0, len(order), limit):
+                batch = order[start : start + limit]
+                if len(heap) >= limit:
+                    worst_score, worst_number = heap[0][:2]
+                    # Видео обрабатываются не по порядку потока, поэтому
+                    # при равенстве сравниваем и номер, как это делает куча
+                    batch = batch[
+                        (bound[batch] > worst_score)
+                        | (
+                            (bound[batch] == worst_score)
+                            & (-numbers[batch] > worst_number)
+                        )
+                    ]
+                    if not len(batch):
+                        # Дальше границы только ниже
+                        break
+
+                videos = [chunk[i] for i in batch]
+                if prepare is not None:
+                    prepare(videos)
+                scores = self.score_videos(videos, topic, target_difficulty)
+                for score, i, video in zip(scores.tolist(), batch.tolist(), videos):
+                    item = (score, -int(numbers[i]), video)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, item)
+                    elif item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
+
+        return [video for _, _, video in sorted(heap, key=lambda item: -item[1])]
+
+    def _score_bound(self, videos: List[Dict], topic: str) -> np.ndarray:
+        """Верхняя граница оценки без анализа заголовка и репутации канала"""
+        columns = self._cheap_features(videos, topic, optimistic=True)
+        # Сложность берем наилучшую, складываем так же, как score_videos:
+        # округление монотонно, поэтому граница не меньше настоящей оценки
+        return _weighted_sum(np.column_stack([np.ones(len(videos)), *columns]))
+
+    def _cheap_features(
+        self, videos: List[Dict], topic: str, optimistic: bool = False
+    ) -> List[np.ndarray]:
+        """Длительность, популярность, релевантность и канал - без анализа текста.
+
+        optimistic: видео без репутации канала получают наибольший балл.
+        """
+        missing_channel = 1.0 if optimistic else 0.0
+        topic_lower = topic.lower()
+        topic_words = set(topic_lower.split())
+        relevance = []
+        for title in field_values(videos, "title", ""):
+            title_lower = title.lower()
+            if topic_lower in title_lower:
+                relevance.append(1.0)
+            else:
+                common_words = topic_words.intersection(title_lower.split())
+                relevance.append(len(common_words) / max(len(topic_words), 1))
+        channel = [
+            missing_channel if score is None else score
+            for score in field_values(videos, "channel_score")
+        ]
+
+        return [
+            DURATION_SCORES[
+                np.digitize(
+                    np.array(field_values(videos, "duration", 600), dtype=float),
+                    DURATION_BINS,
+                )
+            ],
+            VIEWS_SCORES[
+                np.digitize(
+                    np.array(field_values(videos, "view_count", 0), dtype=float),
+                    VIEWS_BINS,
+                    right=True,
+                )
+            ],
+            np.array(relevance, dtype=float),
+            np.array(channel, dtype=float),
+        ]
+
+    def _difficulty_feature(
+        self, videos: List[Dict], target_difficulty: str
+    ) -> np.ndarray:
+        """Близость сложности видео к целевой (анализ заголовка, затем субтитры)"""
+        target = LEVELS.get(target_difficulty, 2)
+        if self.difficulty_model is not None:
+            classes, _ = self.difficulty_model.predict(
+                [video_text(video) for video in videos]
+            )
+            # Индексы LABELS на 1 меньше уровней LEVELS
+            return 1.0 - np.abs(classes + 1.0 - target) / 3.0
+
+        # Коды DIFFICULTY_LEVELS совпадают с LEVELS, 0 - уровень не определен
+        title_levels = self.analyzer.analyze_batch(
+            field_values(videos, "title", ""), readability=False, keywords=False
+        )["difficulty"].astype(float)
+        readability = np.array(
+            [
+                np.nan if value is None else value
+                for value in field_values(videos, "readability")
+            ],
+            dtype=float,
+        )
+
+        # Заголовок не помог - уровень по субтитрам, а без них средний
+        transcript_levels = READABILITY_LEVELS[
+            np.digitize(np.nan_to_num(readability), READABILITY_BINS)
+        ]
+        levels = np.where(
+            title_levels > 0,
+            title_levels,
+            np.where(np.isnan(readability), 2.0, transcript_levels),
+        )
+        return 1.0 - np.abs(levels - target) / 3.0
 
     def _calculate_video_score(
         self, video: Dict, topic: str, target_difficulty: str
     ) -> float:
-        """Рассчитывает оценку видео для сортировки"""
+        """Рассчитывает оценку одного видео (для списков - score_videos)"""
         score = 0.0
 
         # 1. Анализ заголовка (40%)
-        title = video.get("title", "")
+        title = self._tokens(video.get("title", ""))
         title_analysis = self.analyzer.analyze_title(title)
 
         difficulty_map = {"beginner": 1, "intermediate": 2, "advanced": 3, "unknown": 2}
         target_map = {"beginner": 1, "intermediate": 2, "advanced": 3}
 
         video_diff = difficulty_map.get(title_analysis["difficulty"], 2)
+        if self.difficulty_model is not None:
+            # Обученная модель заменяет правила
+            video_diff = LEVELS[self.difficulty_model.predict_videos([video])[0]]
+        elif title_analysis["difficulty"] == "unknown":
+            # По заголовку не понять - смотрим на текст субтитров
+            video_diff = difficulty_map[self._transcript_difficulty(video)]
         target_diff = target_map.get(target_difficulty, 2)
 
         # Близость к целевому уровню (но начинаем с более простых)
@@ -82,7 +324,7 @@ class SmartVideoSorter:
         score += popularity_score * 0.2
 
         # 4. Релевантность теме (10%)
-        title_lower = title.lower()
+        title_lower = title.lower
         topic_lower = topic.lower()
 
         if topic_lower in title_lower:
@@ -96,19 +338,29 @@ class SmartVideoSorter:
 
         score += relevance_score * 0.1
 
+        # 5. Репутация канала (заранее посчитана, есть не у всех видео)
+        if video.get("channel_score") is not None:
+            score += video["channel_score"] * 0.1
+
         return score
 
     def _estimate_difficulty(self, video: Dict, topic: str) -> str:
         """Оценивает сложность видео"""
-        title = video.get("title", "")
+        if self.difficulty_model is not None:
+            return self.difficulty_model.predict_videos([video])[0]
+
+        title = self._tokens(video.get("title", ""))
         analysis = self.analyzer.analyze_title(title)
 
         if analysis["confidence"] > 0.3:
             return analysis["difficulty"]
 
         # Если уверенность низкая, используем эвристики
+        if "readability" in video:
+            return self._transcript_difficulty(video)
+
         duration = video.get("duration", 600)
-        title_lower = title.lower()
+        title_lower = title.lower
 
         # Долгие видео обычно сложнее
         if duration > 1800:  # > 30 минут
@@ -120,10 +372,31 @@ class SmartVideoSorter:
 
         return "intermediate"
 
+    def _transcript_difficulty(self, video: Dict) -> str:
+        """Сложность по простоте текста субтитров (unknown, если их нет)"""
+        readability = video.get("readability")
+        if readability is None:
+            return "unknown"
+        if readability >= 0.75:
+            return "beginner"
+        if readability >= 0.45:
+            return "intermediate"
+        return "advanced"
+
     def group_into_modules(
-        self, videos: List[Dict], module_size: int = 5
+        self, videos: List[Dict], module_size: int = 5, mode: Optional[str] = None
     ) -> List[List[Dict]]:
-        """Группирует видео в модули"""
+        """Группирует видео в модули
+
+        mode: "fixed" - по module_size видео подряд, "clusters" - по похожести
+        заголовков и описаний (по умолчанию из настроек). Порядок видео не меняется.
+        """
+        mode = mode or settings.MODULE_GROUPING
+        if mode == "clusters" and len(videos) > module_size:
+            modules = self._cluster_modules(videos, module_size)
+            if modules is not None:
+                return modules
+
         modules = []
         for i in range(0, len(videos), module_size):
             module = videos[i : i + module_size]
@@ -137,6 +410,92 @@ class SmartVideoSorter:
 
         return modules
 
+    def _cluster_modules(
+        self, videos: List[Dict], module_size: int
+    ) -> Optional[List[List[Dict]]]:
+        """Модули из похожих видео по TF-IDF (None - если не по чему делить).
+
+        Кластеризация идет со связями только между соседями в отсортированном
+        списке, поэтому каждый модуль - отрезок списка и порядок от простого
+        к сложному сохраняется. Название модуля - главные слова его центроида.
+        """
+        # Нужны только для MODULE_GROUPING="clusters" - не грузим их при старте
+        from scipy import sparse
+        from sklearn.cluster import AgglomerativeClustering
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(
+            analyzer=lambda text: self.analyzer.tokenize(text).keywords()
+        )
+        texts = [f"{v.get('title', '')} {v.get('description', '')}" for v in videos]
+        try:
+            matrix = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Ни одного ключевого слова
+            return None
+
+        count = len(videos)
+        neighbors = sparse.diags(
+            [np.ones(count - 1), np.ones(count - 1)], [-1, 1], format="csr"
+        )
+        labels = AgglomerativeClustering(
+            n_clusters=-(-count // module_size),
+            connectivity=neighbors,
+            linkage="ward",
+        ).fit_predict(matrix.toarray())
+
+        edges = [0] + [i for i in range(1, count) if labels[i] != labels[i - 1]]
+        segments = list(zip(edges, edges[1:] + [count]))
+        segments = self._balance_segments(segments, matrix, module_size)
+
+        terms = vectorizer.get_feature_names_out()
+        modules = []
+        for start, end in segments:
+            module = videos[start:end]
+            centroid = self._centroid(matrix, start, end)
+            top = [i for i in np.argsort(-centroid, kind="stable")[:3] if centroid[i]]
+            module_topic = " ".join(
+                terms[i] for i in top
+            ).capitalize() or self._determine_module_topic(module)
+            for video in module:
+                video["module_topic"] = module_topic
+            modules.append(module)
+        return modules
+
+    def _balance_segments(
+        self, segments: List[Tuple[int, int]], matrix, module_size: int
+    ) -> List[Tuple[int, int]]:
+        """Режет слишком длинные модули и присоединяет слишком короткие к соседям"""
+        max_size = module_size * 2
+        min_size = max(2, module_size // 2)
+
+        balanced = []
+        for start, end in segments:
+            if end - start <= max_size:
+                balanced.append((start, end))
+                continue
+            parts = -(-(end - start) // module_size)
+            cuts = np.linspace(start, end, parts + 1).round().astype(int).tolist()
+            balanced.extend(zip(cuts, cuts[1:]))
+
+        while len(balanced) > 1:
+            short = [i for i, (a, b) in enumerate(balanced) if b - a < min_size]
+            if not short:
+                break
+            i = short[0]
+            centroid = self._centroid(matrix, *balanced[i])
+            # Присоединяем к более похожему соседу
+            j = max(
+                (j for j in (i - 1, i + 1) if 0 <= j < len(balanced)),
+                key=lambda j: float(centroid @ self._centroid(matrix, *balanced[j])),
+            )
+            first, second = sorted((i, j))
+            balanced[first : second + 1] = [(balanced[first][0], balanced[second][1])]
+        return balanced
+
+    def _centroid(self, matrix, start: int, end: int) -> np.ndarray:
+        return np.asarray(matrix[start:end].mean(axis=0)).ravel()
+
     def _determine_module_topic(self, videos: List[Dict]) -> str:
         """Определяет тему модуля на основе видео"""
         if not videos:
@@ -148,7 +507,7 @@ class SmartVideoSorter:
         # Ищем общие слова
         common_words = []
         for title in titles:
-            words = set(self.analyzer.extract_keywords(title, 5))
+            words = set(self.analyzer.extract_keywords(self._tokens(title), 5))
             if not common_words:
                 common_words = words
             else:
@@ -0,0 +1,95 @@
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.video import (
+    get_videos_to_refresh,
+    mark_videos_missing,
+    upsert_videos,
+)
+from app.services.quota import QuotaExceededError
+from app.services.youtube_async import VIDEOS_BATCH_SIZE
+from app.services.youtube_service import YouTubeService
+
+logger = logging.getLogger(__name__)
+
+
+class VideoStatsRefresher:
+    """Фоновое обновление просмотров и лайков видео из активных курсов.
+
+    Работает по схеме stale-while-revalidate: пока пачка не обновилась,
+    каталог отдает старые значения. Часть дневной квоты (quota_reserve)
+    всегда остается для генерации курсов.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        youtube: Optional[YouTubeService] = None,
+        max_videos: Optional[int] = None,
+        quota_reserve: Optional[int] = None,
+    ):
+        self.db = db
+        self.youtube = youtube or YouTubeService()
+        self.max_videos = max_videos or settings.STATS_REFRESH_MAX_VIDEOS
+        self.quota_reserve = (
+            settings.STATS_REFRESH_QUOTA_RESERVE
+            if quota_reserve is None
+            else quota_reserve
+        )
+
+    def refresh(self) -> Dict:
+        """Один проход обновления; возвращает отчет о количестве видео"""
+        videos = get_videos_to_refresh(
+            self.db, settings.VIDEO_CATALOG_TTL, limit=self.max_videos
+        )
+        report = {
+            "stale": len(videos),
+            "refreshed": 0,
+            "missing": 0,
+            "batches": 0,
+            "stopped_by_quota": False,
+        }
+
+        for start in range(0, len(videos), VIDEOS_BATCH_SIZE):
+            batch = [
+                video.youtube_id for video in videos[start : start + VIDEOS_BATCH_SIZE]
+            ]
+            if not self._has_budget():
+                report["stopped_by_quota"] = True
+                break
+
+            try:
+                details = self.youtube.fetch_videos_details(batch)
+            except QuotaExceededError as e:
+                logger.warning(f"Stats refresh stopped: {e}")
+                report["stopped_by_quota"] = True
+                break
+
+            # Каждая пачка сохраняется сразу: до этого читатели видят старые значения
+            upsert_videos(
+                self.db,
+                [dict(value, id=youtube_id) for youtube_id, value in details.items()],
+                fetched=True,
+            )
+            missing = [youtube_id for youtube_id in batch if youtube_id not in details]
+            mark_videos_missing(self.db, missing)
+            self.db.commit()
+
+            report["batches"] += 1
+            report["refreshed"] += len(details)
+            report["missing"] += len(missing)
+
+        logger.info(
+            f"Video stats refresh: {report['refreshed']} of {report['stale']} "
+            f"stale videos refreshed in {report['batches']} batches"
+        )
+        return report
+
+    def _has_budget(self) -> bool:
+        quota = self.youtube.quota
+        if quota is None:
+            return True
+        return quota.remaining() - self.quota_reserve >= quota.cost("videos.list")
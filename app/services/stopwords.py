@@ -0,0 +1,46 @@
+import logging
+import threading
+from typing import FrozenSet, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Русские стоп-слова (список NLTK), встроены в пакет, чтобы не зависеть от сети
+RUSSIAN_STOPWORDS: FrozenSet[str] = frozenset("""
+и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по
+только ее мне было вот от меня еще нет о из ему теперь когда даже ну вдруг ли
+если уже или ни быть был него до вас нибудь опять уж вам ведь там потом себя
+ничего ей может они тут где есть надо ней для мы тебя их чем была сам чтоб без
+будто чего раз тоже себе под будет ж тогда кто этот того потому этого какой
+совсем ним здесь этом один почти мой тем чтобы нее сейчас были куда зачем всех
+никогда можно при наконец два об другой хоть после над больше тот через эти нас
+про всего них какая много разве три эту моя впрочем хорошо свою этой перед
+иногда лучше чуть том нельзя такой им более всегда конечно всю между
+""".split())
+
+_russian_stopwords: Optional[FrozenSet[str]] = None
+_lock = threading.Lock()
+
+
+def get_russian_stopwords() -> FrozenSet[str]:
+    """Стоп-слова процесса: загружаются один раз при первом обращении"""
+    global _russian_stopwords
+    if _russian_stopwords is None:
+        with _lock:
+            if _russian_stopwords is None:
+                _russian_stopwords = _load_russian_stopwords()
+    return _russian_stopwords
+
+
+def _load_russian_stopwords() -> FrozenSet[str]:
+    if not settings.NLTK_STOPWORDS:
+        return RUSSIAN_STOPWORDS
+    try:
+        from nltk.corpus import stopwords
+
+        # Только локальные данные: nltk.download здесь не вызываем
+        return RUSSIAN_STOPWORDS | frozenset(stopwords.words("russian"))
+    except (ImportError, LookupError) as e:
+        logger.info(f"NLTK stopwords unavailable, using built-in list: {e}")
+        return RUSSIAN_STOPWORDS
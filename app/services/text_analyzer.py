@@ -1,19 +1,285 @@
+import hashlib
 import re
-from collections import Counter
-from typing import Dict, List
+import threading
+from collections import Counter, OrderedDict
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Sequence, Union
 
-import nltk
-from nltk.corpus import stopwords
+import numpy as np
 
-try:
-    nltk.data.find("corpora/stopwords")
-except LookupError:
-    nltk.download("stopwords")
+from app.core.config import settings
+from app.services.stopwords import get_russian_stopwords
+
+# Версия алгоритмов анализа: меняется - старые записи кэша перестают совпадать
+ANALYZER_VERSION = 1
+
+# Коды сложности в пакетном API: индекс уровня в этом кортеже
+DIFFICULTY_LEVELS = ("unknown", "beginner", "intermediate", "advanced")
+
+# Слово (группа 1) или знаки конца предложения - один проход по тексту
+_TOKEN = re.compile(r"(\w+)|[.!?]+")
+_KEYWORD = re.compile(r"[а-яёa-z]{3,}")
+
+# Символы, из-за которых шаблон нельзя считать простой фразой
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+class _DifficultyMatcher:
+    """Все шаблоны сложности в одном регулярном выражении.
+
+    Шаблоны - обычные фразы, поэтому хватает одного прохода с lookahead:
+    в каждой позиции находится самая длинная фраза, а более короткие фразы,
+    с которых она начинается, засчитываются вместе с ней. Результат тот же,
+    что у отдельного re.search на каждый шаблон.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.patterns = {level: list(items) for level, items in patterns.items()}
+        self.literal = all(
+            not _REGEX_SPECIAL & set(pattern)
+            for items in self.patterns.values()
+            for pattern in items
+        )
+        if not self.literal:
+            # Настоящие регулярные выражения - проверяем по одному, как раньше
+            return
+
+        phrases = sorted(
+            {pattern for items in self.patterns.values() for pattern in items},
+            key=len,
+            reverse=True,
+        )
+        # Класс первых букв отсекает позиции, где не начинается ни одна фраза
+        first_letters = "".join(sorted({re.escape(phrase[0]) for phrase in phrases}))
+        self.regex = re.compile(
+            f"(?=[{first_letters}])(?=("
+            + "|".join(re.escape(phrase) for phrase in phrases)
+            + "))"
+        )
+        self.prefixes = {
+            phrase: [other for other in phrases if phrase.startswith(other)]
+            for phrase in phrases
+        }
+        # Фраза может повторяться в списках - каждое вхождение дает балл
+        self.levels: Dict[str, List[str]] = {}
+        for level, items in self.patterns.items():
+            for pattern in items:
+                self.levels.setdefault(pattern, []).append(level)
+
+        # То же в виде матриц для пакетного подсчета: найденная фраза -> фразы,
+        # которые засчитываются с ней, фраза -> баллы по уровням
+        self.phrase_index = {phrase: i for i, phrase in enumerate(phrases)}
+        # (float - чтобы произведение шло через BLAS; значения - малые целые)
+        self.prefix_matrix = np.zeros((len(phrases), len(phrases)))
+        for phrase, prefixes in self.prefixes.items():
+            for other in prefixes:
+                self.prefix_matrix[
+                    self.phrase_index[phrase], self.phrase_index[other]
+                ] = 1
+        level_columns = {level: i for i, level in enumerate(self.patterns)}
+        self.level_matrix = np.zeros((len(phrases), len(level_columns)))
+        for phrase, levels in self.levels.items():
+            for level in levels:
+                self.level_matrix[self.phrase_index[phrase], level_columns[level]] += 1
+
+    def count(self, text_lower: str) -> Dict[str, int]:
+        """Сколько шаблонов каждого уровня встречается в тексте"""
+        counts = {level: 0 for level in self.patterns}
+        if not self.literal:
+            for level, items in self.patterns.items():
+                for pattern in items:
+                    if re.search(pattern, text_lower):
+                        counts[level] += 1
+            return counts
+
+        found = set()
+        for phrase in set(self.regex.findall(text_lower)):
+            found.update(self.prefixes[phrase])
+        for phrase in found:
+            for level in self.levels[phrase]:
+                counts[level] += 1
+        return counts
+
+    def count_batch(self, texts_lower: Sequence[str]) -> np.ndarray:
+        """count для списка текстов: матрица (текст x уровень в порядке patterns).
+
+        Тексты склеиваются через перевод строки, которого нет в фразах, и
+        регулярное выражение проходит по ним один раз; найденные позиции
+        раскладываются по текстам, а баллы считаются произведением матриц.
+        """
+        if not self.literal:
+            return np.array(
+                [list(self.count(text).values()) for text in texts_lower],
+                dtype=np.int32,
+            ).reshape(len(texts_lower), len(self.patterns))
+
+        lengths = np.array([len(text) + 1 for text in texts_lower], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        positions, phrases = [], []
+        for match in self.regex.finditer("\n".join(texts_lower)):
+            positions.append(match.start())
+            phrases.append(self.phrase_index[match.group(1)])
+
+        hits = np.zeros((len(texts_lower), len(self.phrase_index)))
+        rows = np.searchsorted(
+            starts, np.array(positions, dtype=np.int64), side="right"
+        )
+        hits[rows - 1, np.array(phrases, dtype=np.intp)] = 1
+        found = (hits @ self.prefix_matrix) > 0
+        return (found @ self.level_matrix).astype(np.int32)
+
+
+class TokenStream:
+    """Текст, разобранный один раз: слова в нижнем регистре, границы
+    предложений и пометки стоп-слов. Все признаки анализатора считаются из него.
+    """
+
+    __slots__ = ("lower", "tokens", "sentence_starts", "stopwords")
+
+    def __init__(self, text: str, stopwords: AbstractSet[str]):
+        self.lower = text.lower()
+        self.tokens: List[str] = []
+        # Индекс первого слова каждого предложения
+        self.sentence_starts = [0]
+        for word in _TOKEN.findall(self.lower):
+            if word:
+                self.tokens.append(word)
+            else:
+                self.sentence_starts.append(len(self.tokens))
+        self.stopwords = [token in stopwords for token in self.tokens]
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_starts)
+
+    def keywords(self) -> List[str]:
+        """Слова из букв длиной от 3, кроме стоп-слов"""
+        return [
+            token
+            for token, stopword in zip(self.tokens, self.stopwords)
+            if not stopword and _KEYWORD.fullmatch(token)
+        ]
+
+    def meaningful_words(self) -> List[str]:
+        """Слова от 2 символов, кроме стоп-слов"""
+        return [
+            token
+            for token, stopword in zip(self.tokens, self.stopwords)
+            if not stopword and len(token) >= 2
+        ]
+
+
+Text = Union[str, TokenStream]
+
+
+class AnalysisMemo:
+    """Ограниченный LRU кэш результатов анализа текста.
+
+    Ключ собирает вызывающий: версия анализатора, вид анализа и SHA-1 текста,
+    так что запись не растет с длиной текста. Самые давно не использованные
+    записи вытесняются.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def get_many(self, keys: Sequence[tuple]) -> List[Any]:
+        """Значения по списку ключей под одной блокировкой (None - промах)"""
+        if self.maxsize <= 0:
+            return [None] * len(keys)
+
+        values = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                values.append(value)
+        return values
+
+    def set_many(self, items: Sequence[tuple]):
+        """Сохраняет пары (ключ, значение), вытесняя самые старые записи"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            for key, value in items:
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        """Размер кэша и доля попаданий"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_memo: Optional[AnalysisMemo] = None
+
+
+def get_analysis_memo() -> AnalysisMemo:
+    """Общий кэш анализа процесса: заголовки повторяются между генерациями"""
+    global _memo
+    if _memo is None:
+        _memo = AnalysisMemo(settings.TEXT_ANALYSIS_CACHE_SIZE)
+    return _memo
+
+
+def _text_digest(text: str) -> bytes:
+    """Ключ текста в кэше анализа: 20 байт вместо всей строки"""
+    return hashlib.sha1(text.encode()).digest()
+
+
+def _patterns_signature(patterns: Dict[str, List[str]]) -> str:
+    raw = repr(sorted((level, list(items)) for level, items in patterns.items()))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
 
 
 class TextAnalyzer:
-    def __init__(self):
-        self.russian_stopwords = set(stopwords.words("russian"))
+    def __init__(self, memo: Optional[AnalysisMemo] = None):
+        self.memo = memo if memo is not None else get_analysis_memo()
+        # Общий для всех анализаторов набор, без загрузки из сети
+        self.russian_stopwords = get_russian_stopwords()
         self.difficulty_patterns = {
             "beginner": [
                 r"для начинающих",
@@ -58,19 +324,47 @@ class TextAnalyzer:
                 r"глубокий",
             ],
         }
+        self._matcher = _DifficultyMatcher(self.difficulty_patterns)
+        self._signature = _patterns_signature(self.difficulty_patterns)
+
+    def _patterns_key(self) -> str:
+        """Подпись шаблонов; если списки поменяли, матчер пересобирается"""
+        if self._matcher.patterns != self.difficulty_patterns:
+            self._matcher = _DifficultyMatcher(self.difficulty_patterns)
+            self._signature = _patterns_signature(self.difficulty_patterns)
+        return self._signature
 
-    def analyze_title(self, title: str) -> Dict:
+    def tokenize(self, text: Text) -> TokenStream:
+        """Разбор текста для всех признаков (готовый разбор возвращается как есть)"""
+        if isinstance(text, TokenStream):
+            return text
+        return TokenStream(text, self.russian_stopwords)
+
+    def analyze_title(self, title: Text) -> Dict:
         """Анализирует заголовок видео и определяет сложность"""
-        title_lower = title.lower()
+        # Для сложности нужен только текст в нижнем регистре - без разбора на слова
+        title_lower = title.lower if isinstance(title, TokenStream) else title.lower()
+        key = (
+            ANALYZER_VERSION,
+            "title",
+            self._patterns_key(),
+            _text_digest(title_lower),
+        )
+        return dict(
+            self.memo.get_or_compute(key, lambda: self._analyze_title(title_lower))
+        )
 
+    def _analyze_title(self, title_lower: str) -> Dict:
         scores = {"beginner": 0, "intermediate": 0, "advanced": 0}
 
-        for difficulty, patterns in self.difficulty_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, title_lower):
-                    scores[difficulty] += 1
+        # Один проход по заголовку вместо re.search на каждый шаблон
+        for difficulty, count in self._matcher.count(title_lower).items():
+            scores[difficulty] += count
+
+        return self._difficulty(scores)
 
-        # Определяем общую сложность
+    def _difficulty(self, scores: Dict[str, int]) -> Dict:
+        """Уровень с наибольшим числом совпадений (при равенстве - более простой)"""
         max_score = max(scores.values())
         if max_score == 0:
             return {"difficulty": "unknown", "confidence": 0}
@@ -80,27 +374,29 @@ class TextAnalyzer:
                 confidence = score / 3
                 return {"difficulty": difficulty, "confidence": confidence}
 
-    def extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
+    def extract_keywords(self, text: Text, max_keywords: int = 10) -> List[str]:
         """Извлекает ключевые слова из текста"""
-        words = re.findall(r"\b[а-яёa-z]{3,}\b", text.lower())
-        filtered_words = [w for w in words if w not in self.russian_stopwords]
+        text_lower = text.lower if isinstance(text, TokenStream) else text.lower()
+        key = (ANALYZER_VERSION, "keywords", max_keywords, _text_digest(text_lower))
+        return list(
+            self.memo.get_or_compute(
+                key, lambda: self._extract_keywords(text, max_keywords)
+            )
+        )
 
-        word_freq = Counter(filtered_words)
+    def _extract_keywords(self, text: Text, max_keywords: int) -> List[str]:
+        word_freq = Counter(self.tokenize(text).keywords())
         return [word for word, _ in word_freq.most_common(max_keywords)]
 
-    def calculate_readability_score(self, text: str) -> float:
+    def calculate_readability_score(self, text: Text) -> float:
         """Рассчитывает простоту текста (чем выше, тем проще)"""
-        sentences = re.split(r"[.!?]+", text)
-        all_words = re.findall(r"\b\w+\b", text.lower())
+        stream = self.tokenize(text)
+        meaningful_words = stream.meaningful_words()
 
-        meaningful_words = [
-            w for w in all_words if w not in self.russian_stopwords and len(w) >= 2
-        ]
-
-        if len(sentences) == 0 or len(meaningful_words) == 0:
+        if len(meaningful_words) == 0:
             return 0.5
 
-        avg_sentence_length = len(meaningful_words) / len(sentences)
+        avg_sentence_length = len(meaningful_words) / stream.sentence_count
         unique_words = len(set(meaningful_words))
 
         # короткие предложения + мало уникальных слов = проще
@@ -120,3 +416,124 @@ class TextAnalyzer:
             uniqueness_score = 0.3
 
         return (sentence_score + uniqueness_score) / 2
+
+    # ==================== ПАКЕТНЫЙ АНАЛИЗ ====================
+
+    def analyze_batch(
+        self,
+        texts: Sequence[Text],
+        vocabulary: Optional[Sequence[str]] = None,
+        readability: bool = True,
+        keywords: bool = True,
+    ) -> Dict:
+        """Анализ списка текстов за один проход, каждый текст разбирается один раз.
+
+        Возвращает массивы NumPy длиной len(texts): difficulty (код уровня,
+        индекс в DIFFICULTY_LEVELS), confidence, readability; keywords -
+        разреженная матрица частот ключевых слов (строка на текст) и vocabulary -
+        слова ее столбцов. Если vocabulary передан, остальные слова не считаются.
+        readability=False и keywords=False убирают эти ключи из ответа; без них
+        тексты не разбираются на слова, сложность считается по всем сразу.
+        """
+        result = self._difficulty_batch(
+            [
+                text.lower if isinstance(text, TokenStream) else text.lower()
+                for text in texts
+            ]
+        )
+        if not readability and not keywords:
+            return result
+
+        count = len(texts)
+        scores = np.zeros(count, dtype=np.float64)
+
+        fixed = vocabulary is not None
+        columns = {word: i for i, word in enumerate(vocabulary or [])}
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+
+        for i, text in enumerate(texts):
+            stream = self.tokenize(text)
+            if readability:
+                scores[i] = self.calculate_readability_score(stream)
+            if not keywords:
+                continue
+
+            for word, freq in Counter(stream.keywords()).items():
+                column = columns.get(word)
+                if column is None:
+                    if fixed:
+                        continue
+                    column = columns[word] = len(columns)
+                indices.append(column)
+                data.append(freq)
+            indptr.append(len(indices))
+
+        if readability:
+            result["readability"] = scores
+        if keywords:
+            # scipy нужен только матрице ключевых слов
+            from scipy import sparse
+
+            result["keywords"] = sparse.csr_matrix(
+                (
+                    np.array(data, dtype=np.int32),
+                    np.array(indices, dtype=np.int32),
+                    np.array(indptr, dtype=np.int32),
+                ),
+                shape=(count, len(columns)),
+            )
+            result["vocabulary"] = list(columns)
+        return result
+
+    def _difficulty_batch(self, texts_lower: List[str]) -> Dict:
+        """Уровень и уверенность для всех текстов, как у analyze_title.
+
+        Записи кэша общие с analyze_title; один проход регулярного выражения
+        делается только по текстам, которых в кэше нет.
+        """
+        signature = self._patterns_key()
+        keys = [
+            (ANALYZER_VERSION, "title", signature, _text_digest(text))
+            for text in texts_lower
+        ]
+        analyses = self.memo.get_many(keys)
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if missing:
+            counts = self._matcher.count_batch([texts_lower[i] for i in missing])
+            levels = list(self._matcher.patterns)
+            best = counts.max(axis=1, initial=0).tolist()
+            # argmax берет первый из равных - более простой уровень, как _difficulty
+            strongest = counts.argmax(axis=1).tolist() if len(counts) else []
+            computed = []
+            for i, score, level in zip(missing, best, strongest):
+                analyses[i] = (
+                    {"difficulty": levels[level], "confidence": score / 3}
+                    if score
+                    else {"difficulty": "unknown", "confidence": 0}
+                )
+                computed.append((keys[i], analyses[i]))
+            self.memo.set_many(computed)
+
+        codes = {level: i for i, level in enumerate(DIFFICULTY_LEVELS)}
+        return {
+            "difficulty": np.array(
+                [codes[analysis["difficulty"]] for analysis in analyses],
+                dtype=np.int8,
+            ),
+            "confidence": np.array(
+                [analysis["confidence"] for analysis in analyses], dtype=np.float64
+            ),
+        }
+
+    def top_keywords(
+        self, keywords, vocabulary: Sequence[str], row: int, n: int
+    ) -> List[str]:
+        """Ключевые слова строки матрицы analyze_batch, как у extract_keywords"""
+        start, end = keywords.indptr[row], keywords.indptr[row + 1]
+        columns = keywords.indices[start:end]
+        freqs = keywords.data[start:end]
+        # Стабильная сортировка: при равной частоте - порядок первого появления
+        order = np.argsort(-freqs, kind="stable")[:n]
+        return [vocabulary[columns[i]] for i in order]
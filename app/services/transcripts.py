@@ -0,0 +1,189 @@
+import gzip
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Protocol
+
+import requests
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class TranscriptClient(Protocol):
+    """Источник субтитров: текст видео или None, если субтитров нет"""
+
+    def fetch(self, video_id: str) -> Optional[str]: ...
+
+
+class _TimeoutSession(requests.Session):
+    """requests.Session с таймаутом по умолчанию для каждого запроса"""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class YouTubeTranscriptClient:
+    """Субтитры через youtube-transcript-api"""
+
+    def __init__(self, languages: Optional[List[str]] = None, timeout: float = None):
+        self.languages = languages or [
+            language.strip()
+            for language in settings.TRANSCRIPT_LANGUAGES.split(",")
+            if language.strip()
+        ]
+        self.timeout = timeout or settings.TRANSCRIPT_TIMEOUT
+
+    def fetch(self, video_id: str) -> Optional[str]:
+        from youtube_transcript_api import CouldNotRetrieveTranscript
+        from youtube_transcript_api._transcripts import TranscriptListFetcher
+
+        with _TimeoutSession(self.timeout) as http_client:
+            try:
+                transcripts = TranscriptListFetcher(http_client).fetch(video_id)
+                parts = transcripts.find_transcript(self.languages).fetch()
+            except CouldNotRetrieveTranscript:
+                # Субтитры выключены или нет нужного языка - это не ошибка
+                return None
+        return " ".join(part["text"].replace("\n", " ") for part in parts)
+
+
+class TranscriptStore:
+    """Субтитры на диске в gzip, один файл на видео.
+
+    Видео без субтитров сохраняются пустым файлом, чтобы не запрашивать их снова.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or settings.TRANSCRIPTS_DIR
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Текст субтитров, "" - если их нет, None - если еще не загружали"""
+        path = self._path(video_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:
+            logger.warning(f"Broken transcript file {path}: {e}")
+            return None
+
+    def set(self, video_id: str, text: Optional[str]):
+        path = self._path(video_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Пишем во временный файл, чтобы параллельные воркеры не читали половину
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text or "")
+        os.replace(tmp_path, path)
+
+    def _path(self, video_id: str) -> str:
+        if not _VIDEO_ID.match(video_id):
+            raise ValueError(f"Некорректный ID видео: {video_id}")
+        return os.path.join(self.directory, video_id[:2], f"{video_id}.txt.gz")
+
+
+class TranscriptFetcher:
+    """Параллельная загрузка субтитров с ограничением по времени.
+
+    Загрузка идет в пуле из max_workers потоков. Каждое видео ограничено
+    таймаутом клиента, весь этап - budget секундами: что не успело, пропускается.
+    """
+
+    def __init__(
+        self,
+        client: Optional[TranscriptClient] = None,
+        store: Optional[TranscriptStore] = None,
+        max_workers: Optional[int] = None,
+        budget: Optional[float] = None,
+    ):
+        self.client = client or YouTubeTranscriptClient()
+        self.store = store or TranscriptStore()
+        self.max_workers = max_workers or settings.TRANSCRIPT_MAX_WORKERS
+        self.budget = settings.TRANSCRIPT_BUDGET if budget is None else budget
+
+    def fetch_many(
+        self, video_ids: List[str], budget: Optional[float] = None
+    ) -> Dict[str, str]:
+        """Субтитры для видео, которые удалось получить (из кэша или сети).
+
+        budget - секунд на этот вызов (по умолчанию self.budget).
+        """
+        if budget is None:
+            budget = self.budget
+        transcripts = {}
+        missing = []
+        for video_id in dict.fromkeys(video_ids):
+            text = self.store.get(video_id)
+            if text is None:
+                missing.append(video_id)
+            elif text:
+                transcripts[video_id] = text
+
+        if not missing or budget <= 0:
+            return transcripts
+
+        deadline = time.monotonic() + budget
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(missing)),
+            thread_name_prefix="transcripts",
+        )
+        try:
+            pending = {
+                executor.submit(self._fetch_one, video_id): video_id
+                for video_id in missing
+            }
+            while pending:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    logger.info(
+                        f"Transcript budget exhausted, skipped {len(pending)} videos"
+                    )
+                    break
+                done, _ = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                for future in done:
+                    video_id = pending.pop(future)
+                    text = future.result()
+                    if text:
+                        transcripts[video_id] = text
+        finally:
+            # Не ждем зависшие загрузки: генерация курса идет дальше
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return transcripts
+
+    def _fetch_one(self, video_id: str) -> Optional[str]:
+        try:
+            text = self.client.fetch(video_id)
+        except Exception as e:
+            # Сетевые ошибки не кэшируем - в следующий раз попробуем снова
+            logger.warning(f"Transcript fetch failed for {video_id}: {e}")
+            return None
+        try:
+            self.store.set(video_id, text)
+        except OSError as e:
+            logger.warning(f"Transcript store failed for {video_id}: {e}")
+        return text
+
+
+_fetcher: Optional[TranscriptFetcher] = None
+
+
+def get_transcript_fetcher() -> TranscriptFetcher:
+    """Общий загрузчик субтитров процесса"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = TranscriptFetcher()
+    return _fetcher
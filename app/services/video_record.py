@@ -0,0 +1,160 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Поля видео на пути YouTubeService -> SmartVideoSorter -> CourseGenerator
+FIELDS = (
+    # search.list / playlistItems.list
+    "id",
+    "title",
+    "description",
+    "channel",
+    "channel_id",
+    "url",
+    "thumbnail",
+    "published_at",
+    # videos.list
+    "duration",
+    "view_count",
+    "like_count",
+    # признаки, которые дописывает генератор курса
+    "channel_score",
+    "readability",
+    "transcript",
+    "fingerprint",
+    # разметка сортировщика
+    "order",
+    "estimated_difficulty",
+    "module_topic",
+)
+_FIELDS = frozenset(FIELDS)
+
+# Значение незаданного поля: чтение отсутствующего слота стоило бы исключения
+_MISSING = object()
+
+
+class VideoRecord(MutableMapping):
+    """Видео-кандидат: известные поля в __slots__, остальное - в отдельном словаре.
+
+    Снаружи ведет себя как словарь (video["title"], get, in, update, ==),
+    поэтому код, написанный под словари, работает без изменений. Незаданное
+    поле отсутствует, как отсутствующий ключ: get возвращает значение
+    по умолчанию, [] - KeyError. Запись заметно меньше словаря с теми же
+    ключами, а поле читается как атрибут (video.title) без поиска по хэшу.
+    """
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Dict] = None, **fields):
+        for field in FIELDS:
+            setattr(self, field, _MISSING)
+        self._extra = None
+        self.update(data or (), **fields)
+
+    def update(self, data=(), **fields):
+        # Быстрее общего MutableMapping.update: без __setitem__ на каждый ключ
+        items = data.items() if isinstance(data, Mapping) else data
+        for source in (items, fields.items()):
+            for key, value in source:
+                if key in _FIELDS:
+                    setattr(self, key, value)
+                else:
+                    if self._extra is None:
+                        self._extra = {}
+                    self._extra[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VideoRecord":
+        """Запись из словаря (запись возвращается как есть)"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Обычный словарь - для JSON, кэша и внешнего кода"""
+        return dict(self.items())
+
+    def copy(self) -> "VideoRecord":
+        return VideoRecord(self)
+
+    def __getitem__(self, key: str):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value):
+        if key in _FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _FIELDS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default=None):
+        # Без __getitem__ и исключений: get - самый частый вызов в сортировщике
+        if key in _FIELDS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"VideoRecord({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state)
+
+
+def as_records(videos: Iterable[Dict]) -> List[VideoRecord]:
+    """Список записей из словарей или записей"""
+    return [VideoRecord.from_dict(video) for video in videos]
+
+
+def field_values(videos: Iterable[Dict], field: str, default=None) -> List:
+    """Значения одного поля у списка видео (записей или словарей).
+
+    У записи известное поле читается как атрибут, без вызова get.
+    """
+    if field not in _FIELDS:
+        return [video.get(field, default) for video in videos]
+    values = []
+    for video in videos:
+        if type(video) is VideoRecord:
+            value = getattr(video, field)
+            values.append(default if value is _MISSING else value)
+        else:
+            values.append(video.get(field, default))
+    return values
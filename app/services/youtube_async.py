@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+# videos.list принимает не больше 50 ID за один запрос
+VIDEOS_BATCH_SIZE = 50
+
+# Причины ошибок 403, означающие исчерпанную дневную квоту
+QUOTA_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+
+
+class YouTubeAPIError(Exception):
+    """Ошибка ответа YouTube Data API"""
+
+    def __init__(self, status: int, reason: str = "", message: str = ""):
+        self.status = status
+        self.reason = reason
+        super().__init__(f"YouTube API {status} {reason}: {message}".strip())
+
+
+class AsyncYouTubeClient:
+    """Асинхронный клиент YouTube Data API на aiohttp с общим пулом соединений"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = (base_url or settings.YOUTUBE_API_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.YOUTUBE_MAX_CONCURRENCY
+        self.timeout = timeout or settings.YOUTUBE_HTTP_TIMEOUT
+        # aiohttp-сессия и семафор привязаны к event loop, поэтому храним их по циклам
+        self._states = weakref.WeakKeyDictionary()
+
+    async def request(self, resource: str, **params) -> Dict:
+        """GET {base_url}/{resource} с ключом API, ответ в виде словаря"""
+        session, semaphore = self._state()
+        params = {key: str(value) for key, value in params.items() if value is not None}
+        params["key"] = self.api_key
+
+        async with semaphore:
+            async with session.get(
+                f"{self.base_url}/{resource}", params=params
+            ) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status != 200:
+                    error = (data or {}).get("error", {})
+                    reasons = error.get("errors") or [{}]
+                    raise YouTubeAPIError(
+                        resp.status,
+                        reasons[0].get("reason", ""),
+                        error.get("message", ""),
+                    )
+                return data
+
+    async def search(self, query: str, **params) -> Dict:
+        """search.list"""
+        return await self.request("search", q=query, **params)
+
+    async def videos(self, video_ids: List[str]) -> List[Dict]:
+        """videos.list для любого числа ID: пачки по 50 идут параллельно"""
+        batches = [
+            video_ids[start : start + VIDEOS_BATCH_SIZE]
+            for start in range(0, len(video_ids), VIDEOS_BATCH_SIZE)
+        ]
+        responses = await asyncio.gather(
+            *(
+                self.request("videos", part="contentDetails,statistics", id=",".join(b))
+                for b in batches
+            ),
+            return_exceptions=True,
+        )
+
+        items = []
+        for response in responses:
+            if (
+                isinstance(response, YouTubeAPIError)
+                and response.reason in QUOTA_REASONS
+            ):
+                raise response
+            if isinstance(response, Exception):
+                # Пачка не загрузилась - видео этой пачки останутся без деталей
+                print(f"YouTube API error (videos.list): {response}")
+                continue
+            items.extend(response.get("items", []))
+        return items
+
+    async def close(self):
+        """Закрывает сессию текущего event loop"""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state:
+            await state[0].close()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None or state[0].closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency, keepalive_timeout=60
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            state = (session, asyncio.Semaphore(self.max_concurrency))
+            self._states[loop] = state
+        return state
+
+
+_clients: Dict[str, AsyncYouTubeClient] = {}
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_async_client(api_key: str) -> AsyncYouTubeClient:
+    """Один клиент (и пул соединений) на процесс для каждого ключа API"""
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = AsyncYouTubeClient(api_key)
+    return client
+
+
+def run_sync(coro):
+    """Выполняет корутину в фоновом event loop процесса.
+
+    Цикл живет весь процесс, поэтому keep-alive соединения переиспользуются
+    между вызовами из синхронного кода (Celery задачи).
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="youtube-async-loop", daemon=True
+            ).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
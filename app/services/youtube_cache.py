@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import YouTubeCacheEntry, YouTubeCacheStat
+
+logger = logging.getLogger(__name__)
+
+
+class YouTubeCache:
+    """Кэш ответов YouTube API в таблице БД: переживает перезапуск воркеров"""
+
+    SEARCH = "search"
+    VIDEO = "video"
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        search_ttl: Optional[int] = None,
+        video_ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.ttl = {
+            self.SEARCH: search_ttl or settings.YOUTUBE_SEARCH_CACHE_TTL,
+            self.VIDEO: video_ttl or settings.YOUTUBE_VIDEO_CACHE_TTL,
+        }
+        self.max_entries = max_entries or settings.YOUTUBE_CACHE_MAX_ENTRIES
+
+    # ==================== ПОИСК ====================
+
+    def get_search(self, query: str, params: Dict) -> Optional[List[Dict]]:
+        """Результаты поиска (упорядоченный список сниппетов) или None"""
+        key = self._key(self.SEARCH, [query, params])
+        found = self._get_many(self.SEARCH, [key])
+        return found.get(key)
+
+    def set_search(self, query: str, params: Dict, snippets: List[Dict]):
+        """Сохраняет результаты поиска в исходном порядке"""
+        key = self._key(self.SEARCH, [query, params])
+        self._set_many(self.SEARCH, {key: snippets})
+
+    # ==================== ДЕТАЛИ ВИДЕО ====================
+
+    def get_videos(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Детали (длительность, просмотры, лайки) для тех видео, что есть в кэше"""
+        keys = {self._key(self.VIDEO, video_id): video_id for video_id in video_ids}
+        found = self._get_many(self.VIDEO, list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    def set_videos(self, details: Dict[str, Dict]):
+        """Сохраняет детали видео по их ID"""
+        self._set_many(
+            self.VIDEO,
+            {
+                self._key(self.VIDEO, video_id): value
+                for video_id, value in details.items()
+            },
+        )
+
+    # ==================== СТАТИСТИКА ====================
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Счетчики попаданий и промахов по видам записей"""
+        stats = {
+            kind: {"hits": 0, "misses": 0, "hit_rate": 0.0}
+            for kind in (self.SEARCH, self.VIDEO)
+        }
+        db = self.session_factory()
+        try:
+            for stat in db.query(YouTubeCacheStat).all():
+                total = stat.hits + stat.misses
+                stats[stat.kind] = {
+                    "hits": stat.hits,
+                    "misses": stat.misses,
+                    "hit_rate": round(stat.hits / total, 3) if total else 0.0,
+                }
+        except Exception as e:
+            logger.warning(f"YouTube cache stats unavailable: {e}")
+        finally:
+            db.close()
+        return stats
+
+    # ==================== ВНУТРЕННЕЕ ====================
+
+    def _key(self, kind: str, payload) -> str:
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _get_many(self, kind: str, keys: List[str]) -> Dict[str, object]:
+        if not keys:
+            return {}
+
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            entries = (
+                db.query(YouTubeCacheEntry)
+                .filter(
+                    YouTubeCacheEntry.key.in_(keys),
+                    YouTubeCacheEntry.expires_at > now,
+                )
+                .all()
+            )
+            for entry in entries:
+                entry.last_accessed_at = now
+
+            self._count(db, kind, hits=len(entries), misses=len(keys) - len(entries))
+            db.commit()
+            return {entry.key: entry.value for entry in entries}
+        except Exception as e:
+            # Кэш - только ускорение, его сбой не должен ломать поиск
+            logger.warning(f"YouTube cache read failed: {e}")
+            db.rollback()
+            return {}
+        finally:
+            db.close()
+
+    def _set_many(self, kind: str, values: Dict[str, object]):
+        if not values:
+            return
+
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=self.ttl[kind])
+        db = self.session_factory()
+        try:
+            existing = {
+                entry.key: entry
+                for entry in db.query(YouTubeCacheEntry)
+                .filter(YouTubeCacheEntry.key.in_(list(values)))
+                .all()
+            }
+            for key, value in values.items():
+                entry = existing.get(key)
+                if entry is None:
+                    entry = YouTubeCacheEntry(key=key, kind=kind, created_at=now)
+                    db.add(entry)
+                entry.value = value
+                entry.expires_at = expires_at
+                entry.last_accessed_at = now
+
+            db.flush()
+            self._evict(db, kind, now)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"YouTube cache write failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _evict(self, db, kind: str, now: datetime):
+        """Удаляет просроченные записи и самые давно использованные сверх лимита"""
+        db.query(YouTubeCacheEntry).filter(
+            YouTubeCacheEntry.kind == kind, YouTubeCacheEntry.expires_at <= now
+        ).delete(synchronize_session=False)
+
+        count = (
+            db.query(YouTubeCacheEntry).filter(YouTubeCacheEntry.kind == kind).count()
+        )
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+
+        stale_ids = [
+            row.id
+            for row in db.query(YouTubeCacheEntry.id)
+            .filter(YouTubeCacheEntry.kind == kind)
+            .order_by(YouTubeCacheEntry.last_accessed_at, YouTubeCacheEntry.id)
+            .limit(overflow)
+        ]
+        db.query(YouTubeCacheEntry).filter(YouTubeCacheEntry.id.in_(stale_ids)).delete(
+            synchronize_session=False
+        )
+
+    def _count(self, db, kind: str, hits: int, misses: int):
+        stat = db.query(YouTubeCacheStat).filter(YouTubeCacheStat.kind == kind).first()
+        if stat is None:
+            stat = YouTubeCacheStat(kind=kind, hits=0, misses=0)
+            db.add(stat)
+        stat.hits += hits
+        stat.misses += misses
@@ -1,93 +1,802 @@
-from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 
 import isodate
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 from app.core.config import settings
+from app.services.quota import (
+    ENDPOINT_COSTS,
+    QuotaExceededError,
+    QuotaScheduler,
+    get_quota_scheduler,
+)
+from app.services.singleflight import get_singleflight
+from app.services.video_record import VideoRecord
+from app.services.youtube_async import (
+    QUOTA_REASONS,
+    VIDEOS_BATCH_SIZE,
+    YouTubeAPIError,
+    get_async_client,
+    run_sync,
+)
+from app.services.youtube_cache import YouTubeCache
+
+# search.list отдает не больше 50 результатов на страницу
+SEARCH_PAGE_LIMIT = 50
+
+# Функция: список ID -> уже известные детали этих видео
+DetailsLookup = Callable[[List[str]], Dict[str, Dict]]
+# Функция, которой сообщают ID видео с деталями, только что полученными из videos.list
+FetchedCallback = Callable[[List[str]], None]
+
+# ID плейлиста: параметр list= в ссылке или сам ID
+_PLAYLIST_ID = re.compile(r"^[A-Za-z0-9_-]{10,64}$")
+
+# Элементы плейлиста, у которых нет доступного видео
+UNAVAILABLE_TITLES = ("Deleted video", "Private video")
+
+
+def parse_playlist_id(value: str) -> Optional[str]:
+    """ID плейлиста из ссылки YouTube (или из самого ID); None - если не похоже"""
+    value = (value or "").strip()
+    if "list=" in value:
+        value = parse_qs(urlparse(value).query).get("list", [""])[0]
+    return value if _PLAYLIST_ID.match(value) else None
+
+
+_youtube_clients: Dict[Tuple[str, str], object] = {}
+_youtube_clients_lock = threading.Lock()
+_service: Optional["YouTubeService"] = None
+
+
+def get_youtube_client(api_key: str):
+    """Клиент googleapiclient, собранный один раз на процесс.
+
+    Документ discovery берется из копии, которая поставляется вместе с
+    google-api-python-client (static_discovery), поэтому сборка не ходит в сеть.
+    Адрес API берется из YOUTUBE_API_BASE_URL (например, локальный заменитель).
+    """
+    # Пути методов в документе discovery уже начинаются с youtube/v3/
+    api_endpoint = settings.YOUTUBE_API_BASE_URL.rstrip("/")
+    api_endpoint = api_endpoint.removesuffix("youtube/v3").rstrip("/") + "/"
+    key = (api_key, api_endpoint)
+    client = _youtube_clients.get(key)
+    if client is None:
+        with _youtube_clients_lock:
+            client = _youtube_clients.get(key)
+            if client is None:
+                client = build(
+                    "youtube",
+                    "v3",
+                    developerKey=api_key,
+                    static_discovery=True,
+                    cache_discovery=False,
+                    client_options={"api_endpoint": api_endpoint},
+                )
+                _youtube_clients[key] = client
+    return client
+
+
+def get_youtube_service() -> "YouTubeService":
+    """Общий YouTubeService процесса (для Celery задач)"""
+    global _service
+    if _service is None:
+        _service = YouTubeService()
+    return _service
 
 
 class YouTubeService:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[YouTubeCache] = None,
+        quota: Optional[QuotaScheduler] = None,
+    ):
         self.api_key = settings.YOUTUBE_API_KEY
         if self.api_key:
-            self.youtube = build("youtube", "v3", developerKey=self.api_key)
+            self.youtube = get_youtube_client(self.api_key)
+
+        if cache is None and settings.YOUTUBE_CACHE_ENABLED:
+            cache = YouTubeCache()
+        self.cache = cache
+
+        # Все вызовы API проходят через планировщик квоты
+        if quota is None and settings.YOUTUBE_QUOTA_ENABLED:
+            quota = get_quota_scheduler()
+        self.quota = quota
+
+        # Одинаковые одновременные запросы к API выполняются один раз
+        self.singleflight = get_singleflight()
+
+        # httplib2 не потокобезопасен: потоки параллельного поиска берут свой Http
+        self._local = threading.local()
 
-    def search_videos(self, query: str, max_results: int = 20) -> List[Dict]:
-        """Поиск видео на YouTube, у google API свои методы... не get,post..."""
+        # Асинхронный клиент на aiohttp (общий пул соединений на процесс)
+        self.async_client = None
+        if self.api_key and settings.YOUTUBE_ASYNC_CLIENT:
+            self.async_client = get_async_client(self.api_key)
+
+    def search_videos(
+        self,
+        query: str,
+        max_results: int = 20,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> List[VideoRecord]:
+        """Поиск видео на YouTube, у google API свои методы... не get,post...
+
+        known_details - функция, которая по списку ID отдает уже известные
+        детали (например, из каталога видео), для них videos.list не вызывается.
+        on_fetched получает ID видео, детали которых пришли из videos.list, а не
+        из каталога или кэша.
+        """
         if not self.api_key:
             return self._get_mock_videos(query, max_results)
 
-        try:
-            search_response = (
-                self.youtube.search()
-                .list(
-                    q=query,
-                    part="snippet",
-                    type="video",
-                    maxResults=max_results,
-                    order="relevance",
-                    videoDuration="medium",
-                    relevanceLanguage="ru",
-                )
-                .execute()
+        if self.async_client is not None:
+            return run_sync(
+                self.search_videos_async(query, max_results, known_details, on_fetched)
             )
 
-            videos = []
-            for item in search_response.get("items", []):
-                video_id = item["id"]["videoId"]
-                video_data = {
-                    "id": video_id,
-                    "title": item["snippet"]["title"],
-                    "description": item["snippet"]["description"][:300],
-                    "channel": item["snippet"]["channelTitle"],
-                    "url": f"https://youtube.com/watch?v={video_id}",
-                    "thumbnail": item["snippet"]["thumbnails"]["high"]["url"],
-                    "published_at": item["snippet"]["publishedAt"],
-                }
+        try:
+            params = self._search_params(max_results)
+            videos, _ = self._fetch_page(query, params, None, known_details, on_fetched)
+            return videos
 
-                details = self._get_video_details(video_id)
-                if details:
-                    video_data.update(details)
+        except QuotaExceededError:
+            # Без квоты честно отказываем, а не подсовываем моковые уроки
+            raise
+        except Exception as e:
+            print(f"YouTube API error: {e}")
+            return self._get_mock_videos(query, max_results)
 
-                videos.append(video_data)
+    async def search_videos_async(
+        self,
+        query: str,
+        max_results: int = 20,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> List[VideoRecord]:
+        """То же, что search_videos, но через асинхронный клиент на aiohttp"""
+        if not self.api_key:
+            return self._get_mock_videos(query, max_results)
 
+        client = self.async_client or get_async_client(self.api_key)
+        try:
+            params = self._search_params(max_results)
+            videos, _ = await self._fetch_page_async(
+                client, query, params, None, known_details, on_fetched
+            )
             return videos
 
+        except QuotaExceededError:
+            raise
         except Exception as e:
             print(f"YouTube API error: {e}")
             return self._get_mock_videos(query, max_results)
 
-    def _get_video_details(self, video_id: str) -> Optional[Dict]:
-        """Получение деталей видео"""
+    def iter_search_videos(
+        self,
+        query: str,
+        max_results: int = 100,
+        page_size: int = 50,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> Iterator[VideoRecord]:
+        """Постраничный поиск: идет по nextPageToken и отдает видео по мере загрузки.
+
+        Следующая страница запрашивается, только когда вызывающий код дочитал
+        предыдущую, поэтому остановка итерации экономит квоту и память.
+        """
+        if not self.api_key:
+            yield from self._get_mock_videos(query, max_results)
+            return
+
+        params = self._search_params(min(page_size, max_results, SEARCH_PAGE_LIMIT))
+        page_token = None
+        yielded = 0
+
+        while yielded < max_results:
+            try:
+                if self.async_client is not None:
+                    videos, page_token = run_sync(
+                        self._fetch_page_async(
+                            self.async_client,
+                            query,
+                            params,
+                            page_token,
+                            known_details,
+                            on_fetched,
+                        )
+                    )
+                else:
+                    videos, page_token = self._fetch_page(
+                        query, params, page_token, known_details, on_fetched
+                    )
+            except QuotaExceededError:
+                if not yielded:
+                    raise
+                print("YouTube API quota exhausted, stopping pagination")
+                return
+            except Exception as e:
+                print(f"YouTube API error: {e}")
+                if not yielded:
+                    yield from self._get_mock_videos(query, max_results)
+                return
+
+            for video in videos[: max_results - yielded]:
+                yield video
+                yielded += 1
+
+            if not page_token or not videos:
+                return
+
+    def get_playlist_videos(
+        self,
+        playlist_id: str,
+        max_results: int = 200,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> List[VideoRecord]:
+        """Видео плейлиста в авторском порядке.
+
+        playlistItems.list стоит 1 единицу квоты за страницу из 50 элементов
+        (против 100 у search.list), детали запрашиваются пачками по странице.
+        """
+        if not self.api_key:
+            return []
+
+        videos = []
+        seen = set()
+        page_token = None
+        while len(videos) < max_results:
+            try:
+                response = self._execute(
+                    "playlistItems.list",
+                    self.youtube.playlistItems().list(
+                        part="snippet,contentDetails",
+                        playlistId=playlist_id,
+                        maxResults=SEARCH_PAGE_LIMIT,
+                        pageToken=page_token,
+                    ),
+                )
+            except QuotaExceededError:
+                if not videos:
+                    raise
+                print("YouTube API quota exhausted, playlist truncated")
+                break
+            except HttpError as e:
+                if not videos:
+                    if e.resp.status == 404:
+                        raise ValueError(f"Плейлист не найден: {playlist_id}")
+                    raise
+                print(f"YouTube API error (playlistItems.list): {e}")
+                break
+
+            page = []
+            for item in response.get("items", []):
+                video = self._parse_playlist_item(item)
+                if video is not None and video["id"] not in seen:
+                    seen.add(video["id"])
+                    page.append(video)
+            page = page[: max_results - len(videos)]
+
+            details = self._get_videos_details(
+                [v["id"] for v in page], known_details, on_fetched=on_fetched
+            )
+            videos.extend(self._merge_details(page, details))
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        return videos
+
+    def get_playlist_info(self, playlist_id: str) -> Optional[Dict]:
+        """Название и автор плейлиста (playlists.list, 1 единица квоты)"""
+        if not self.api_key:
+            return None
         try:
-            response = (
-                self.youtube.videos()
-                .list(part="contentDetails,statistics", id=video_id)
-                .execute()
+            response = self._execute(
+                "playlists.list",
+                self.youtube.playlists().list(part="snippet", id=playlist_id),
             )
+        except QuotaExceededError:
+            raise
+        except Exception as e:
+            print(f"YouTube API error (playlists.list): {e}")
+            return None
 
-            if response["items"]:
-                item = response["items"][0]
+        items = response.get("items", [])
+        if not items:
+            return None
+        snippet = items[0]["snippet"]
+        return {
+            "title": snippet.get("title", ""),
+            "channel": snippet.get("channelTitle", ""),
+            "description": snippet.get("description", ""),
+        }
 
-                duration = 0
-                if "contentDetails" in item:
-                    duration_str = item["contentDetails"]["duration"]
-                    duration = self._parse_duration(duration_str)
+    def estimate_playlist_cost(self, max_results: int) -> int:
+        """Сколько единиц квоты стоит чтение плейлиста (без учета кэша)"""
+        pages = -(-max_results // SEARCH_PAGE_LIMIT)
+        return (
+            ENDPOINT_COSTS["playlists.list"]
+            + ENDPOINT_COSTS["playlistItems.list"] * pages
+            + ENDPOINT_COSTS["videos.list"] * pages
+        )
 
-                view_count = 0
-                like_count = 0
-                if "statistics" in item:
-                    view_count = int(item["statistics"].get("viewCount", 0))
-                    like_count = int(item["statistics"].get("likeCount", 0))
+    def search_many(
+        self,
+        queries: List[str],
+        max_results: int = 20,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> List[VideoRecord]:
+        """Параллельный поиск по нескольким запросам.
 
-                return {
-                    "duration": duration,
-                    "view_count": view_count,
-                    "like_count": like_count,
-                }
+        Выдачи сливаются по очереди (первый результат каждого запроса, потом
+        второй...) без повторов по ID, детали запрашиваются один раз на весь набор.
+        """
+        if not self.api_key:
+            return self._merge_results(
+                [self._get_mock_videos(query, max_results) for query in queries]
+            )
+
+        params = self._search_params(min(max_results, SEARCH_PAGE_LIMIT))
+        try:
+            if self.async_client is not None:
+                return run_sync(
+                    self._search_many_async(
+                        self.async_client, queries, params, known_details, on_fetched
+                    )
+                )
+
+            workers = max(1, min(len(queries), settings.YOUTUBE_MAX_CONCURRENCY))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages = list(
+                    executor.map(
+                        lambda query: self._search_page_in_thread(query, params),
+                        queries,
+                    )
+                )
+
+            videos = self._merge_results(pages)
+            details = self._get_videos_details(
+                [v["id"] for v in videos], known_details, on_fetched=on_fetched
+            )
+            return self._merge_details(videos, details)
+
+        except QuotaExceededError:
+            raise
         except Exception as e:
-            pass
-        return None
+            print(f"YouTube API error: {e}")
+            return self._merge_results(
+                [self._get_mock_videos(query, max_results) for query in queries]
+            )
+
+    async def _search_many_async(
+        self,
+        client,
+        queries: List[str],
+        params: Dict,
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> List[VideoRecord]:
+        pages = await asyncio.gather(
+            *(self._search_page_async(client, query, params, None) for query in queries)
+        )
+        videos = self._merge_results([snippets for snippets, _ in pages])
+        details = await self._get_videos_details_async(
+            client, [v["id"] for v in videos], known_details, on_fetched
+        )
+        return self._merge_details(videos, details)
+
+    def _search_page_in_thread(self, query: str, params: Dict) -> List[Dict]:
+        if getattr(self._local, "http", None) is None:
+            self._local.http = build_http()
+        snippets, _ = self._search_page(query, params, None)
+        return snippets
+
+    def _flight_key(self, kind: str, *payload) -> str:
+        """Ключ склейки одинаковых запросов"""
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return f"youtube:{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _merge_results(self, results: List[List[Dict]]) -> List[VideoRecord]:
+        """Сливает выдачи по очереди, убирая повторы по ID"""
+        merged = {}
+        longest = max((len(videos) for videos in results), default=0)
+        for position in range(longest):
+            for videos in results:
+                if position < len(videos):
+                    video = videos[position]
+                    merged.setdefault(video["id"], VideoRecord(video))
+        return list(merged.values())
+
+    def _fetch_page(
+        self,
+        query: str,
+        params: Dict,
+        page_token: Optional[str],
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> Tuple[List[VideoRecord], Optional[str]]:
+        """Одна страница поиска вместе с деталями видео"""
+        snippets, next_page_token = self._search_page(query, params, page_token)
+        videos = [VideoRecord(snippet) for snippet in snippets]
+
+        # Детали запрашиваем пачками, а не по одному видео
+        details = self._get_videos_details(
+            [v["id"] for v in videos], known_details, on_fetched=on_fetched
+        )
+        return self._merge_details(videos, details), next_page_token
+
+    async def _fetch_page_async(
+        self,
+        client,
+        query: str,
+        params: Dict,
+        page_token: Optional[str],
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> Tuple[List[VideoRecord], Optional[str]]:
+        snippets, next_page_token = await self._search_page_async(
+            client, query, params, page_token
+        )
+        videos = [VideoRecord(snippet) for snippet in snippets]
+        details = await self._get_videos_details_async(
+            client, [v["id"] for v in videos], known_details, on_fetched
+        )
+        return self._merge_details(videos, details), next_page_token
+
+    def _search_page(
+        self, query: str, params: Dict, page_token: Optional[str]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Сниппеты одной страницы search.list и токен следующей"""
+        page_params = dict(params, pageToken=page_token) if page_token else params
+
+        cached = self.cache.get_search(query, page_params) if self.cache else None
+        if cached is not None:
+            return self._unpack_search_page(cached)
+
+        def fetch():
+            search_response = self._execute(
+                "search.list", self.youtube.search().list(q=query, **page_params)
+            )
+            page = self._pack_search_page(search_response)
+            if self.cache:
+                self.cache.set_search(query, page_params, page)
+            return page
+
+        page = self.singleflight.do(
+            self._flight_key("search", query, page_params), fetch
+        )
+        return self._unpack_search_page(page)
+
+    async def _search_page_async(
+        self, client, query: str, params: Dict, page_token: Optional[str]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        page_params = dict(params, pageToken=page_token) if page_token else params
+
+        cached = None
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get_search, query, page_params)
+        if cached is not None:
+            return self._unpack_search_page(cached)
+
+        async def fetch():
+            await self._acquire_async("search.list")
+            search_response = await self._call_async(
+                client.search(query, **page_params)
+            )
+            page = self._pack_search_page(search_response)
+            if self.cache:
+                await asyncio.to_thread(self.cache.set_search, query, page_params, page)
+            return page
+
+        page = await self.singleflight.do_async(
+            self._flight_key("search", query, page_params), fetch
+        )
+        return self._unpack_search_page(page)
+
+    def _pack_search_page(self, search_response: Dict) -> Dict:
+        """Ответ search.list в вид для кэша"""
+        return {
+            "snippets": [
+                self._parse_search_item(item)
+                for item in search_response.get("items", [])
+            ],
+            "next_page_token": search_response.get("nextPageToken"),
+        }
+
+    def _unpack_search_page(self, page) -> Tuple[List[Dict], Optional[str]]:
+        # Старые записи кэша хранили только список сниппетов
+        if isinstance(page, list):
+            return page, None
+        return page["snippets"], page.get("next_page_token")
+
+    def estimate_search_cost(
+        self, max_results: int, page_size: Optional[int] = None
+    ) -> int:
+        """Сколько единиц квоты стоит поиск max_results видео (без учета кэша).
+
+        page_size - размер страницы iter_search_videos: каждая страница стоит
+        свой search.list и свои videos.list.
+        """
+        page_size = min(page_size or max_results, max_results, SEARCH_PAGE_LIMIT)
+        pages = -(-max_results // page_size)
+        batches = -(-page_size // VIDEOS_BATCH_SIZE)
+        return pages * (
+            ENDPOINT_COSTS["search.list"] + ENDPOINT_COSTS["videos.list"] * batches
+        )
+
+    def ensure_quota(self, units: int):
+        """Бросает QuotaExceededError, если дневной квоты не хватит на units"""
+        if self.api_key and self.quota:
+            self.quota.ensure_budget(units)
+
+    def _execute(self, endpoint: str, request) -> Dict:
+        """Выполняет запрос googleapiclient с учетом квоты"""
+        if self.quota:
+            self.quota.acquire(endpoint)
+        try:
+            http = getattr(self._local, "http", None)
+            return request.execute(http=http) if http else request.execute()
+        except HttpError as e:
+            if e.resp.status == 403 and any(
+                reason in str(e.content) for reason in QUOTA_REASONS
+            ):
+                self._quota_exhausted()
+            raise
+
+    async def _acquire_async(self, endpoint: str, calls: int = 1):
+        if self.quota:
+            await asyncio.to_thread(self.quota.acquire, endpoint, calls)
+
+    async def _call_async(self, coro):
+        """Ждет ответ асинхронного клиента, переводя ответ quotaExceeded в ошибку квоты"""
+        try:
+            return await coro
+        except YouTubeAPIError as e:
+            if e.reason in QUOTA_REASONS:
+                await asyncio.to_thread(self._quota_exhausted)
+            raise
+
+    def _quota_exhausted(self):
+        if self.quota:
+            self.quota.mark_exhausted()
+        raise QuotaExceededError("YouTube API ответил: квота исчерпана")
+
+    def _search_params(self, max_results: int) -> Dict:
+        """Параметры search.list (без самого запроса)"""
+        return {
+            "part": "snippet",
+            "type": "video",
+            "maxResults": max_results,
+            "order": "relevance",
+            "videoDuration": "medium",
+            "relevanceLanguage": "ru",
+        }
+
+    def _merge_details(
+        self, videos: List[Dict], details: Dict[str, Dict]
+    ) -> List[Dict]:
+        """Дописывает детали к видео, сохраняя порядок выдачи"""
+        for video_data in videos:
+            if video_data["id"] in details:
+                video_data.update(details[video_data["id"]])
+        return videos
+
+    def _parse_search_item(self, item: Dict) -> Dict:
+        """Превращает элемент search.list в словарь видео"""
+        video_id = item["id"]["videoId"]
+        return {
+            "id": video_id,
+            "title": item["snippet"]["title"],
+            "description": item["snippet"]["description"][:300],
+            "channel": item["snippet"]["channelTitle"],
+            "channel_id": item["snippet"].get("channelId"),
+            "url": f"https://youtube.com/watch?v={video_id}",
+            "thumbnail": item["snippet"]["thumbnails"]["high"]["url"],
+            "published_at": item["snippet"]["publishedAt"],
+        }
+
+    def fetch_channels(self, channel_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Статистика каналов через channels.list пачками по 50 (1 единица за пачку).
+
+        None - канала в ответе нет (удален или скрыт). Каналы пачки, которая
+        не загрузилась, в результат не попадают.
+        """
+        if not self.api_key:
+            return {}
+
+        channels = {}
+        unique_ids = list(dict.fromkeys(channel_ids))
+        for start in range(0, len(unique_ids), VIDEOS_BATCH_SIZE):
+            batch = unique_ids[start : start + VIDEOS_BATCH_SIZE]
+            try:
+                response = self._execute(
+                    "channels.list",
+                    self.youtube.channels().list(
+                        part="snippet,statistics", id=",".join(batch)
+                    ),
+                )
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                print(f"YouTube API error (channels.list): {e}")
+                continue
+
+            channels.update(dict.fromkeys(batch))
+            for item in response.get("items", []):
+                statistics = item.get("statistics", {})
+                channels[item["id"]] = {
+                    "title": item.get("snippet", {}).get("title", ""),
+                    # Скрытое число подписчиков API не отдает
+                    "subscriber_count": int(statistics.get("subscriberCount", 0)),
+                    "video_count": int(statistics.get("videoCount", 0)),
+                    "view_count": int(statistics.get("viewCount", 0)),
+                }
+        return channels
+
+    def fetch_videos_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Свежие детали видео прямо из API, мимо кэша (для фонового обновления)"""
+        if not self.api_key:
+            return {}
+        return self._get_videos_details(video_ids, use_cache=False)
+
+    def _parse_playlist_item(self, item: Dict) -> Optional[VideoRecord]:
+        """Элемент playlistItems.list в запись видео (None - видео недоступно)"""
+        snippet = item.get("snippet", {})
+        video_id = item.get("contentDetails", {}).get("videoId") or snippet.get(
+            "resourceId", {}
+        ).get("videoId")
+        if not video_id or snippet.get("title") in UNAVAILABLE_TITLES:
+            return None
+
+        thumbnails = snippet.get("thumbnails", {})
+        thumbnail = (thumbnails.get("high") or thumbnails.get("default") or {}).get(
+            "url", ""
+        )
+        return VideoRecord(
+            {
+                "id": video_id,
+                "title": snippet.get("title", ""),
+                "description": snippet.get("description", "")[:300],
+                "channel": snippet.get("videoOwnerChannelTitle")
+                or snippet.get("channelTitle", ""),
+                "channel_id": snippet.get("videoOwnerChannelId")
+                or snippet.get("channelId"),
+                "url": f"https://youtube.com/watch?v={video_id}",
+                "thumbnail": thumbnail,
+                "published_at": item.get("contentDetails", {}).get("videoPublishedAt")
+                or snippet.get("publishedAt"),
+            }
+        )
+
+    def _get_videos_details(
+        self,
+        video_ids: List[str],
+        known_details: Optional[DetailsLookup] = None,
+        use_cache: bool = True,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> Dict[str, Dict]:
+        """Получение деталей для списка видео пачками по 50 ID"""
+        unique_ids = list(dict.fromkeys(video_ids))
+        details = known_details(unique_ids) if known_details else {}
+        missing_ids = [video_id for video_id in unique_ids if video_id not in details]
+        if self.cache and use_cache and missing_ids:
+            details.update(self.cache.get_videos(missing_ids))
+        missing_ids = [video_id for video_id in missing_ids if video_id not in details]
+
+        fetched = {}
+        for start in range(0, len(missing_ids), VIDEOS_BATCH_SIZE):
+            batch = missing_ids[start : start + VIDEOS_BATCH_SIZE]
+            try:
+                items = self.singleflight.do(
+                    self._flight_key("videos", batch),
+                    lambda: list(
+                        self._execute(
+                            "videos.list",
+                            self.youtube.videos().list(
+                                part="contentDetails,statistics", id=",".join(batch)
+                            ),
+                        ).get("items", [])
+                    ),
+                )
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                # Пачка не загрузилась - видео этой пачки останутся без деталей
+                print(f"YouTube API error (videos.list): {e}")
+                continue
+
+            for item in items:
+                try:
+                    fetched[item["id"]] = self._parse_video_details(item)
+                except Exception:
+                    # Битый элемент не должен ломать остальные видео пачки
+                    continue
+
+        if fetched and self.cache:
+            self.cache.set_videos(fetched)
+        if fetched and on_fetched:
+            on_fetched(list(fetched))
+
+        details.update(fetched)
+        return details
+
+    async def _get_videos_details_async(
+        self,
+        client,
+        video_ids: List[str],
+        known_details: Optional[DetailsLookup] = None,
+        on_fetched: Optional[FetchedCallback] = None,
+    ) -> Dict[str, Dict]:
+        """Асинхронная версия _get_videos_details: пачки запрашиваются параллельно"""
+        unique_ids = list(dict.fromkeys(video_ids))
+        details = known_details(unique_ids) if known_details else {}
+        missing_ids = [video_id for video_id in unique_ids if video_id not in details]
+        if self.cache and missing_ids:
+            details.update(await asyncio.to_thread(self.cache.get_videos, missing_ids))
+        missing_ids = [video_id for video_id in missing_ids if video_id not in details]
+
+        fetched = {}
+        if missing_ids:
+            batches = -(-len(missing_ids) // VIDEOS_BATCH_SIZE)
+
+            async def fetch():
+                await self._acquire_async("videos.list", batches)
+                return await self._call_async(client.videos(missing_ids))
+
+            items = await self.singleflight.do_async(
+                self._flight_key("videos", missing_ids), fetch
+            )
+            for item in items:
+                try:
+                    fetched[item["id"]] = self._parse_video_details(item)
+                except Exception:
+                    continue
+
+        if fetched and self.cache:
+            await asyncio.to_thread(self.cache.set_videos, fetched)
+        if fetched and on_fetched:
+            on_fetched(list(fetched))
+
+        details.update(fetched)
+        return details
+
+    def _get_video_details(self, video_id: str) -> Optional[Dict]:
+        """Получение деталей видео"""
+        return self._get_videos_details([video_id]).get(video_id)
+
+    def _parse_video_details(self, item: Dict) -> Dict:
+        """Достает длительность и статистику из элемента videos.list"""
+        duration = 0
+        if "contentDetails" in item:
+            duration_str = item["contentDetails"]["duration"]
+            duration = self._parse_duration(duration_str)
+
+        view_count = 0
+        like_count = 0
+        if "statistics" in item:
+            view_count = int(item["statistics"].get("viewCount", 0))
+            like_count = int(item["statistics"].get("likeCount", 0))
+
+        return {
+            "duration": duration,
+            "view_count": view_count,
+            "like_count": like_count,
+        }
 
     def _parse_duration(self, duration_str: str) -> int:
         """Конвертирует ISO 8601 длительность в секунды"""
@@ -97,27 +806,29 @@ class YouTubeService:
         except Exception as e:
             return 600
 
-    def _get_mock_videos(self, query: str, max_results: int) -> List[Dict]:
+    def _get_mock_videos(self, query: str, max_results: int) -> List[VideoRecord]:
         """Моковые данные для тестирования"""
         return [
-            {
-                "id": f"mock_{i}",
-                "title": (
-                    f"{query} - Урок {i + 1}: Основные понятия"
-                    if i < 3
-                    else (
-                        f"{query} - Урок {i + 1}: Практика"
-                        if i < 6
-                        else f"{query} - Урок {i + 1}: Продвинутые техники"
-                    )
-                ),
-                "description": f'Обучение теме {query}. Уровень сложности: {["начальный", "средний", "продвинутый"][i % 3]}',
-                "channel": "Учебный канал",
-                "duration": [300, 600, 900, 1200][i % 4],
-                "view_count": 5000 + i * 2000,
-                "like_count": 100 + i * 50,
-                "url": f"https://youtube.com/watch?v=mock_{i}",
-                "thumbnail": "https://img.youtube.com/vi/default/mqdefault.jpg",
-            }
+            VideoRecord(
+                {
+                    "id": f"mock_{i}",
+                    "title": (
+                        f"{query} - Урок {i + 1}: Основные понятия"
+                        if i < 3
+                        else (
+                            f"{query} - Урок {i + 1}: Практика"
+                            if i < 6
+                            else f"{query} - Урок {i + 1}: Продвинутые техники"
+                        )
+                    ),
+                    "description": f'Обучение теме {query}. Уровень сложности: {["начальный", "средний", "продвинутый"][i % 3]}',
+                    "channel": "Учебный канал",
+                    "duration": [300, 600, 900, 1200][i % 4],
+                    "view_count": 5000 + i * 2000,
+                    "like_count": 100 + i * 50,
+                    "url": f"https://youtube.com/watch?v=mock_{i}",
+                    "thumbnail": "https://img.youtube.com/vi/default/mqdefault.jpg",
+                }
+            )
             for i in range(max_results)
         ]
@@ -18,4 +18,14 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,
     worker_max_tasks_per_child=100,
+    beat_schedule={
+        "refresh-video-stats": {
+            "task": "refresh_video_stats_task",
+            "schedule": settings.STATS_REFRESH_INTERVAL,
+        },
+        "refresh-channel-reputation": {
+            "task": "refresh_channel_reputation_task",
+            "schedule": 24 * 60 * 60,
+        },
+    },
 )
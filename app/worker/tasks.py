@@ -2,11 +2,20 @@ import logging
 import time
 
 from app.db.database import SessionLocal
+from app.services.channel_reputation import ChannelReputation
 from app.services.course_generator import CourseGenerator
+from app.services.quota import MinuteQuotaExceededError, QuotaExceededError
+from app.services.stats_refresh import VideoStatsRefresher
+from app.services.youtube_service import get_youtube_service
 from app.worker.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
 
+# Дольше этого задачу из-за квоты не откладываем, а сразу отказываем
+QUOTA_RETRY_MAX_DELAY = 10 * 60
+# Сколько раз задачу откладывают из-за поминутной квоты, потом - отказ
+QUOTA_MAX_RETRIES = 3
+
 
 @celery_app.task(bind=True, name="generate_course_task")
 def generate_course_task(
@@ -38,23 +47,14 @@ def generate_course_task(
             meta={"step": 3, "total": 3, "message": "🏗️ Создаю структуру курса..."},
         )
 
-        generator = CourseGenerator(db)
+        # YouTube клиент собирается один раз на процесс воркера
+        generator = CourseGenerator(db, youtube=get_youtube_service())
         course = generator.generate_course(topic, difficulty, user_id)
 
-        # Отправляем уведомление
-        if user_id:
-            send_course_ready_notification.delay(user_id, course.id)
-
-        return {
-            "status": "success",
-            "course_id": course.id,
-            "title": course.title,
-            "modules": len(course.modules),
-            "lessons": sum(len(m.lessons) for m in course.modules),
-            "topic": topic,
-            "difficulty": difficulty,
-        }
+        return _course_ready(course, user_id, topic, difficulty)
 
+    except QuotaExceededError as e:
+        return _quota_exhausted(self, e)
     except Exception as e:
         logger.error(f"Failed to generate course: {e}")
         return {"status": "error", "error": str(e)}
@@ -62,6 +62,102 @@ def generate_course_task(
         db.close()
 
 
+@celery_app.task(bind=True, name="generate_playlist_course_task")
+def generate_playlist_course_task(
+    self,
+    playlist: str,
+    difficulty: str = "beginner",
+    user_id: int = None,
+    resort: bool = False,
+):
+    """Фоновая задача создания курса из плейлиста YouTube"""
+
+    db = SessionLocal()
+    try:
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": 1, "total": 2, "message": "📃 Читаю плейлист..."},
+        )
+
+        generator = CourseGenerator(db, youtube=get_youtube_service())
+        course = generator.generate_course_from_playlist(
+            playlist, difficulty, user_id, resort=resort
+        )
+
+        return _course_ready(course, user_id, course.topic, difficulty)
+
+    except QuotaExceededError as e:
+        return _quota_exhausted(self, e)
+    except Exception as e:
+        logger.error(f"Failed to generate playlist course: {e}")
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+
+def _course_ready(course, user_id: int, topic: str, difficulty: str) -> dict:
+    """Уведомление о готовом курсе и результат задачи"""
+    if user_id:
+        send_course_ready_notification.delay(user_id, course.id)
+
+    return {
+        "status": "success",
+        "course_id": course.id,
+        "title": course.title,
+        "modules": len(course.modules),
+        "lessons": sum(len(m.lessons) for m in course.modules),
+        "topic": topic,
+        "difficulty": difficulty,
+    }
+
+
+def _quota_exhausted(task, error: QuotaExceededError) -> dict:
+    logger.warning(f"YouTube quota exhausted: {error}")
+    # Поминутный лимит - ставим задачу в очередь повторно, дневной - отказываем.
+    # После последнего повтора тоже отказываем: бот ждет результат, а не сбой задачи
+    if (
+        error.retry_after
+        and error.retry_after <= QUOTA_RETRY_MAX_DELAY
+        and task.request.retries < QUOTA_MAX_RETRIES
+    ):
+        raise task.retry(
+            exc=error, countdown=error.retry_after, max_retries=QUOTA_MAX_RETRIES
+        )
+    if isinstance(error, MinuteQuotaExceededError):
+        message = "YouTube API сейчас перегружен запросами, попробуйте через пару минут"
+    else:
+        message = "Квота YouTube API на сегодня исчерпана, попробуйте позже"
+    return {"status": "error", "error": message}
+
+
+@celery_app.task(name="refresh_video_stats_task")
+def refresh_video_stats_task():
+    """Периодическое обновление статистики видео из активных курсов"""
+    db = SessionLocal()
+    try:
+        report = VideoStatsRefresher(db, youtube=get_youtube_service()).refresh()
+        return {"status": "success", **report}
+    except Exception as e:
+        logger.error(f"Failed to refresh video stats: {e}")
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="refresh_channel_reputation_task")
+def refresh_channel_reputation_task():
+    """Пересчет доходимости уроков и оценок каналов по прогрессу пользователей"""
+    db = SessionLocal()
+    try:
+        channels = ChannelReputation(db, youtube=get_youtube_service())
+        return {"status": "success", "channels": channels.refresh_completion()}
+    except Exception as e:
+        logger.error(f"Failed to refresh channel reputation: {e}")
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+
 @celery_app.task(name="send_course_ready_notification")
 def send_course_ready_notification(user_id: int, course_id: int):
     """Сохранить уведомление о готовности курса"""
@@ -153,6 +249,9 @@ def long_task(self, seconds: int = 10):
 # Экспорт задач
 __all__ = [
     "generate_course_task",
+    "generate_playlist_course_task",
+    "refresh_video_stats_task",
+    "refresh_channel_reputation_task",
     "send_course_ready_notification",  # Добавил
     "debug_task",
     "test_task",
@@ -0,0 +1,91 @@
+"""Сравнение модели сложности с правилами по заголовку.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_difficulty_model
+
+Точность - на кросс-валидации по размеченным заголовкам
+(benchmarks/data/difficulty_labels.jsonl): модель каждый раз обучается
+без проверяемой части. Правила не обучаются, "unknown" считается
+"intermediate" - так его оценивает сортировщик. Задержка - на одно видео
+при пакетном вызове и при вызове по одному.
+"""
+
+import argparse
+import os
+import random
+import timeit
+
+import numpy as np
+
+from app.services.difficulty_model import LABELS, DifficultyModel, load_labeled
+from app.services.text_analyzer import AnalysisMemo, TextAnalyzer
+
+DATASET = os.path.join(os.path.dirname(__file__), "data", "difficulty_labels.jsonl")
+
+
+def folds(labels, count: int, seed: int = 1):
+    """Номер части для каждого примера, уровни поровну во всех частях"""
+    rng = random.Random(seed)
+    assignment = [0] * len(labels)
+    for label in LABELS:
+        indices = [i for i, value in enumerate(labels) if value == label]
+        rng.shuffle(indices)
+        for position, i in enumerate(indices):
+            assignment[i] = position % count
+    return np.array(assignment)
+
+
+def rules_predict(analyzer: TextAnalyzer, texts):
+    predictions = []
+    for text in texts:
+        difficulty = analyzer.analyze_title(text)["difficulty"]
+        predictions.append("intermediate" if difficulty == "unknown" else difficulty)
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=DATASET)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts, labels = load_labeled(args.dataset)
+    labels = np.array(labels)
+    assignment = folds(labels, args.folds)
+
+    # Без кэша анализа: меряем сами правила, а не попадания в кэш
+    analyzer = TextAnalyzer(memo=AnalysisMemo(0))
+    rules = np.array(rules_predict(analyzer, texts))
+
+    predicted = np.empty(len(texts), dtype=object)
+    for fold in range(args.folds):
+        train = assignment != fold
+        model = DifficultyModel.train(
+            [text for text, keep in zip(texts, train) if keep], labels[train]
+        )
+        classes, _ = model.predict([t for t, keep in zip(texts, train) if not keep])
+        predicted[~train] = [LABELS[i] for i in classes]
+
+    print(f"accuracy on {len(texts)} labeled titles ({args.folds}-fold)")
+    print(f"  rules: {np.mean(rules == labels):.1%}")
+    print(f"  model: {np.mean(predicted == labels):.1%}")
+
+    model = DifficultyModel.train(texts, labels)
+    videos = [{"title": text} for text in texts]
+
+    def per_video(func):
+        elapsed = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        return elapsed / len(texts) * 10**6
+
+    rules_time = per_video(lambda: rules_predict(analyzer, texts))
+    batch_time = per_video(lambda: model.predict_videos(videos))
+    single_time = per_video(lambda: [model.predict_videos([video]) for video in videos])
+    print(f"latency per video, {len(texts)} titles")
+    print(f"  rules:          {rules_time:7.1f} us")
+    print(f"  model (batch):  {batch_time:7.1f} us")
+    print(f"  model (single): {single_time:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Офлайн-бенчмарк генерации курса через локальный заменитель YouTube API.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_generation --latency 0.08 --runs 5
+
+Поднимает FakeYouTubeServer, направляет на него клиентов через
+YOUTUBE_API_BASE_URL и прогоняет CourseGenerator во всех режимах поиска.
+Кэш и журнал квоты выключены, чтобы каждый прогон шел через HTTP, а каждый
+режим начинается с пустой БД.
+Субтитры отдает FakeTranscriptClient с той же задержкой, что и API, и
+сохраняет во временный каталог: бенчмарк не ходит на youtube.com.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import Base  # noqa: E402
+from app.services import youtube_async, youtube_service  # noqa: E402
+from app.services.course_generator import CourseGenerator  # noqa: E402
+from app.services.transcripts import TranscriptFetcher, TranscriptStore  # noqa: E402
+from benchmarks.fake_youtube import (  # noqa: E402
+    FakeTranscriptClient,
+    FakeYouTubeAPI,
+    FakeYouTubeFixtures,
+    FakeYouTubeServer,
+)
+
+TOPICS = ["Python", "Docker", "Linux", "SQL", "Git"]
+
+
+def run(
+    mode: str,
+    use_async: bool,
+    runs: int,
+    api: FakeYouTubeAPI,
+    transcript_client: FakeTranscriptClient,
+):
+    settings.YOUTUBE_ASYNC_CLIENT = use_async
+    youtube_service._service = None
+    service = youtube_service.get_youtube_service()
+
+    # Своя БД на режим: каталог видео, отпечатки и репутация каналов
+    # прошлых режимов не экономят запросы следующим
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    # Свой каталог субтитров на режим: прогоны не берут субтитры друг у друга
+    store = tempfile.TemporaryDirectory()
+    transcripts = TranscriptFetcher(transcript_client, TranscriptStore(store.name))
+
+    timings = []
+    api.reset()
+    for index in range(runs):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            CourseGenerator(
+                db, youtube=service, transcripts=transcripts
+            ).generate_course(
+                f"{TOPICS[index % len(TOPICS)]} {index}", "beginner", search_mode=mode
+            )
+            timings.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    store.cleanup()
+    engine.dispose()
+
+    client = "async" if use_async else "sync"
+    print(
+        f"{mode:>7} {client:>5}: "
+        f"median {statistics.median(timings) * 1000:7.1f} ms, "
+        f"max {max(timings) * 1000:7.1f} ms, "
+        f"calls {sum(api.calls.values()) / runs:5.1f}/course, "
+        f"units {api.units_used / runs:6.1f}/course"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.08)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fixtures", help="JSON с записанными ответами API")
+    args = parser.parse_args()
+
+    fixtures = (
+        FakeYouTubeFixtures.load(args.fixtures)
+        if args.fixtures
+        else FakeYouTubeFixtures()
+    )
+    api = FakeYouTubeAPI(
+        fixtures, latency=args.latency, error_rate=args.error_rate, seed=0
+    )
+
+    settings.YOUTUBE_CACHE_ENABLED = False
+    settings.YOUTUBE_QUOTA_ENABLED = False
+    settings.YOUTUBE_SINGLEFLIGHT_REDIS = False
+
+    transcript_client = FakeTranscriptClient(fixtures, latency=args.latency)
+    with FakeYouTubeServer(api) as server:
+        settings.YOUTUBE_API_BASE_URL = server.base_url
+        youtube_async._clients.clear()
+        print(f"Fake YouTube API {server.base_url}, latency {args.latency}s")
+        for mode in ("single", "fanout"):
+            for use_async in (False, True):
+                run(mode, use_async, args.runs, api, transcript_client)
+
+
+if __name__ == "__main__":
+    main()
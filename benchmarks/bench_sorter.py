@@ -0,0 +1,123 @@
+"""Микробенчмарк оценки кандидатов в SmartVideoSorter.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_sorter
+
+Сравнивает оценку по одному видео (_calculate_video_score) с векторной
+score_videos на тысячах кандидатов - словарях и записях VideoRecord, а также
+отбор лучших select_best и потоковый select_top, группировку в модули подряд
+и по кластерам.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+
+from app.services.smart_sorter import SmartVideoSorter
+from app.services.video_record import as_records
+from benchmarks.fake_youtube import FakeYouTubeFixtures
+
+QUERIES = ["Python", "Docker основы", "SQL продвинутый уровень", "Linux практика"]
+
+
+def candidates(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    fixtures = FakeYouTubeFixtures(synthetic_results=count // len(QUERIES) + 1)
+    ids = []
+    for query in QUERIES:
+        ids.extend(fixtures.search(query))
+    videos = []
+    for video_id in ids[:count]:
+        # Те же поля, что у кандидата из YouTubeService после videos.list
+        snippet = fixtures.videos[video_id]["snippet"]
+        videos.append(
+            {
+                "id": video_id,
+                "title": snippet["title"],
+                "description": snippet["description"],
+                "channel": snippet["channelTitle"],
+                "channel_id": snippet["channelId"],
+                "url": f"https://youtube.com/watch?v={video_id}",
+                "thumbnail": snippet["thumbnails"]["high"]["url"],
+                "published_at": snippet["publishedAt"],
+                "duration": rng.randint(60, 7200),
+                "view_count": rng.randint(0, 10**6),
+                "channel_score": rng.random(),
+                "like_count": rng.randint(0, 10**4),
+            }
+        )
+    return videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sorter = SmartVideoSorter()
+    videos = candidates(args.candidates)
+
+    def scalar():
+        return [
+            sorter._calculate_video_score(video, "Python", "beginner")
+            for video in videos
+        ]
+
+    def vector():
+        return sorter.score_videos(videos, "Python", "beginner")
+
+    assert vector().tolist() == scalar()
+
+    # Заголовки уже разобраны и в кэше анализа - меряем саму оценку
+    before = min(timeit.repeat(scalar, number=1, repeat=args.repeat)) * 1000
+    after = min(timeit.repeat(vector, number=1, repeat=args.repeat)) * 1000
+    print(f"scoring {len(videos)} candidates")
+    print(f"  _calculate_video_score: {before:7.2f} ms")
+    print(f"  score_videos:           {after:7.2f} ms  ({before / after:.1f}x)")
+
+    records = as_records(videos)
+    elapsed = min(
+        timeit.repeat(
+            lambda: sorter.score_videos(records, "Python", "beginner"),
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+    dict_size = sum(sys.getsizeof(video) for video in videos) / len(videos)
+    record_size = sum(sys.getsizeof(video) for video in records) / len(records)
+    print(f"  score_videos (records): {elapsed * 1000:7.2f} ms")
+    print(
+        f"  container per candidate: dict {dict_size:.0f} B, record {record_size:.0f} B"
+    )
+
+    # Новый сортировщик на каждый прогон: без готовых разборов заголовков
+    def best():
+        return SmartVideoSorter().select_best(videos, "Python", "beginner", 15)
+
+    def top():
+        return SmartVideoSorter().select_top(iter(videos), "Python", "beginner", 15)
+
+    assert best() == top()
+    before = min(timeit.repeat(best, number=1, repeat=args.repeat)) * 1000
+    after = min(timeit.repeat(top, number=1, repeat=args.repeat)) * 1000
+    print(f"top 15 of {len(videos)} candidates")
+    print(f"  select_best: {before:7.2f} ms")
+    print(f"  select_top:  {after:7.2f} ms  ({before / after:.1f}x)")
+
+    course = sorter.sort_videos(videos[:120], "Python", "beginner")
+    print(f"group_into_modules, {len(course)} videos")
+    for mode in ("fixed", "clusters"):
+        elapsed = min(
+            timeit.repeat(
+                lambda: sorter.group_into_modules(course, mode=mode),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"  {mode:8}: {elapsed * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
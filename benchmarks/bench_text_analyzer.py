@@ -0,0 +1,121 @@
+"""Микробенчмарк TextAnalyzer.analyze_title: стоимость одного заголовка.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_text_analyzer
+
+Сравнивает прежний вариант (re.search на каждый шаблон) с текущим,
+кэш результатов и три метода для одного текста с пакетным analyze_batch.
+"""
+
+import argparse
+import re
+import timeit
+
+from app.services.text_analyzer import AnalysisMemo, TextAnalyzer
+from benchmarks.fake_youtube import FakeYouTubeFixtures
+
+QUERIES = ["Python", "Docker основы", "SQL продвинутый уровень", "Linux практика"]
+
+
+def reference_analyze_title(analyzer: TextAnalyzer, title: str):
+    """Прежняя реализация analyze_title"""
+    title_lower = title.lower()
+    scores = {"beginner": 0, "intermediate": 0, "advanced": 0}
+    for difficulty, patterns in analyzer.difficulty_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, title_lower):
+                scores[difficulty] += 1
+
+    max_score = max(scores.values())
+    if max_score == 0:
+        return {"difficulty": "unknown", "confidence": 0}
+    for difficulty, score in scores.items():
+        if score == max_score:
+            return {"difficulty": difficulty, "confidence": score / 3}
+
+
+def titles(count: int):
+    fixtures = FakeYouTubeFixtures(synthetic_results=count // len(QUERIES) + 1)
+    result = []
+    for query in QUERIES:
+        result.extend(
+            fixtures.videos[video_id]["snippet"]["title"]
+            for video_id in fixtures.search(query)
+        )
+    return result[:count]
+
+
+def per_title(fn, items, repeat: int) -> float:
+    """Лучшее из repeat прогонов, микросекунд на заголовок"""
+    best = min(
+        timeit.repeat(lambda: [fn(title) for title in items], number=1, repeat=repeat)
+    )
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Без кэша, чтобы мерить сам анализ, а не попадания
+    analyzer = TextAnalyzer(memo=AnalysisMemo(0))
+    items = titles(args.titles)
+    assert [analyzer.analyze_title(t) for t in items] == [
+        reference_analyze_title(analyzer, t) for t in items
+    ]
+
+    before = per_title(
+        lambda t: reference_analyze_title(analyzer, t), items, args.repeat
+    )
+    after = per_title(analyzer.analyze_title, items, args.repeat)
+    print(f"analyze_title, {len(items)} titles")
+    print(f"  re.search per pattern: {before:6.2f} us/title")
+    print(f"  current:               {after:6.2f} us/title  ({before / after:.1f}x)")
+
+    cached = TextAnalyzer(memo=AnalysisMemo(len(items)))
+    hit = per_title(cached.analyze_title, items, args.repeat)
+    print(f"  memo hit:              {hit:6.2f} us/title  ({before / hit:.1f}x)")
+
+    def single(title):
+        analyzer.analyze_title(title)
+        analyzer.extract_keywords(title, 5)
+        analyzer.calculate_readability_score(title)
+
+    separate = per_title(single, items, args.repeat)
+    batch = (
+        min(
+            timeit.repeat(
+                lambda: analyzer.analyze_batch(items), number=1, repeat=args.repeat
+            )
+        )
+        / len(items)
+        * 1e6
+    )
+    print("title + keywords + readability")
+    print(f"  three methods per title: {separate:6.2f} us/title")
+    print(
+        f"  analyze_batch:           {batch:6.2f} us/title  ({separate / batch:.1f}x)"
+    )
+
+    levels = (
+        min(
+            timeit.repeat(
+                lambda: analyzer.analyze_batch(
+                    items, readability=False, keywords=False
+                ),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        / len(items)
+        * 1e6
+    )
+    print("difficulty only (SmartVideoSorter)")
+    print(f"  analyze_title per title: {after:6.2f} us/title")
+    print(f"  analyze_batch:           {levels:6.2f} us/title  ({after / levels:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""Локальный заменитель YouTube Data API для офлайн-бенчмарков и тестов.
+
+Реализует search.list, videos.list, channels.list, playlists.list
+и playlistItems.list (и субтитры - FakeTranscriptClient)
+поверх фикстур (записанных ответов API или синтетических данных).
+Умеет добавлять задержку, случайные ошибки и исчерпание квоты.
+
+Запуск:
+    python -m benchmarks.fake_youtube --port 8085 --latency 0.05
+
+После этого клиент направляется на сервер настройкой
+YOUTUBE_API_BASE_URL=http://127.0.0.1:8085/youtube/v3
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from app.services.quota import ENDPOINT_COSTS
+
+API_PATH = "/youtube/v3"
+
+# Слова, по которым SmartVideoSorter и TextAnalyzer определяют сложность
+SYNTHETIC_LEVELS = [
+    "для начинающих",
+    "основы",
+    "урок",
+    "практика",
+    "примеры",
+    "продвинутый уровень",
+    "архитектура",
+]
+
+
+class FakeYouTubeFixtures:
+    """Данные заменителя: видео, каналы, плейлисты и выдачи поиска.
+
+    Формат файла фикстур повторяет ресурсы API:
+    {"videos": [...], "channels": [...], "playlists": {id: [videoId, ...]},
+     "searches": {query: [videoId, ...]}}
+    Запросы, которых нет в фикстурах, получают синтетическую выдачу.
+    """
+
+    def __init__(
+        self,
+        videos: Optional[List[Dict]] = None,
+        channels: Optional[List[Dict]] = None,
+        playlists: Optional[Dict[str, List[str]]] = None,
+        searches: Optional[Dict[str, List[str]]] = None,
+        synthetic_results: int = 200,
+    ):
+        self.videos = {video["id"]: video for video in videos or []}
+        self.channels = {channel["id"]: channel for channel in channels or []}
+        self.playlists = dict(playlists or {})
+        self.searches = dict(searches or {})
+        self.synthetic_results = synthetic_results
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "FakeYouTubeFixtures":
+        """Фикстуры из JSON файла"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            videos=data.get("videos"),
+            channels=data.get("channels"),
+            playlists=data.get("playlists"),
+            searches=data.get("searches"),
+            **kwargs,
+        )
+
+    def search(self, query: str) -> List[str]:
+        """ID видео выдачи по запросу (синтетическая, если запроса нет)"""
+        with self._lock:
+            if query not in self.searches:
+                self.searches[query] = self._synthesize(query)
+            return self.searches[query]
+
+    def _synthesize(self, query: str) -> List[str]:
+        # Детерминированно от запроса: одинаковые прогоны дают одинаковые данные
+        seed = int(hashlib.sha256(query.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        ids = []
+        for index in range(self.synthetic_results):
+            video_id = f"{seed:08x}{index:03d}"
+            channel_id = f"UC{seed % 1000:03d}{index % 7}"
+            level = SYNTHETIC_LEVELS[index % len(SYNTHETIC_LEVELS)]
+            self.videos[video_id] = {
+                "id": video_id,
+                "snippet": {
+                    "title": f"{query}: {level} #{index + 1}",
+                    "description": f"Видео о {query}. {level.capitalize()}.",
+                    "channelId": channel_id,
+                    "channelTitle": f"Канал {channel_id}",
+                    "publishedAt": f"20{rng.randint(15, 24)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T10:00:00Z",
+                    "thumbnails": {
+                        "high": {"url": f"https://i.ytimg.com/vi/{video_id}/hq.jpg"}
+                    },
+                },
+                "contentDetails": {
+                    "duration": f"PT{rng.randint(4, 40)}M{rng.randint(0, 59)}S"
+                },
+                "statistics": {
+                    "viewCount": str(rng.randint(100, 2_000_000)),
+                    "likeCount": str(rng.randint(10, 50_000)),
+                },
+            }
+            if channel_id not in self.channels:
+                self.channels[channel_id] = {
+                    "id": channel_id,
+                    "snippet": {"title": f"Канал {channel_id}"},
+                    "statistics": {
+                        "subscriberCount": str(rng.randint(1_000, 5_000_000)),
+                        "videoCount": str(rng.randint(10, 2_000)),
+                    },
+                }
+            ids.append(video_id)
+        return ids
+
+
+class FakeYouTubeAPI:
+    """HTTP заменитель YouTube Data API v3 на aiohttp"""
+
+    def __init__(
+        self,
+        fixtures: Optional[FakeYouTubeFixtures] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        quota_limit: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.fixtures = fixtures or FakeYouTubeFixtures()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_limit = quota_limit
+        self.random = random.Random(seed)
+        self.units_used = 0
+        self.calls: Dict[str, int] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(f"{API_PATH}/search", self._handler("search.list"))
+        app.router.add_get(f"{API_PATH}/videos", self._handler("videos.list"))
+        app.router.add_get(f"{API_PATH}/channels", self._handler("channels.list"))
+        app.router.add_get(
+            f"{API_PATH}/playlistItems", self._handler("playlistItems.list")
+        )
+        app.router.add_get(f"{API_PATH}/playlists", self._handler("playlists.list"))
+        app.router.add_get("/stats", self._stats)
+        return app
+
+    def reset(self):
+        """Обнуляет счетчики вызовов и израсходованную квоту"""
+        self.units_used = 0
+        self.calls = {}
+
+    # ==================== ОБРАБОТКА ЗАПРОСОВ ====================
+
+    def _handler(self, endpoint: str):
+        async def handle(request: web.Request) -> web.Response:
+            if not request.query.get("key"):
+                return _error(
+                    403, "forbidden", "The request is missing a valid API key."
+                )
+            if self.latency:
+                await asyncio.sleep(self.latency)
+
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                return _error(500, "backendError", "Backend Error")
+
+            cost = ENDPOINT_COSTS.get(endpoint, 1)
+            if (
+                self.quota_limit is not None
+                and self.units_used + cost > self.quota_limit
+            ):
+                return _error(
+                    403,
+                    "quotaExceeded",
+                    "The request cannot be completed because you have exceeded your quota.",
+                )
+            self.units_used += cost
+
+            method = getattr(self, "_" + endpoint.split(".")[0])
+            result = method(request.query)
+            if isinstance(result, web.Response):
+                return result
+            return web.json_response(result)
+
+        return handle
+
+    def _search(self, query) -> Dict:
+        ids = self.fixtures.search(query.get("q", ""))
+        items = [
+            {
+                "kind": "youtube#searchResult",
+                "id": {"kind": "youtube#video", "videoId": video_id},
+                "snippet": self.fixtures.videos[video_id]["snippet"],
+            }
+            for video_id in ids
+        ]
+        return _page(items, query, "youtube#searchListResponse")
+
+    def _videos(self, query) -> Dict:
+        ids = _split_ids(query.get("id", ""))
+        if len(ids) > 50:
+            return _error(400, "invalidFilters", "Too many video ids (max 50).")
+        parts = set(query.get("part", "snippet").split(","))
+        items = []
+        for video_id in ids:
+            video = self.fixtures.videos.get(video_id)
+            if video is not None:
+                items.append(_select_parts(video, parts))
+        return {"kind": "youtube#videoListResponse", "items": items}
+
+    def _channels(self, query) -> Dict:
+        parts = set(query.get("part", "snippet").split(","))
+        items = [
+            _select_parts(self.fixtures.channels[channel_id], parts)
+            for channel_id in _split_ids(query.get("id", ""))
+            if channel_id in self.fixtures.channels
+        ]
+        return {"kind": "youtube#channelListResponse", "items": items}
+
+    def _playlistItems(self, query) -> Dict:
+        playlist_id = query.get("playlistId", "")
+        items = []
+        for position, video_id in enumerate(
+            self.fixtures.playlists.get(playlist_id, [])
+        ):
+            # Так API отдает удаленные и закрытые видео
+            video = self.fixtures.videos.get(
+                video_id, {"snippet": {"title": "Deleted video", "description": ""}}
+            )
+            items.append(
+                {
+                    "kind": "youtube#playlistItem",
+                    "id": f"{playlist_id}.{position}",
+                    "snippet": dict(
+                        video["snippet"],
+                        playlistId=playlist_id,
+                        position=position,
+                        resourceId={"kind": "youtube#video", "videoId": video_id},
+                    ),
+                    "contentDetails": {"videoId": video_id},
+                }
+            )
+        return _page(items, query, "youtube#playlistItemListResponse")
+
+    def _playlists(self, query) -> Dict:
+        items = [
+            {
+                "kind": "youtube#playlist",
+                "id": playlist_id,
+                "snippet": {
+                    "title": f"Плейлист {playlist_id}",
+                    "description": "",
+                    "channelTitle": "Учебный канал",
+                },
+            }
+            for playlist_id in _split_ids(query.get("id", ""))
+            if playlist_id in self.fixtures.playlists
+        ]
+        return {"kind": "youtube#playlistListResponse", "items": items}
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"units_used": self.units_used, "calls": self.calls})
+
+
+def _error(status: int, reason: str, message: str) -> web.Response:
+    return web.json_response(
+        {
+            "error": {
+                "code": status,
+                "message": message,
+                "errors": [{"reason": reason, "message": message}],
+            }
+        },
+        status=status,
+    )
+
+
+def _page(items: List[Dict], query, kind: str) -> Dict:
+    """Страница выдачи: pageToken - просто смещение"""
+    page_size = min(int(query.get("maxResults", 5)), 50)
+    offset = int(query.get("pageToken") or 0)
+    response = {
+        "kind": kind,
+        "pageInfo": {"totalResults": len(items), "resultsPerPage": page_size},
+        "items": items[offset : offset + page_size],
+    }
+    if offset + page_size < len(items):
+        response["nextPageToken"] = str(offset + page_size)
+    return response
+
+
+def _split_ids(value: str) -> List[str]:
+    return [item for item in value.split(",") if item]
+
+
+def _select_parts(resource: Dict, parts) -> Dict:
+    result = {"id": resource["id"]}
+    for part in parts:
+        if part in resource:
+            result[part] = resource[part]
+    return result
+
+
+class FakeTranscriptClient:
+    """Заменитель YouTubeTranscriptClient поверх тех же фикстур.
+
+    Субтитры - описание видео, повторенное несколько раз; latency
+    имитирует сетевой запрос к youtube.com на каждое видео.
+    """
+
+    def __init__(
+        self, fixtures: Optional[FakeYouTubeFixtures] = None, latency: float = 0.0
+    ):
+        self.fixtures = fixtures or FakeYouTubeFixtures()
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, video_id: str) -> Optional[str]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        video = self.fixtures.videos.get(video_id)
+        if video is None:
+            return None
+        return " ".join([video["snippet"]["description"]] * 5)
+
+
+class FakeYouTubeServer:
+    """Заменитель API в фоновом потоке (для бенчмарков и тестов)"""
+
+    def __init__(
+        self,
+        api: Optional[FakeYouTubeAPI] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.api = api or FakeYouTubeAPI()
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._started = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        """Значение для настройки YOUTUBE_API_BASE_URL"""
+        return f"http://{self.host}:{self.port}{API_PATH}"
+
+    def start(self) -> "FakeYouTubeServer":
+        threading.Thread(target=self._run, name="fake-youtube", daemon=True).start()
+        self._started.wait(10)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._runner.cleanup(), self._loop
+            ).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self) -> "FakeYouTubeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.api.app())
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        # При port=0 порт выбирает система
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Локальный заменитель YouTube Data API"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--fixtures", help="JSON файл с записанными ответами")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="задержка ответа, сек"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="доля ответов 500"
+    )
+    parser.add_argument("--quota", type=int, default=None, help="квота в единицах")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fixtures = FakeYouTubeFixtures.load(args.fixtures) if args.fixtures else None
+    api = FakeYouTubeAPI(
+        fixtures,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        quota_limit=args.quota,
+        seed=args.seed,
+    )
+    print(f"Fake YouTube API: http://{args.host}:{args.port}{API_PATH}")
+    web.run_app(api.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import Settings
+from app.core.config import Settings, settings
 from app.db.database import Base
 
 
@@ -41,3 +41,21 @@ def setup_factory_session(test_db):
     UserFactory._meta.sqlalchemy_session = test_db
     yield
     UserFactory._meta.sqlalchemy_session = None
+
+
+@pytest.fixture(autouse=True)
+def disable_youtube_cache(monkeypatch):
+    """Тесты не должны читать и писать кэш и журнал квоты YouTube в рабочую БД,
+    а генерация курса - ходить за субтитрами в сеть"""
+    monkeypatch.setattr(settings, "YOUTUBE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "YOUTUBE_QUOTA_ENABLED", False)
+    monkeypatch.setattr(settings, "TRANSCRIPTS_ENABLED", False)
+    monkeypatch.setattr(settings, "CHANNEL_REPUTATION_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def local_singleflight(monkeypatch):
+    """Склейка запросов в тестах - только внутри процесса, без Redis"""
+    from app.services import singleflight
+
+    monkeypatch.setattr(singleflight, "_singleflight", singleflight.SingleFlight())
@@ -0,0 +1,166 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from factories import UserFactory
+
+from app.db.models import Channel, Lesson, UserProgress, Video
+from app.services.channel_reputation import ChannelReputation, channel_score
+from app.services.quota import QuotaExceededError
+from app.services.smart_sorter import SmartVideoSorter
+
+
+def _stats(subscribers, videos=100):
+    return {
+        "title": "Канал",
+        "subscriber_count": subscribers,
+        "video_count": videos,
+        "view_count": 0,
+    }
+
+
+def _youtube(stats):
+    youtube = Mock()
+    youtube.fetch_channels.side_effect = lambda ids: {
+        channel_id: stats[channel_id] for channel_id in ids if channel_id in stats
+    }
+    return youtube
+
+
+def test_score_grows_with_audience_and_completion():
+    small = Channel(subscriber_count=1_000, video_count=50)
+    big = Channel(subscriber_count=1_000_000, video_count=50)
+    finished = Channel(
+        subscriber_count=1_000, video_count=50, lessons_started=40, lessons_completed=38
+    )
+    dropped = Channel(
+        subscriber_count=1_000, video_count=50, lessons_started=40, lessons_completed=2
+    )
+
+    assert channel_score(big) > channel_score(small)
+    assert channel_score(finished) > channel_score(small) > channel_score(dropped)
+    assert 0 <= channel_score(dropped) <= channel_score(finished) <= 1
+
+
+def test_scores_are_cached_with_ttl(test_db):
+    """Каналы запрашиваются один раз, пока данные не устарели"""
+    youtube = _youtube({"UCa": _stats(500_000), "UCb": _stats(2_000)})
+    reputation = ChannelReputation(test_db, youtube=youtube, ttl=3600)
+
+    scores = reputation.scores(["UCa", "UCb", "UCa", None])
+    assert scores["UCa"] > scores["UCb"]
+    youtube.fetch_channels.assert_called_once_with(["UCa", "UCb"])
+
+    assert reputation.scores(["UCa", "UCb"]) == scores
+    assert youtube.fetch_channels.call_count == 1
+
+    # Данные устарели - перечитываем только этот канал
+    test_db.query(Channel).filter_by(youtube_id="UCb").update(
+        {Channel.fetched_at: datetime.now() - timedelta(hours=2)}
+    )
+    reputation.scores(["UCa", "UCb"])
+    assert youtube.fetch_channels.call_args.args[0] == ["UCb"]
+
+
+def test_missing_channels_are_not_requested_again(test_db):
+    """Удаленный или скрытый канал запоминается до конца TTL"""
+    youtube = Mock()
+    youtube.fetch_channels.return_value = {"UCa": _stats(500_000), "UCgone": None}
+    reputation = ChannelReputation(test_db, youtube=youtube, ttl=3600)
+
+    scores = reputation.scores(["UCa", "UCgone"])
+    assert scores["UCa"] > scores["UCgone"]
+
+    reputation.scores(["UCa", "UCgone"])
+    assert youtube.fetch_channels.call_count == 1
+
+
+def test_quota_error_keeps_known_scores(test_db):
+    youtube = _youtube({"UCa": _stats(500_000)})
+    reputation = ChannelReputation(test_db, youtube=youtube)
+    reputation.scores(["UCa"])
+
+    youtube.fetch_channels.side_effect = QuotaExceededError("quota")
+    scores = reputation.scores(["UCa", "UCnew"])
+
+    assert list(scores) == ["UCa"]
+
+
+def test_completion_rates_from_user_progress(test_db):
+    user = UserFactory()
+    youtube = _youtube({"UCgood": _stats(10_000), "UCbad": _stats(10_000)})
+    reputation = ChannelReputation(test_db, youtube=youtube)
+    reputation.scores(["UCgood", "UCbad"])
+
+    for index, (channel_id, completed) in enumerate(
+        [("UCgood", True)] * 20 + [("UCbad", False)] * 19 + [("UCbad", True)]
+    ):
+        video = Video(youtube_id=f"v{index}", channel_id=channel_id)
+        test_db.add(video)
+        test_db.flush()
+        lesson = Lesson(video_id=video.id, order_index=1)
+        test_db.add(lesson)
+        test_db.flush()
+        test_db.add(
+            UserProgress(user_id=user.id, lesson_id=lesson.id, completed=completed)
+        )
+    test_db.commit()
+
+    assert reputation.refresh_completion() == 2
+
+    good = test_db.query(Channel).filter_by(youtube_id="UCgood").one()
+    bad = test_db.query(Channel).filter_by(youtube_id="UCbad").one()
+    assert (good.lessons_started, good.lessons_completed) == (20, 20)
+    assert (bad.lessons_started, bad.lessons_completed) == (20, 1)
+    assert good.score > bad.score
+
+
+def test_sorter_uses_channel_score():
+    sorter = SmartVideoSorter()
+    video = {"title": "Python основы", "duration": 600, "view_count": 5000}
+
+    plain = sorter._calculate_video_score(video, "Python", "beginner")
+    trusted = sorter._calculate_video_score(
+        dict(video, channel_score=0.9), "Python", "beginner"
+    )
+
+    assert trusted > plain
+
+
+def test_fetch_channels_in_batches(monkeypatch):
+    """channels.list: до 50 каналов за один запрос"""
+    from app.core.config import settings
+    from app.services import youtube_service
+    from benchmarks.fake_youtube import (
+        FakeYouTubeAPI,
+        FakeYouTubeFixtures,
+        FakeYouTubeServer,
+    )
+
+    fixtures = FakeYouTubeFixtures(
+        channels=[
+            {
+                "id": f"UC{index:03d}",
+                "snippet": {"title": f"Канал {index}"},
+                "statistics": {"subscriberCount": "1000", "videoCount": "10"},
+            }
+            for index in range(60)
+        ]
+    )
+    api = FakeYouTubeAPI(fixtures)
+    with FakeYouTubeServer(api) as server:
+        monkeypatch.setattr(settings, "YOUTUBE_API_KEY", "fake-key")
+        monkeypatch.setattr(settings, "YOUTUBE_API_BASE_URL", server.base_url)
+        monkeypatch.setattr(youtube_service, "_youtube_clients", {})
+
+        channels = youtube_service.YouTubeService().fetch_channels(
+            [f"UC{index:03d}" for index in range(60)]
+        )
+
+    assert len(channels) == 60
+    assert channels["UC001"]["subscriber_count"] == 1000
+    assert api.calls == {"channels.list": 2}
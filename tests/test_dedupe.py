@@ -0,0 +1,151 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.crud.video import get_video_fingerprints, upsert_videos
+from app.services import dedupe
+from app.services.course_generator import CourseGenerator
+from app.services.dedupe import (
+    collapse_duplicates,
+    fingerprint_similarity,
+    video_fingerprint,
+)
+from app.services.text_analyzer import TextAnalyzer
+
+ORIGINAL = "Python для начинающих - урок 1: переменные и типы данных"
+REUPLOADS = [
+    "Python для начинающих урок 1 переменные и типы данных [HD]",
+    "PYTHON ДЛЯ НАЧИНАЮЩИХ - Урок 1: Переменные и типы данных (перезалив)",
+]
+OTHER_PARTS = [
+    "Python для начинающих - урок 2: условия",
+    "Python для начинающих - урок 3: циклы for и while",
+]
+
+
+def _video(video_id, title, views=0):
+    return {
+        "id": video_id,
+        "title": title,
+        "description": "",
+        "url": f"https://youtube.com/watch?v={video_id}",
+        "duration": 600,
+        "view_count": views,
+        "like_count": 0,
+        "fingerprint": video_fingerprint({"title": title}, TextAnalyzer()),
+    }
+
+
+def test_fingerprint_similarity():
+    analyzer = TextAnalyzer()
+    original = video_fingerprint({"title": ORIGINAL}, analyzer)
+
+    assert len(original) == dedupe.SIGNATURE_SIZE * 4 + dedupe.NUMBERS_SIZE
+    for title in REUPLOADS:
+        assert (
+            fingerprint_similarity(
+                original, video_fingerprint({"title": title}, analyzer)
+            )
+            >= 0.7
+        )
+    for title in OTHER_PARTS:
+        assert (
+            fingerprint_similarity(
+                original, video_fingerprint({"title": title}, analyzer)
+            )
+            < 0.7
+        )
+    assert video_fingerprint({"title": "и в на"}, analyzer) is None
+
+
+def test_collapse_keeps_most_viewed_copy_in_place():
+    videos = [
+        _video("a", ORIGINAL, views=100),
+        _video("b", OTHER_PARTS[0], views=50),
+        _video("c", REUPLOADS[0], views=5000),
+        _video("d", REUPLOADS[1], views=10),
+        _video("e", OTHER_PARTS[1]),
+        {"id": "f", "title": "#", "fingerprint": None},
+    ]
+
+    assert [video["id"] for video in collapse_duplicates(videos)] == [
+        "b",
+        "c",
+        "e",
+        "f",
+    ]
+
+
+def test_collapse_compares_only_within_buckets(monkeypatch):
+    """Разные видео почти не попадают в общие корзины LSH"""
+    rng = random.Random(1)
+    words = ["".join(rng.choices("абвгдежзиклмнопрст", k=6)) for _ in range(1200)]
+    videos = [_video(str(i), " ".join(words[i * 4 : i * 4 + 4])) for i in range(300)]
+    calls = []
+    similarity = dedupe.fingerprint_similarity
+    monkeypatch.setattr(
+        dedupe,
+        "fingerprint_similarity",
+        lambda a, b: calls.append(1) or similarity(a, b),
+    )
+
+    assert len(collapse_duplicates(videos)) == 300
+    assert len(calls) < 300 * 299 / 2 / 10
+
+
+def test_generator_stores_and_reuses_fingerprints(test_db):
+    videos = [
+        _video("a", ORIGINAL, views=100),
+        _video("b", REUPLOADS[0], views=500),
+        _video("c", OTHER_PARTS[0]),
+    ]
+    youtube = MagicMock()
+    youtube.iter_search_videos.side_effect = lambda *args, **kwargs: iter(
+        [dict(video, fingerprint=None) for video in videos]
+    )
+    generator = CourseGenerator(test_db, youtube=youtube)
+
+    course = generator.generate_course("Python", "beginner")
+    titles = [lesson.title for module in course.modules for lesson in module.lessons]
+    assert sorted(titles) == sorted([REUPLOADS[0], OTHER_PARTS[0]])
+
+    # Отпечатки кандидатов (и отброшенной копии) лежат в каталоге
+    stored = get_video_fingerprints(
+        test_db, {video["id"]: video["title"] for video in videos}
+    )
+    assert stored == {video["id"]: video["fingerprint"] for video in videos}
+
+    with patch("app.services.course_generator.video_fingerprint") as compute:
+        CourseGenerator(test_db, youtube=youtube).generate_course("Python", "beginner")
+    compute.assert_not_called()
+
+
+def test_early_stop_counts_copies_once(test_db, monkeypatch):
+    """Копии одного видео не засчитываются в нужное число уроков"""
+    monkeypatch.setattr(settings, "COURSE_MAX_LESSONS", 2)
+    titles = [ORIGINAL, *REUPLOADS, *OTHER_PARTS]
+    youtube = MagicMock()
+    youtube.iter_search_videos.return_value = iter(
+        [
+            dict(_video(str(i), title), fingerprint=None)
+            for i, title in enumerate(titles)
+        ]
+    )
+
+    candidates = CourseGenerator(test_db, youtube=youtube)._collect_candidates(
+        "Python", "Python", "beginner"
+    )
+
+    assert [video["title"] for video in candidates] == titles[:4]
+
+
+def test_stored_fingerprint_ignored_after_title_change(test_db):
+    upsert_videos(test_db, [_video("a", ORIGINAL)])
+
+    assert get_video_fingerprints(test_db, {"a": ORIGINAL})
+    assert get_video_fingerprints(test_db, {"a": OTHER_PARTS[0]}) == {}
@@ -0,0 +1,110 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+from app.services import difficulty_model
+from app.services.difficulty_model import LABELS, DifficultyModel
+
+TRAIN = {
+    "beginner": [
+        "Python для начинающих с нуля",
+        "Основы SQL: первый запрос",
+        "Docker простыми словами",
+        "Git для новичков: первый коммит",
+    ],
+    "intermediate": [
+        "Пишем REST API на FastAPI",
+        "SQL JOIN и подзапросы на практике",
+        "Docker Compose для веб-приложения",
+        "Git rebase и конфликты на практике",
+    ],
+    "advanced": [
+        "Внутреннее устройство GIL в CPython",
+        "Оптимизация запросов PostgreSQL изнутри",
+        "Kubernetes операторы изнутри",
+        "Lock-free структуры данных изнутри",
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def model():
+    texts = [title for titles in TRAIN.values() for title in titles]
+    labels = [label for label, titles in TRAIN.items() for _ in titles]
+    return DifficultyModel.train(texts, labels, n_features=2**10)
+
+
+def test_model_learns_training_titles(model):
+    videos = [{"title": title} for titles in TRAIN.values() for title in titles]
+    expected = [label for label, titles in TRAIN.items() for _ in titles]
+
+    assert model.predict_videos(videos) == expected
+    classes, confidence = model.predict([video["title"] for video in videos])
+    assert [LABELS[i] for i in classes] == expected
+    assert np.all((confidence > 1 / 3) & (confidence <= 1))
+    assert model.predict_proba([]).shape == (0, len(LABELS))
+
+
+def test_train_requires_all_levels():
+    with pytest.raises(ValueError):
+        DifficultyModel.train(["основы", "изнутри"], ["beginner", "advanced"])
+
+
+def test_artifact_round_trip_is_memory_mapped(model, tmp_path):
+    model.save(str(tmp_path))
+    loaded = DifficultyModel.load(str(tmp_path))
+
+    assert isinstance(loaded.coef, np.memmap)
+    assert loaded.coef.dtype == np.float32
+    texts = ["Основы Docker", "Docker изнутри", "Описание без заголовка"]
+    np.testing.assert_allclose(
+        loaded.predict_proba(texts), model.predict_proba(texts), rtol=1e-6
+    )
+
+
+def test_get_difficulty_model_loads_once(model, tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    model.save(str(tmp_path))
+    monkeypatch.setattr(settings, "DIFFICULTY_MODEL_PATH", str(tmp_path))
+    monkeypatch.setattr(difficulty_model, "_model", None)
+    monkeypatch.setattr(difficulty_model, "_model_loaded", False)
+
+    first = difficulty_model.get_difficulty_model()
+    assert first is not None
+    assert difficulty_model.get_difficulty_model() is first
+
+
+def test_get_difficulty_model_falls_back_to_rules(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DIFFICULTY_MODEL_PATH", str(tmp_path / "missing"))
+    monkeypatch.setattr(difficulty_model, "_model", None)
+    monkeypatch.setattr(difficulty_model, "_model_loaded", False)
+
+    assert difficulty_model.get_difficulty_model() is None
+
+
+def test_sorter_uses_model_consistently(model):
+    from app.services.smart_sorter import SmartVideoSorter
+
+    sorter = SmartVideoSorter()
+    sorter.difficulty_model = model
+    videos = [
+        # Правила сочли бы оба видео "beginner" по слову "основы"
+        {"title": "Основы Docker Compose для веб-приложения", "duration": 600},
+        {"title": "Основы: Kubernetes операторы изнутри", "duration": 1200},
+        {"title": "Python для начинающих", "view_count": 5000},
+    ]
+
+    annotated = sorter.annotate_videos([dict(video) for video in videos], "docker")
+    assert [video["estimated_difficulty"] for video in annotated] == (
+        model.predict_videos(videos)
+    )
+    assert sorter.score_videos(videos, "docker", "advanced").tolist() == [
+        sorter._calculate_video_score(video, "docker", "advanced") for video in videos
+    ]
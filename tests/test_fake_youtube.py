@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.core.config import settings
+from app.services import youtube_service
+from app.services.quota import QuotaExceededError
+from benchmarks.fake_youtube import (
+    FakeYouTubeAPI,
+    FakeYouTubeFixtures,
+    FakeYouTubeServer,
+)
+
+
+@pytest.fixture
+def fake_api():
+    api = FakeYouTubeAPI(FakeYouTubeFixtures(synthetic_results=120), seed=1)
+    with FakeYouTubeServer(api) as server:
+        yield api, server
+
+
+@pytest.fixture
+def service(fake_api, monkeypatch):
+    """YouTubeService, направленный на локальный заменитель API"""
+    _, server = fake_api
+    monkeypatch.setattr(settings, "YOUTUBE_API_KEY", "fake-key")
+    monkeypatch.setattr(settings, "YOUTUBE_API_BASE_URL", server.base_url)
+    monkeypatch.setattr(youtube_service, "_youtube_clients", {})
+    return youtube_service.YouTubeService()
+
+
+def test_search_goes_through_http(fake_api, service):
+    """search_videos идет через HTTP: один search.list и пачки videos.list"""
+    api, _ = fake_api
+    videos = service.search_videos("python", max_results=50)
+
+    assert len(videos) == 50
+    assert all(video["duration"] > 0 for video in videos)
+    assert api.calls == {"search.list": 1, "videos.list": 1}
+    assert api.units_used == 101
+
+
+def test_pagination_follows_page_tokens(fake_api, service):
+    api, _ = fake_api
+    videos = list(service.iter_search_videos("python", max_results=120, page_size=50))
+
+    assert len(videos) == 120
+    assert len({video["id"] for video in videos}) == 120
+    assert api.calls["search.list"] == 3
+
+
+def test_search_returns_slotted_records(fake_api, service):
+    """Кандидаты - записи VideoRecord, а не словари"""
+    from app.services.video_record import VideoRecord
+
+    videos = service.search_many(["python", "docker"], max_results=10)
+    videos += service.search_videos("sql", max_results=5)
+
+    assert all(type(video) is VideoRecord for video in videos)
+    assert all(video.duration == video["duration"] > 0 for video in videos)
+
+
+def test_quota_exhaustion_is_reported(fake_api, service):
+    """Ответ quotaExceeded от сервера превращается в QuotaExceededError"""
+    api, _ = fake_api
+    api.quota_limit = 50
+
+    with pytest.raises(QuotaExceededError):
+        service.search_videos("python", max_results=10)
+
+
+def test_error_injection_falls_back_to_mock(fake_api, service):
+    api, _ = fake_api
+    api.error_rate = 1.0
+
+    videos = service.search_videos("python", max_results=5)
+    assert videos == service._get_mock_videos("python", 5)
+
+
+def test_fixtures_serve_channels_and_playlists(fake_api):
+    api, _ = fake_api
+    ids = api.fixtures.search("python")[:3]
+    api.fixtures.playlists["PL1"] = ids
+
+    page = api._playlistItems({"playlistId": "PL1", "maxResults": "2"})
+    assert [item["contentDetails"]["videoId"] for item in page["items"]] == ids[:2]
+    assert page["nextPageToken"] == "2"
+
+    channel_id = api.fixtures.videos[ids[0]]["snippet"]["channelId"]
+    channels = api._channels({"id": channel_id, "part": "statistics"})
+    assert channels["items"][0]["statistics"]["subscriberCount"]
+
+
+def test_synthetic_fixtures_are_deterministic():
+    first = FakeYouTubeFixtures(synthetic_results=10)
+    second = FakeYouTubeFixtures(synthetic_results=10)
+
+    ids = first.search("docker")
+    assert ids == second.search("docker")
+    assert first.videos[ids[0]] == second.videos[ids[0]]
+
+
+def test_async_client_uses_same_server(fake_api, service, monkeypatch):
+    """Асинхронный клиент направляется на заменитель той же настройкой"""
+    from app.services import youtube_async
+
+    api, _ = fake_api
+    monkeypatch.setattr(settings, "YOUTUBE_ASYNC_CLIENT", True)
+    monkeypatch.setattr(youtube_async, "_clients", {})
+
+    videos = youtube_service.YouTubeService().search_videos("python", max_results=20)
+
+    assert len(videos) == 20
+    assert api.calls == {"search.list": 1, "videos.list": 1}
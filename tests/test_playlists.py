@@ -0,0 +1,180 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import youtube_service
+from app.services.course_generator import CourseGenerator
+from app.services.youtube_service import parse_playlist_id
+from benchmarks.fake_youtube import (
+    FakeYouTubeAPI,
+    FakeYouTubeFixtures,
+    FakeYouTubeServer,
+)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("https://www.youtube.com/playlist?list=PLabcdef123456", "PLabcdef123456"),
+        (
+            "https://youtube.com/watch?v=dQw4w9WgXcQ&list=PLabcdef123456&index=2",
+            "PLabcdef123456",
+        ),
+        ("PLabcdef123456", "PLabcdef123456"),
+        ("https://youtube.com/watch?v=dQw4w9WgXcQ", None),
+        ("python для начинающих", None),
+        ("", None),
+    ],
+)
+def test_parse_playlist_id(value, expected):
+    assert parse_playlist_id(value) == expected
+
+
+@pytest.fixture
+def playlist_service(monkeypatch):
+    fixtures = FakeYouTubeFixtures(synthetic_results=120)
+    ids = fixtures.search("python")
+    # Удаленное видео и повтор в середине плейлиста
+    fixtures.playlists["PLcourse00001"] = (
+        ids[:60] + ["gone_video1"] + ids[:1] + ids[60:]
+    )
+    api = FakeYouTubeAPI(fixtures)
+    with FakeYouTubeServer(api) as server:
+        monkeypatch.setattr(settings, "YOUTUBE_API_KEY", "fake-key")
+        monkeypatch.setattr(settings, "YOUTUBE_API_BASE_URL", server.base_url)
+        monkeypatch.setattr(youtube_service, "_youtube_clients", {})
+        api.reset()
+        yield youtube_service.YouTubeService(), api, ids
+
+
+def test_playlist_pages_and_batches_details(playlist_service):
+    """Плейлист читается страницами по 50 и стоит единицы, а не сотни единиц квоты"""
+    service, api, ids = playlist_service
+
+    videos = service.get_playlist_videos("PLcourse00001", max_results=200)
+
+    assert [video["id"] for video in videos] == ids
+    assert all(video["duration"] > 0 for video in videos)
+    assert api.calls == {"playlistItems.list": 3, "videos.list": 3}
+    assert api.units_used == 6
+    assert service.estimate_playlist_cost(200) <= 9
+
+
+def test_playlist_respects_max_results(playlist_service):
+    service, api, ids = playlist_service
+
+    videos = service.get_playlist_videos("PLcourse00001", max_results=30)
+
+    assert [video["id"] for video in videos] == ids[:30]
+    assert api.calls["playlistItems.list"] == 1
+
+
+def test_playlist_info(playlist_service):
+    service, _, _ = playlist_service
+    assert service.get_playlist_info("PLcourse00001")["title"]
+    assert service.get_playlist_info("PLmissing0001") is None
+
+
+def _playlist_youtube(titles):
+    youtube = Mock()
+    youtube.estimate_playlist_cost.return_value = 0
+    youtube.get_playlist_info.return_value = {"title": "Python от автора"}
+    youtube.get_playlist_videos.return_value = [
+        {
+            "id": f"vid{i}",
+            "title": title,
+            "description": "",
+            "url": f"https://youtube.com/watch?v=vid{i}",
+            "duration": 600,
+            "view_count": 1000,
+        }
+        for i, title in enumerate(titles)
+    ]
+    return youtube
+
+
+TITLES = [
+    "Python архитектура и паттерны",
+    "Python основы для начинающих",
+    "Python практика",
+]
+
+
+def test_generator_keeps_playlist_order(test_db):
+    youtube = _playlist_youtube(TITLES)
+
+    course = CourseGenerator(test_db, youtube=youtube).generate_course_from_playlist(
+        "https://www.youtube.com/playlist?list=PLcourse00001"
+    )
+
+    youtube.get_playlist_videos.assert_called_once()
+    assert youtube.get_playlist_videos.call_args.args[0] == "PLcourse00001"
+    assert course.title == "Курс по Python от автора"
+    assert course.sorting_method == "playlist"
+    lessons = course.modules[0].lessons
+    assert [lesson.title for lesson in lessons] == TITLES
+
+
+def test_generator_can_resort_playlist(test_db):
+    youtube = _playlist_youtube(TITLES)
+
+    course = CourseGenerator(test_db, youtube=youtube).generate_course_from_playlist(
+        "PLcourse00001", "beginner", resort=True
+    )
+
+    assert course.sorting_method == "smart"
+    titles = [lesson.title for lesson in course.modules[0].lessons]
+    assert titles != TITLES
+    assert sorted(titles) == sorted(TITLES)
+
+
+def test_generator_rejects_bad_playlist_url(test_db):
+    youtube = Mock()
+    with pytest.raises(ValueError):
+        CourseGenerator(test_db, youtube=youtube).generate_course_from_playlist(
+            "https://youtube.com/watch?v=dQw4w9WgXcQ"
+        )
+    youtube.get_playlist_videos.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_playlist_handler_validates_url():
+    from app.bot.handlers.courses import CourseCreation, process_playlist
+
+    message = AsyncMock()
+    state = AsyncMock()
+
+    message.text = "не ссылка"
+    await process_playlist(message, state)
+    state.set_state.assert_not_called()
+
+    message.text = "https://www.youtube.com/playlist?list=PLcourse00001"
+    await process_playlist(message, state)
+    state.update_data.assert_called_once_with(playlist_id="PLcourse00001")
+    state.set_state.assert_called_once_with(CourseCreation.waiting_for_playlist_order)
+
+
+@pytest.mark.asyncio
+async def test_playlist_order_sends_task():
+    callback = AsyncMock()
+    callback.data = "playlist_order_smart"
+    callback.from_user = Mock(id=1, username="u", first_name="U", last_name=None)
+    state = AsyncMock()
+    state.get_data.return_value = {"playlist_id": "PLcourse00001"}
+
+    with patch("app.bot.handlers.courses.get_db", return_value=iter([Mock()])), patch(
+        "app.bot.handlers.courses.get_or_create_user", return_value=Mock(id=7)
+    ), patch("app.bot.handlers.courses.generate_playlist_course_task") as task:
+        task.delay.return_value = Mock(id="task-123456789012")
+        from app.bot.handlers.courses import process_playlist_order
+
+        await process_playlist_order(callback, state)
+
+    task.delay.assert_called_once_with(playlist="PLcourse00001", user_id=7, resort=True)
+    state.clear.assert_called_once()
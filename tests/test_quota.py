@@ -0,0 +1,156 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.services.course_generator import CourseGenerator
+from app.services.quota import (
+    MinuteQuotaExceededError,
+    QuotaExceededError,
+    QuotaScheduler,
+    TokenBucket,
+)
+from app.services.youtube_service import YouTubeService
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_refills_over_time():
+    """Bucket пополняется равномерно"""
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=60, refill_per_second=1.0, clock=clock)
+
+    assert bucket.try_take(60) == 0
+    assert bucket.try_take(10) == pytest.approx(10.0)
+
+    clock.now += 10
+    assert bucket.try_take(10) == 0
+
+
+def test_daily_ledger_is_shared_and_refuses(session_factory):
+    """Дневной журнал общий для экземпляров и отказывает при нехватке"""
+    first = QuotaScheduler(session_factory, daily_limit=250, per_minute_limit=1000)
+    second = QuotaScheduler(session_factory, daily_limit=250, per_minute_limit=1000)
+
+    first.acquire("search.list")
+    second.acquire("search.list")
+    second.acquire("videos.list", calls=3)
+
+    assert first.remaining() == 47
+    with pytest.raises(QuotaExceededError) as exc_info:
+        first.acquire("search.list")
+    assert exc_info.value.retry_after > 0
+    assert not isinstance(exc_info.value, MinuteQuotaExceededError)
+    # Неудачная попытка ничего не списывает
+    assert second.remaining() == 47
+
+
+def test_minute_bucket_queues_short_waits(session_factory):
+    """Короткое ожидание поминутной квоты - ждем, длинное - отказываем"""
+    clock = FakeClock()
+    scheduler = QuotaScheduler(
+        session_factory,
+        daily_limit=10000,
+        per_minute_limit=120,
+        max_wait=60,
+        sleep=clock.sleep,
+        clock=clock,
+    )
+
+    scheduler.acquire("search.list")
+    scheduler.acquire("search.list")
+    assert clock.now == pytest.approx(40.0)
+
+    scheduler.max_wait = 1
+    with pytest.raises(MinuteQuotaExceededError):
+        scheduler.acquire("search.list")
+
+
+def test_search_videos_does_not_fall_back_to_mock(session_factory):
+    """Без квоты поиск падает с ошибкой, а не отдает моковые видео"""
+    quota = QuotaScheduler(session_factory, daily_limit=50, per_minute_limit=1000)
+    service = YouTubeService(quota=quota)
+    service.api_key = "test_key"
+    service.youtube = Mock()
+
+    with pytest.raises(QuotaExceededError):
+        service.search_videos("Python", max_results=5)
+    service.youtube.search.return_value.list.return_value.execute.assert_not_called()
+
+
+def test_generator_refuses_without_budget(session_factory, test_db):
+    """Генерация не начинается, если квоты не хватит на поиск"""
+    quota = QuotaScheduler(session_factory, daily_limit=100, per_minute_limit=1000)
+    service = YouTubeService(quota=quota)
+    service.api_key = "test_key"
+    service.youtube = Mock()
+
+    generator = CourseGenerator(test_db, youtube=service)
+
+    with pytest.raises(QuotaExceededError):
+        generator.generate_course("Python", "beginner")
+    service.youtube.search.assert_not_called()
+
+
+def test_search_cost_covers_every_page():
+    """Оценка постраничного поиска учитывает search.list каждой страницы"""
+    service = YouTubeService()
+
+    assert service.estimate_search_cost(25) == 101
+    assert service.estimate_search_cost(100, page_size=25) == 4 * 101
+
+
+def test_quota_task_returns_error_after_last_retry():
+    """После последнего повтора задача отдает ответ об ошибке, а не падает"""
+    from app.worker.tasks import QUOTA_MAX_RETRIES, _quota_exhausted
+
+    task = Mock()
+    task.request.retries = QUOTA_MAX_RETRIES
+    error = MinuteQuotaExceededError("minute", retry_after=30)
+
+    result = _quota_exhausted(task, error)
+
+    assert result["status"] == "error"
+    assert "на сегодня" not in result["error"]
+    task.retry.assert_not_called()
+
+
+def test_quota_task_reports_daily_limit():
+    """Дневной лимит не откладывается до утра: сразу ответ об исчерпанной квоте"""
+    from app.worker.tasks import _quota_exhausted
+
+    task = Mock()
+    task.request.retries = 0
+    error = QuotaExceededError("daily", retry_after=6 * 60 * 60)
+
+    result = _quota_exhausted(task, error)
+
+    assert result == {
+        "status": "error",
+        "error": "Квота YouTube API на сегодня исчерпана, попробуйте позже",
+    }
+    task.retry.assert_not_called()
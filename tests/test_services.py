@@ -50,7 +50,7 @@ def test_generate_course_with_mock(mock_youtube_service, test_db):
             "like_count": 150,
         },
     ]
-    mock_youtube.search_videos.return_value = mock_videos
+    mock_youtube.iter_search_videos.return_value = iter(mock_videos)
     mock_youtube_service.return_value = mock_youtube
 
     # 2. Создаём тестового пользователя
@@ -106,7 +106,7 @@ def test_build_search_query(test_db):
 def test_generate_course_no_videos(mock_youtube_service, test_db):
     """Тест: если нет видео - должна быть ошибка"""
     mock_youtube = Mock()
-    mock_youtube.search_videos.return_value = []
+    mock_youtube.iter_search_videos.return_value = iter([])
     mock_youtube_service.return_value = mock_youtube
 
     generator = CourseGenerator(test_db)
@@ -194,3 +194,291 @@ def test_parse_duration():
     for duration_str, expected in test_cases:
         result = service._parse_duration(duration_str)
         assert result == expected
+
+
+def _search_item(video_id):
+    return {
+        "id": {"videoId": video_id},
+        "snippet": {
+            "title": f"Video {video_id}",
+            "description": "Описание",
+            "channelTitle": "Канал",
+            "thumbnails": {"high": {"url": "thumb.jpg"}},
+            "publishedAt": "2023-01-01T00:00:00Z",
+        },
+    }
+
+
+def _details_item(video_id, views=1000):
+    return {
+        "id": video_id,
+        "contentDetails": {"duration": "PT10M"},
+        "statistics": {"viewCount": str(views), "likeCount": "10"},
+    }
+
+
+def test_search_videos_batches_details():
+    """Детали запрашиваются одним videos.list на страницу, а не по одному"""
+    ids = [f"vid{i}" for i in range(15)]
+
+    mock_youtube = Mock()
+    mock_youtube.search.return_value.list.return_value.execute.return_value = {
+        "items": [_search_item(video_id) for video_id in ids]
+    }
+    # API возвращает детали в произвольном порядке и без одного видео
+    mock_youtube.videos.return_value.list.return_value.execute.return_value = {
+        "items": [_details_item(video_id) for video_id in reversed(ids[1:])]
+    }
+
+    service = YouTubeService()
+    service.api_key = "test_key"
+    service.youtube = mock_youtube
+
+    videos = service.search_videos("Python", max_results=15)
+
+    assert mock_youtube.videos.return_value.list.call_count == 1
+    call_kwargs = mock_youtube.videos.return_value.list.call_args.kwargs
+    assert call_kwargs["id"] == ",".join(ids)
+
+    assert [v["id"] for v in videos] == ids
+    assert "duration" not in videos[0]
+    assert all(v["duration"] == 600 for v in videos[1:])
+
+
+def test_get_videos_details_splits_into_batches_of_50():
+    """Больше 50 ID разбиваются на несколько запросов, сбой пачки не ломает остальные"""
+    ids = [f"vid{i}" for i in range(120)]
+    calls = []
+
+    def fake_list(part, id):
+        batch = id.split(",")
+        calls.append(batch)
+        request = Mock()
+        if len(calls) == 2:
+            request.execute.side_effect = Exception("backend error")
+        else:
+            request.execute.return_value = {
+                "items": [_details_item(video_id) for video_id in batch]
+            }
+        return request
+
+    service = YouTubeService()
+    service.youtube = Mock()
+    service.youtube.videos.return_value.list.side_effect = fake_list
+
+    details = service._get_videos_details(ids)
+
+    assert [len(batch) for batch in calls] == [50, 50, 20]
+    assert set(details) == set(ids[:50] + ids[100:])
+    assert details["vid0"]["view_count"] == 1000
+
+
+@patch("app.services.youtube_service.build")
+def test_youtube_client_is_built_once_per_process(mock_build):
+    """discovery клиент собирается один раз и переиспользуется сервисами"""
+    from app.services import youtube_service
+
+    mock_build.return_value = Mock()
+    with patch.dict(youtube_service._youtube_clients, clear=True):
+        first = youtube_service.get_youtube_client("process_key")
+        second = youtube_service.get_youtube_client("process_key")
+
+    assert first is second
+    mock_build.assert_called_once()
+    assert mock_build.call_args.kwargs["static_discovery"] is True
+
+
+def test_youtube_services_share_client():
+    """Разные экземпляры сервиса используют один клиент"""
+    assert YouTubeService().youtube is YouTubeService().youtube
+
+
+def _paged_youtube(pages):
+    """Мок API: search.list отдает страницы по pageToken"""
+    mock_youtube = Mock()
+    search_calls = []
+
+    def fake_search(q, pageToken=None, **params):
+        index = int(pageToken or 0)
+        search_calls.append(index)
+        response = {"items": [_search_item(video_id) for video_id in pages[index]]}
+        if index + 1 < len(pages):
+            response["nextPageToken"] = str(index + 1)
+        request = Mock()
+        request.execute.return_value = response
+        return request
+
+    def fake_videos(part, id):
+        request = Mock()
+        request.execute.return_value = {
+            "items": [_details_item(video_id) for video_id in id.split(",")]
+        }
+        return request
+
+    mock_youtube.search.return_value.list.side_effect = fake_search
+    mock_youtube.videos.return_value.list.side_effect = fake_videos
+    return mock_youtube, search_calls
+
+
+def test_iter_search_videos_follows_page_tokens():
+    """Постраничный поиск идет по nextPageToken до max_results"""
+    pages = [[f"p{page}v{i}" for i in range(3)] for page in range(4)]
+    mock_youtube, search_calls = _paged_youtube(pages)
+
+    service = YouTubeService()
+    service.api_key = "test_key"
+    service.youtube = mock_youtube
+
+    videos = list(service.iter_search_videos("Python", max_results=7, page_size=3))
+
+    assert [v["id"] for v in videos] == pages[0] + pages[1] + pages[2][:1]
+    assert search_calls == [0, 1, 2]
+    assert all(v["duration"] == 600 for v in videos)
+
+
+def test_iter_search_videos_is_lazy():
+    """Следующая страница не запрашивается, пока не дочитана текущая"""
+    pages = [[f"p{page}v{i}" for i in range(3)] for page in range(4)]
+    mock_youtube, search_calls = _paged_youtube(pages)
+
+    service = YouTubeService()
+    service.api_key = "test_key"
+    service.youtube = mock_youtube
+
+    stream = service.iter_search_videos("Python", max_results=100, page_size=3)
+    first_page = [next(stream) for _ in range(3)]
+    stream.close()
+
+    assert [v["id"] for v in first_page] == pages[0]
+    assert search_calls == [0]
+
+
+def test_generator_stops_when_enough_candidates(test_db):
+    """Генератор перестает читать поиск, когда набрал кандидатов нужного уровня"""
+    consumed = []
+
+    def stream(*args, **kwargs):
+        for i in range(100):
+            consumed.append(i)
+            yield {
+                "id": f"vid{i}",
+                "title": f"Python основы для начинающих {i}",
+                "description": "",
+                "channel": "Канал",
+                "url": f"https://youtube.com/watch?v=vid{i}",
+                "thumbnail": "thumb.jpg",
+                "duration": 600,
+                "view_count": 5000,
+                "like_count": 100,
+            }
+
+    youtube = Mock()
+    youtube.iter_search_videos.side_effect = stream
+
+    generator = CourseGenerator(test_db, youtube=youtube)
+    course = generator.generate_course("Python", "beginner")
+
+    assert len(consumed) == 15
+    assert sum(len(module.lessons) for module in course.modules) == 15
+
+
+def test_generator_fetches_reputation_only_for_plausible_lessons(test_db):
+    """Репутация каналов запрашивается не для всего пула кандидатов"""
+    consumed = []
+
+    def stream(*args, **kwargs):
+        for i in range(100):
+            consumed.append(i)
+            video = {
+                "id": f"vid{i}",
+                "title": f"Python основы {i}" if i % 5 == 0 else f"Python разбор {i}",
+                "channel_id": f"UC{i}",
+                "url": f"https://youtube.com/watch?v=vid{i}",
+                "duration": [200, 600, 1200][i % 3],
+                "view_count": [10**6, 10**4][i % 2],
+            }
+            if i % 3 == 2:
+                # Длинные стримы без просмотров и не по теме
+                video.update(title=f"Стрим {i}", duration=7200, view_count=0)
+            yield video
+
+    youtube = Mock()
+    youtube.iter_search_videos.side_effect = stream
+    reputation = Mock()
+    prepared = []
+    reputation.scores.side_effect = lambda ids: prepared.extend(ids) or {}
+
+    generator = CourseGenerator(test_db, youtube=youtube, reputation=reputation)
+    course = generator.generate_course("Python", "beginner")
+
+    assert sum(len(module.lessons) for module in course.modules) == 15
+    assert len(consumed) > 50
+    hopeless = [i for i in consumed if i % 3 == 2]
+    assert 15 <= len(prepared) <= len(consumed) - len(hopeless)
+    assert not {f"UC{i}" for i in hopeless} & set(prepared)
+
+
+def test_search_many_merges_and_dedupes_concurrently():
+    """Подзапросы идут параллельно, выдачи сливаются по очереди без повторов"""
+    import time
+
+    results = {
+        "Python основы": ["a", "b", "shared"],
+        "Python практика": ["shared", "c"],
+        "Python продвинутый": ["d"],
+    }
+
+    def fake_search(q, **params):
+        request = Mock()
+
+        def execute(**kwargs):
+            time.sleep(0.2)
+            return {"items": [_search_item(video_id) for video_id in results[q]]}
+
+        request.execute.side_effect = execute
+        return request
+
+    mock_youtube = Mock()
+    mock_youtube.search.return_value.list.side_effect = fake_search
+    mock_youtube.videos.return_value.list.return_value.execute.return_value = {
+        "items": [_details_item(video_id) for video_id in "abcd"]
+    }
+
+    service = YouTubeService()
+    service.api_key = "test_key"
+    service.youtube = mock_youtube
+
+    started = time.perf_counter()
+    videos = service.search_many(list(results), max_results=10)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert [v["id"] for v in videos] == ["a", "shared", "d", "b", "c"]
+    assert mock_youtube.videos.return_value.list.call_count == 1
+    assert videos[0]["duration"] == 600
+    assert "duration" not in videos[1]
+
+
+def test_generate_course_fanout_mode(test_db):
+    """В режиме fanout генератор передает сортировщику один общий набор"""
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.search_many.return_value = [
+        {
+            "id": f"vid{i}",
+            "title": f"Python урок {i}",
+            "url": f"https://youtube.com/watch?v=vid{i}",
+            "duration": 600,
+            "view_count": 1000,
+        }
+        for i in range(6)
+    ]
+
+    generator = CourseGenerator(test_db, youtube=youtube)
+    course = generator.generate_course("Python", "beginner", search_mode="fanout")
+
+    queries = youtube.search_many.call_args.args[0]
+    assert len(queries) == 3
+    assert all(query.startswith("Python") for query in queries)
+    youtube.iter_search_videos.assert_not_called()
+    assert sum(len(module.lessons) for module in course.modules) == 6
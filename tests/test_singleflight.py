@@ -0,0 +1,224 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+class FakeRedis:
+    """Минимальный Redis в памяти: get / set (nx, px) / exists / delete"""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return fail
+
+
+def _run_threads(count, target):
+    results = [None] * count
+    threads = [
+        threading.Thread(target=lambda i=i: results.__setitem__(i, target()))
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    """Одновременные вызовы с одним ключом выполняют функцию один раз"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {"items": [1, 2, 3]}
+
+    leader = threading.Thread(target=lambda: flight.do("key", fn))
+    leader.start()
+    started.wait(2)
+
+    followers = []
+    results = []
+    for _ in range(4):
+        thread = threading.Thread(target=lambda: results.append(flight.do("key", fn)))
+        thread.start()
+        followers.append(thread)
+
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    for thread in followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"items": [1, 2, 3]}] * 4
+
+    # После завершения ключ свободен - следующий вызов снова идет в API
+    flight.do("key", fn)
+    assert len(calls) == 2
+
+
+def test_error_is_shared_with_waiters():
+    """Ошибка лидера получают все ждущие"""
+    flight = SingleFlight()
+    barrier = threading.Barrier(3)
+
+    def fn():
+        time.sleep(0.1)
+        raise RuntimeError("API error")
+
+    def call():
+        barrier.wait()
+        try:
+            flight.do("key", fn)
+        except RuntimeError as e:
+            return str(e)
+
+    assert _run_threads(3, call) == ["API error"] * 3
+
+
+def test_redis_follower_gets_leader_result():
+    """Второй воркер дожидается результата первого через Redis"""
+    redis = FakeRedis()
+    worker_a = SingleFlight(redis, poll_interval=0.01)
+    worker_b = SingleFlight(redis, poll_interval=0.01)
+    started = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append("a")
+        started.set()
+        time.sleep(0.1)
+        return {"videos": ["abc"]}
+
+    def follower_fn():
+        calls.append("b")
+        return {"videos": []}
+
+    thread = threading.Thread(target=lambda: worker_a.do("key", leader_fn))
+    thread.start()
+    started.wait(2)
+    result = worker_b.do("key", follower_fn)
+    thread.join()
+
+    assert result == {"videos": ["abc"]}
+    assert calls == ["a"]
+    assert not redis.exists("singleflight:lock:key")
+
+
+def test_redis_follower_runs_itself_when_leader_is_gone():
+    """Если блокировка пропала без результата - воркер выполняет запрос сам"""
+    redis = FakeRedis()
+    redis.set("singleflight:lock:key", "other-worker")
+    flight = SingleFlight(redis, poll_interval=0.01)
+
+    def release_lock():
+        time.sleep(0.05)
+        redis.delete("singleflight:lock:key")
+
+    threading.Thread(target=release_lock).start()
+    assert flight.do("key", lambda: "own") == "own"
+
+
+def test_broken_redis_falls_back_to_direct_call():
+    """Недоступный Redis не ломает запрос и временно отключается"""
+    flight = SingleFlight(BrokenRedis())
+    fn = MagicMock(return_value=42)
+
+    assert flight.do("key", fn) == 42
+    assert not flight._redis_available()
+    assert flight.do("key", fn) == 42
+    assert fn.call_count == 2
+
+
+def test_do_async_coalesces_coroutines():
+    """do_async: одинаковые корутины в одном цикле выполняются один раз"""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "page"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["page"] * 5
+    assert len(calls) == 1
+
+
+def test_youtube_service_coalesces_identical_searches():
+    """Одинаковые одновременные поиски делают один вызов search.list"""
+    with patch("app.services.youtube_service.get_youtube_client") as mock_build:
+        youtube = MagicMock()
+        mock_build.return_value = youtube
+        from app.services.youtube_service import YouTubeService
+
+        service = YouTubeService()
+        barrier = threading.Barrier(4)
+
+        def execute():
+            time.sleep(0.1)
+            return {"items": [], "nextPageToken": None}
+
+        youtube.search.return_value.list.return_value.execute.side_effect = execute
+
+        def search():
+            barrier.wait()
+            return service._search_page("python", {"maxResults": 25}, None)
+
+        results = _run_threads(4, search)
+
+    assert youtube.search.return_value.list.return_value.execute.call_count == 1
+    assert results == [([], None)] * 4
+
+
+@pytest.mark.parametrize("value", [True, False])
+def test_get_singleflight_uses_redis_setting(monkeypatch, value):
+    from app.core.config import settings
+    from app.services import singleflight
+
+    monkeypatch.setattr(settings, "YOUTUBE_SINGLEFLIGHT_REDIS", value)
+    monkeypatch.setattr(singleflight, "_singleflight", None)
+    flight = singleflight.get_singleflight()
+    assert (flight.redis is not None) is value
+    assert singleflight.get_singleflight() is flight
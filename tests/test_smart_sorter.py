@@ -0,0 +1,172 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import random
+
+import pytest
+
+from app.services.smart_sorter import SmartVideoSorter
+from benchmarks.fake_youtube import FakeYouTubeFixtures
+
+
+def _candidates(count, seed=7):
+    """Видео из заменителя API со случайными признаками, в том числе пограничными"""
+    rng = random.Random(seed)
+    fixtures = FakeYouTubeFixtures(synthetic_results=count // 3 + 1)
+    ids = []
+    for query in ("Python", "Python основы", "Python продвинутый уровень"):
+        ids.extend(fixtures.search(query))
+    videos = []
+    for video_id in ids[:count]:
+        video = {
+            "id": video_id,
+            "title": fixtures.videos[video_id]["snippet"]["title"],
+            "duration": rng.choice([0, 299, 300, 899, 900, 1800, rng.randint(1, 7200)]),
+            "view_count": rng.choice([0, 1000, 1001, 10000, 100000, 100001]),
+        }
+        if rng.random() < 0.5:
+            video["readability"] = rng.choice([0.3, 0.45, 0.6, 0.75, 0.9])
+        if rng.random() < 0.5:
+            video["channel_score"] = rng.random()
+        videos.append(video)
+    return videos
+
+
+@pytest.fixture
+def sorter():
+    return SmartVideoSorter()
+
+
+@pytest.mark.parametrize("difficulty", ["beginner", "intermediate", "advanced"])
+def test_vector_scores_match_scalar_formula(sorter, difficulty):
+    videos = _candidates(300)
+    scores = sorter.score_videos(videos, "Python основы", difficulty)
+
+    assert scores.tolist() == [
+        sorter._calculate_video_score(video, "Python основы", difficulty)
+        for video in videos
+    ]
+
+
+@pytest.mark.parametrize("difficulty", ["beginner", "advanced"])
+def test_vector_ordering_matches_previous_sort(sorter, difficulty):
+    """Порядок как у прежней сортировки списка пар (оценка, видео)"""
+    videos = _candidates(300)
+    expected = sorted(
+        videos,
+        key=lambda video: sorter._calculate_video_score(video, "Python", difficulty),
+    )
+    expected_ids = [video["id"] for video in expected]
+
+    best = sorted(
+        range(len(videos)),
+        key=lambda i: sorter._calculate_video_score(videos[i], "Python", difficulty),
+        reverse=True,
+    )
+    expected_best = [videos[i]["id"] for i in sorted(best[:40])]
+
+    assert [
+        video["id"] for video in sorter.select_best(videos, "Python", difficulty, 40)
+    ] == expected_best
+    assert [
+        video["id"] for video in sorter.sort_videos(videos, "Python", difficulty)
+    ] == expected_ids
+
+
+def test_empty_and_missing_fields(sorter):
+    assert sorter.score_videos([], "Python", "beginner").shape == (0,)
+    assert sorter.score_videos([{}], "Python", "beginner").tolist() == [
+        sorter._calculate_video_score({}, "Python", "beginner")
+    ]
+
+
+@pytest.mark.parametrize("limit", [1, 5, 40, 299, 300, 500])
+@pytest.mark.parametrize("chunk_size", [1, 7, 256])
+def test_select_top_matches_select_best(sorter, limit, chunk_size):
+    videos = _candidates(300, seed=limit)
+    expected = [
+        video["id"] for video in sorter.select_best(videos, "Python", "beginner", limit)
+    ]
+
+    selected = sorter.select_top(
+        iter(videos), "Python", "beginner", limit, chunk_size=chunk_size
+    )
+    assert [video["id"] for video in selected] == expected
+
+
+def test_select_top_skips_expensive_features_for_hopeless_videos(sorter, monkeypatch):
+    """Дорогие признаки считаются только для прошедших дешевый отбор"""
+    good = [
+        {"id": f"g{i}", "title": "Python основы", "duration": 100, "view_count": 10**6}
+        for i in range(5)
+    ]
+    # Длинные непопулярные видео не по теме не обгонят лучшие даже с идеальной сложностью
+    bad = [
+        {"id": f"b{i}", "title": f"Видео {i}", "duration": 7200, "view_count": 0}
+        for i in range(1000)
+    ]
+    prepared = []
+    analyzed = []
+    analyze_batch = sorter.analyzer.analyze_batch
+    monkeypatch.setattr(
+        sorter.analyzer,
+        "analyze_batch",
+        lambda texts, **kwargs: analyzed.extend(texts)
+        or analyze_batch(texts, **kwargs),
+    )
+
+    selected = sorter.select_top(
+        iter(good + bad), "Python", "beginner", 5, prepare=prepared.extend
+    )
+
+    assert [video["id"] for video in selected] == [f"g{i}" for i in range(5)]
+    # Полную оценку получают только лучшие по дешевой оценке
+    assert len(prepared) == len(analyzed) == 5
+
+
+def test_cluster_modules_follow_topics_and_keep_order(sorter):
+    topics = [
+        ("Docker контейнеры", "образы контейнеры docker"),
+        ("SQL запросы", "таблицы запросы индексы"),
+        ("Python функции", "функции аргументы python"),
+    ]
+    videos = [
+        {"id": f"{i}-{j}", "title": f"{title} урок {j}", "description": description}
+        for i, (title, description) in enumerate(topics)
+        for j in range(5)
+    ]
+
+    modules = sorter.group_into_modules(list(videos), module_size=5, mode="clusters")
+
+    assert [video for module in modules for video in module] == videos
+    assert [[video["id"][0] for video in module] for module in modules] == [
+        ["0"] * 5,
+        ["1"] * 5,
+        ["2"] * 5,
+    ]
+    assert "docker" in modules[0][0]["module_topic"].lower()
+    assert "запросы" in modules[1][0]["module_topic"].lower()
+    assert all(
+        video["module_topic"] == module[0]["module_topic"]
+        for module in modules
+        for video in module
+    )
+
+
+def test_cluster_modules_have_bounded_size(sorter):
+    videos = sorter.sort_videos(_candidates(120), "Python", "beginner")
+
+    modules = sorter.group_into_modules(videos, module_size=5, mode="clusters")
+
+    assert [video for module in modules for video in module] == videos
+    assert all(2 <= len(module) <= 15 for module in modules)
+
+
+def test_cluster_mode_falls_back_without_keywords(sorter):
+    videos = [{"title": f"#{i}"} for i in range(12)]
+
+    modules = sorter.group_into_modules(videos, module_size=5, mode="clusters")
+    assert [len(module) for module in modules] == [5, 5, 2]
+    assert sorter.group_into_modules(videos[:3], mode="clusters") == [videos[:3]]
@@ -0,0 +1,157 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from factories import UserFactory
+
+from app.crud.course import mark_course_opened
+from app.crud.video import get_videos_to_refresh
+from app.db.models import Course, Lesson, Module, UserCourse, Video
+from app.services.quota import QuotaExceededError
+from app.services.stats_refresh import VideoStatsRefresher
+
+DAY = 24 * 60 * 60
+
+
+def _course(db, user, video_ids, fetched_at, completed=False, opened_at=None):
+    """Курс с уроками по видео каталога и записью пользователя на него"""
+    course = Course(title="Курс", topic="Python", difficulty="beginner")
+    db.add(course)
+    db.flush()
+    module = Module(course_id=course.id, title="Модуль", order_index=1)
+    db.add(module)
+    db.flush()
+    for index, youtube_id in enumerate(video_ids):
+        video = db.query(Video).filter_by(youtube_id=youtube_id).first()
+        if video is None:
+            video = Video(
+                youtube_id=youtube_id, view_count=1, like_count=1, fetched_at=fetched_at
+            )
+            db.add(video)
+            db.flush()
+        db.add(Lesson(module_id=module.id, video_id=video.id, order_index=index))
+    db.add(
+        UserCourse(
+            user_id=user.id,
+            course_id=course.id,
+            completed=completed,
+            last_opened_at=opened_at,
+        )
+    )
+    db.commit()
+    return course
+
+
+def _youtube(remaining=10000):
+    youtube = Mock()
+    youtube.fetch_videos_details.side_effect = lambda ids: {
+        video_id: {"duration": 600, "view_count": 500, "like_count": 50}
+        for video_id in ids
+    }
+    youtube.quota.remaining.return_value = remaining
+    youtube.quota.cost.return_value = 1
+    return youtube
+
+
+def test_recently_opened_courses_go_first(test_db):
+    user = UserFactory()
+    old = datetime.now() - timedelta(days=3)
+    _course(test_db, user, ["never"], old)
+    _course(
+        test_db, user, ["long_ago"], old, opened_at=datetime.now() - timedelta(days=5)
+    )
+    _course(test_db, user, ["recent"], old, opened_at=datetime.now())
+    _course(test_db, user, ["done"], old, completed=True)
+    _course(test_db, user, ["fresh"], datetime.now(), opened_at=datetime.now())
+
+    videos = get_videos_to_refresh(test_db, DAY)
+
+    assert [video.youtube_id for video in videos] == ["recent", "long_ago", "never"]
+
+
+def test_mark_course_opened(test_db):
+    user = UserFactory()
+    course = _course(test_db, user, ["v1"], datetime.now())
+
+    mark_course_opened(test_db, user.id, course.id)
+
+    user_course = test_db.query(UserCourse).filter_by(course_id=course.id).one()
+    assert user_course.last_opened_at is not None
+
+
+def test_refresh_updates_in_batches_of_50(test_db):
+    user = UserFactory()
+    ids = [f"vid{i:03d}" for i in range(120)]
+    _course(test_db, user, ids, datetime.now() - timedelta(days=2))
+    youtube = _youtube()
+
+    report = VideoStatsRefresher(test_db, youtube=youtube, quota_reserve=0).refresh()
+
+    assert [
+        len(call.args[0]) for call in youtube.fetch_videos_details.call_args_list
+    ] == [
+        50,
+        50,
+        20,
+    ]
+    assert report["refreshed"] == 120
+    assert report["batches"] == 3
+    assert test_db.query(Video).filter(Video.view_count == 500).count() == 120
+    assert get_videos_to_refresh(test_db, DAY) == []
+
+
+def test_refresh_keeps_quota_reserve(test_db):
+    """Обновление не трогает квоту, оставленную для генерации курсов"""
+    user = UserFactory()
+    _course(test_db, user, ["v1", "v2"], datetime.now() - timedelta(days=2))
+    youtube = _youtube(remaining=100)
+
+    report = VideoStatsRefresher(test_db, youtube=youtube, quota_reserve=100).refresh()
+
+    assert report["stopped_by_quota"] is True
+    assert report["refreshed"] == 0
+    youtube.fetch_videos_details.assert_not_called()
+
+
+def test_stale_values_served_until_refresh_lands(test_db):
+    """Если квота кончилась посреди прохода, старые значения остаются на месте"""
+    user = UserFactory()
+    ids = [f"vid{i:03d}" for i in range(60)]
+    _course(test_db, user, ids, datetime.now() - timedelta(days=2))
+    youtube = _youtube()
+    first_batch = youtube.fetch_videos_details.side_effect
+    youtube.fetch_videos_details.side_effect = [
+        first_batch(ids[:50]),
+        QuotaExceededError("quota"),
+    ]
+
+    report = VideoStatsRefresher(test_db, youtube=youtube, quota_reserve=0).refresh()
+
+    assert report["refreshed"] == 50
+    assert report["stopped_by_quota"] is True
+    assert test_db.query(Video).filter(Video.view_count == 1).count() == 10
+
+
+def test_missing_videos_are_not_requested_again(test_db):
+    """Удаленные и закрытые видео (их нет в ответе videos.list) не запрашиваются снова"""
+    user = UserFactory()
+    _course(test_db, user, ["alive", "deleted"], datetime.now() - timedelta(days=2))
+    youtube = _youtube()
+    youtube.fetch_videos_details.side_effect = lambda ids: {
+        "alive": {"duration": 600, "view_count": 500, "like_count": 50}
+    }
+
+    report = VideoStatsRefresher(test_db, youtube=youtube, quota_reserve=0).refresh()
+
+    assert report["refreshed"] == 1
+    assert report["missing"] == 1
+    deleted = test_db.query(Video).filter_by(youtube_id="deleted").one()
+    assert deleted.view_count == 1
+    assert get_videos_to_refresh(test_db, DAY) == []
+
+    VideoStatsRefresher(test_db, youtube=youtube, quota_reserve=0).refresh()
+    assert youtube.fetch_videos_details.call_count == 1
@@ -0,0 +1,196 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gzip
+import threading
+import time
+from unittest.mock import MagicMock
+
+from app.services.course_generator import CourseGenerator
+from app.services.smart_sorter import SmartVideoSorter
+from app.services.transcripts import TranscriptFetcher, TranscriptStore
+
+
+class LocalTranscriptClient:
+    """Локальная замена youtube-transcript-api"""
+
+    def __init__(self, texts, delays=None):
+        self.texts = texts
+        self.delays = delays or {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, video_id):
+        with self.lock:
+            self.calls.append(video_id)
+        time.sleep(self.delays.get(video_id, 0))
+        if isinstance(self.texts.get(video_id), Exception):
+            raise self.texts[video_id]
+        return self.texts.get(video_id)
+
+
+def test_store_keeps_transcripts_compressed(tmp_path):
+    store = TranscriptStore(str(tmp_path))
+    text = "Простой текст. " * 200
+
+    assert store.get("abc123") is None
+    store.set("abc123", text)
+    assert store.get("abc123") == text
+
+    path = tmp_path / "ab" / "abc123.txt.gz"
+    assert path.stat().st_size < len(text.encode("utf-8")) / 10
+    assert gzip.decompress(path.read_bytes()).decode("utf-8") == text
+
+
+def test_fetch_many_uses_disk_cache(tmp_path):
+    """Второй раз субтитры (и их отсутствие) берутся с диска"""
+    client = LocalTranscriptClient({"v1": "Первый текст", "v2": None})
+    fetcher = TranscriptFetcher(client, TranscriptStore(str(tmp_path)), max_workers=2)
+
+    assert fetcher.fetch_many(["v1", "v2"]) == {"v1": "Первый текст"}
+    assert fetcher.fetch_many(["v1", "v2", "v1"]) == {"v1": "Первый текст"}
+    assert sorted(client.calls) == ["v1", "v2"]
+
+
+def test_fetch_errors_are_not_cached(tmp_path):
+    client = LocalTranscriptClient({"v1": ConnectionError("timeout")})
+    fetcher = TranscriptFetcher(client, TranscriptStore(str(tmp_path)))
+
+    assert fetcher.fetch_many(["v1"]) == {}
+    fetcher.fetch_many(["v1"])
+    assert client.calls == ["v1", "v1"]
+
+
+def test_budget_bounds_total_time(tmp_path):
+    """Медленные видео пропускаются, этап не выходит за бюджет"""
+    client = LocalTranscriptClient(
+        {"fast": "Быстрый текст", "slow": "Медленный текст"}, delays={"slow": 2}
+    )
+    fetcher = TranscriptFetcher(
+        client, TranscriptStore(str(tmp_path)), max_workers=2, budget=0.3
+    )
+
+    started = time.monotonic()
+    result = fetcher.fetch_many(["fast", "slow"])
+
+    assert time.monotonic() - started < 1
+    assert result == {"fast": "Быстрый текст"}
+
+
+def test_pool_is_bounded(tmp_path):
+    texts = {f"v{i}": "текст" for i in range(12)}
+    active = []
+    peak = []
+
+    class CountingClient(LocalTranscriptClient):
+        def fetch(self, video_id):
+            active.append(video_id)
+            peak.append(len(active))
+            time.sleep(0.02)
+            active.remove(video_id)
+            return super().fetch(video_id)
+
+    fetcher = TranscriptFetcher(
+        CountingClient(texts), TranscriptStore(str(tmp_path)), max_workers=3
+    )
+    assert len(fetcher.fetch_many(list(texts))) == 12
+    assert max(peak) <= 3
+
+
+def test_readability_refines_unknown_difficulty():
+    sorter = SmartVideoSorter()
+    video = {"title": "Python", "duration": 600}
+
+    assert sorter._estimate_difficulty(dict(video, readability=1.0), "Python") == (
+        "beginner"
+    )
+    assert sorter._estimate_difficulty(dict(video, readability=0.3), "Python") == (
+        "advanced"
+    )
+    # Без субтитров - прежние эвристики
+    assert sorter._estimate_difficulty(video, "Python") == "intermediate"
+
+
+def test_generator_feeds_transcripts_to_readability(test_db, tmp_path):
+    videos = [
+        {
+            "id": f"vid{i}",
+            "title": f"Python {i}",
+            "description": "",
+            "channel": "Канал",
+            "url": f"https://youtube.com/watch?v=vid{i}",
+            "thumbnail": "",
+            "published_at": "2024-01-01T00:00:00Z",
+            "duration": 600,
+            "view_count": 5000,
+            "like_count": 10,
+        }
+        for i in range(3)
+    ]
+    youtube = MagicMock()
+    youtube.iter_search_videos.return_value = iter(videos)
+    client = LocalTranscriptClient(
+        {"vid0": "Это просто. Это легко. Это просто.", "vid1": None}
+    )
+    fetcher = TranscriptFetcher(client, TranscriptStore(str(tmp_path)))
+
+    generator = CourseGenerator(test_db, youtube=youtube, transcripts=fetcher)
+    course = generator.generate_course("Python", "beginner")
+
+    assert sorted(client.calls) == ["vid0", "vid1", "vid2"]
+    assert videos[0][
+        "readability"
+    ] == generator.sorter.analyzer.calculate_readability_score(
+        "Это просто. Это легко. Это просто."
+    )
+    assert "readability" not in videos[1]
+    lessons = {
+        lesson.content_data["youtube_id"]: lesson
+        for module in course.modules
+        for lesson in module.lessons
+    }
+    assert lessons["vid0"].estimated_difficulty == "beginner"
+
+
+def test_transcripts_influence_lesson_selection(test_db, tmp_path, monkeypatch):
+    """Субтитры загружаются до выбора уроков и меняют, какие видео попадут в курс"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "COURSE_MAX_LESSONS", 1)
+    videos = [
+        {
+            "id": f"vid{i}",
+            "title": f"Python {i}",
+            "url": f"https://youtube.com/watch?v=vid{i}",
+            "duration": 600,
+            "view_count": 5000,
+        }
+        for i in range(2)
+    ]
+    youtube = MagicMock()
+    youtube.iter_search_videos.return_value = iter(videos)
+    # Без субтитров равные видео выбираются по порядку выдачи - первым был бы vid0
+    client = LocalTranscriptClient({"vid1": "Это просто. Это легко. Это просто."})
+    fetcher = TranscriptFetcher(client, TranscriptStore(str(tmp_path)))
+
+    course = CourseGenerator(
+        test_db, youtube=youtube, transcripts=fetcher
+    ).generate_course("Python", "beginner")
+
+    lessons = [lesson for module in course.modules for lesson in module.lessons]
+    assert [lesson.content_data["youtube_id"] for lesson in lessons] == ["vid1"]
+
+
+def test_fetch_many_budget_override(tmp_path):
+    store = TranscriptStore(str(tmp_path))
+    store.set("cached", "Текст с диска.")
+    client = LocalTranscriptClient({"new": "Новый текст."})
+    fetcher = TranscriptFetcher(client, store, budget=10)
+
+    # Бюджет исчерпан: только то, что уже лежит на диске
+    assert fetcher.fetch_many(["cached", "new"], budget=0) == {
+        "cached": "Текст с диска."
+    }
+    assert client.calls == []
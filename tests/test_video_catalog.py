@@ -0,0 +1,163 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.crud.video import get_fresh_video_details, upsert_videos
+from app.db.database import add_missing_columns
+from app.db.models import Lesson, Video
+from app.services.course_generator import CourseGenerator
+
+
+def _video(video_id, views=5000):
+    return {
+        "id": video_id,
+        "title": f"Python основы {video_id}",
+        "description": "Описание",
+        "channel": "Учебный канал",
+        "url": f"https://youtube.com/watch?v={video_id}",
+        "thumbnail": "thumb.jpg",
+        "duration": 600,
+        "view_count": views,
+        "like_count": 100,
+    }
+
+
+def test_courses_share_catalog_rows(test_db):
+    """Одно видео в двух курсах хранится в каталоге один раз"""
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.iter_search_videos.side_effect = lambda *args, **kwargs: [
+        _video("shared"),
+        _video("other"),
+    ]
+
+    generator = CourseGenerator(test_db, youtube=youtube)
+    generator.generate_course("Python", "beginner")
+    generator.generate_course("Python", "advanced")
+
+    assert test_db.query(Video).count() == 2
+    shared = test_db.query(Video).filter_by(youtube_id="shared").one()
+    assert len(shared.lessons) == 2
+    assert shared.lessons[0].content_data == {"youtube_id": "shared"}
+
+
+def test_generator_passes_catalog_lookup(test_db):
+    """Генератор отдает сервису детали из каталога, чтобы не запрашивать их снова"""
+    upsert_videos(test_db, [_video("known", views=777)], fetched=True)
+    test_db.commit()
+
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.iter_search_videos.return_value = iter([_video("known")])
+
+    CourseGenerator(test_db, youtube=youtube).generate_course("Python", "beginner")
+
+    lookup = youtube.iter_search_videos.call_args.kwargs["known_details"]
+    assert lookup(["known", "unknown"]) == {
+        "known": {"duration": 600, "view_count": 5000, "like_count": 100}
+    }
+
+
+def test_catalog_hit_keeps_fetched_at(test_db):
+    """Детали из каталога не молодеют, когда курс сохраняет их обратно"""
+    upsert_videos(test_db, [_video("known", views=10)])
+    fetched_at = datetime.now() - timedelta(hours=23)
+    test_db.query(Video).update({"fetched_at": fetched_at})
+    test_db.commit()
+
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.iter_search_videos.side_effect = lambda *args, **kwargs: [
+        dict(_video("known", views=10), **kwargs["known_details"](["known"])["known"])
+    ]
+
+    CourseGenerator(test_db, youtube=youtube).generate_course("Python", "beginner")
+
+    video = test_db.query(Video).filter_by(youtube_id="known").one()
+    assert video.view_count == 10
+    assert video.fetched_at == fetched_at
+
+
+def test_refetched_stale_row_is_served_from_catalog(test_db):
+    """Устаревшее видео, заново запрошенное в videos.list, снова свежее в каталоге"""
+    upsert_videos(test_db, [_video("stale", views=10)])
+    test_db.query(Video).update({"fetched_at": datetime.now() - timedelta(days=2)})
+    test_db.commit()
+
+    refetched = []
+
+    def search(*args, **kwargs):
+        known = kwargs["known_details"](["stale"])
+        if "stale" in known:
+            return [dict(_video("stale", views=10), **known["stale"])]
+        # Как YouTubeService: о деталях из videos.list сообщает on_fetched
+        refetched.append("stale")
+        kwargs["on_fetched"](["stale"])
+        return [_video("stale", views=20)]
+
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.iter_search_videos.side_effect = search
+
+    generator = CourseGenerator(test_db, youtube=youtube)
+    generator.generate_course("Python", "beginner")
+    generator.generate_course("Python", "advanced")
+
+    assert refetched == ["stale"]
+    video = test_db.query(Video).filter_by(youtube_id="stale").one()
+    assert video.view_count == 20
+    assert video.fetched_at > datetime.now() - timedelta(minutes=1)
+
+
+def test_fetched_details_renew_fetched_at(test_db):
+    upsert_videos(test_db, [_video("vid")])
+    test_db.query(Video).update({"fetched_at": datetime.now() - timedelta(days=2)})
+
+    upsert_videos(test_db, [_video("vid", views=1)], fetched=True)
+
+    assert get_fresh_video_details(test_db, ["vid"], max_age_seconds=60)
+
+
+def test_cached_details_insert_without_fetched_at(test_db):
+    """Новое видео с деталями из кэша YouTube не считается свежим"""
+    youtube = Mock()
+    youtube.estimate_search_cost.return_value = 0
+    youtube.iter_search_videos.side_effect = lambda *args, **kwargs: [_video("cached")]
+
+    CourseGenerator(test_db, youtube=youtube).generate_course("Python", "beginner")
+
+    video = test_db.query(Video).filter_by(youtube_id="cached").one()
+    assert video.view_count == 5000
+    assert video.fetched_at is None
+    assert get_fresh_video_details(test_db, ["cached"], max_age_seconds=60) == {}
+
+
+def test_stale_catalog_entries_are_not_reused(test_db):
+    """Устаревшие детали каталога запрашиваются заново"""
+    upsert_videos(test_db, [_video("vid")], fetched=True)
+    test_db.commit()
+
+    assert get_fresh_video_details(test_db, ["vid"], max_age_seconds=60)
+    test_db.query(Video).update({"fetched_at": datetime.now() - timedelta(hours=1)})
+    assert get_fresh_video_details(test_db, ["vid"], max_age_seconds=60) == {}
+
+
+def test_add_missing_columns_upgrades_old_schema():
+    """Старая таблица lessons получает колонку video_id"""
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(
+            text("CREATE TABLE lessons (id INTEGER PRIMARY KEY, title VARCHAR)")
+        )
+
+    add_missing_columns(engine)
+
+    columns = {c["name"] for c in inspect(engine).get_columns("lessons")}
+    assert "video_id" in columns
+    assert set(Lesson.__table__.columns.keys()) <= columns
@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import pickle
+
+import pytest
+
+from app.services.video_record import VideoRecord, as_records, field_values
+
+SNIPPET = {
+    "id": "abc",
+    "title": "Python для начинающих",
+    "description": "Первый урок",
+    "channel": "Учебный канал",
+    "url": "https://youtube.com/watch?v=abc",
+}
+
+
+def test_record_keeps_dict_contract():
+    record = VideoRecord(SNIPPET, duration=600)
+
+    assert record == dict(SNIPPET, duration=600)
+    assert dict(SNIPPET, duration=600) == record
+    assert record["title"] == "Python для начинающих"
+    assert record.title == "Python для начинающих"
+    assert "duration" in record and "view_count" not in record
+    assert record.get("view_count", 0) == 0
+    with pytest.raises(KeyError):
+        record["view_count"]
+    assert len(record) == 6
+    assert list(record) == ["id", "title", "description", "channel", "url", "duration"]
+
+    record.update({"view_count": 10, "like_count": 1})
+    record["estimated_difficulty"] = "beginner"
+    del record["like_count"]
+    assert "like_count" not in record
+    with pytest.raises(KeyError):
+        del record["like_count"]
+    assert record.to_dict()["view_count"] == 10
+    assert json.loads(json.dumps(record.to_dict()))["estimated_difficulty"] == (
+        "beginner"
+    )
+
+
+def test_unknown_fields_are_kept():
+    record = VideoRecord(SNIPPET, source="fanout")
+
+    assert record["source"] == "fanout"
+    assert record.get("missing") is None
+    assert "source" in record
+    assert list(record)[-1] == "source"
+    # Методы словаря не выдаются за поля
+    assert "items" not in record and record.get("items") is None
+
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record and copy is not record
+    assert record.copy() == record
+
+
+def test_record_has_no_instance_dict():
+    # Кандидат после деталей videos.list и разметки сортировщика
+    data = dict(
+        SNIPPET,
+        channel_id="UC1",
+        thumbnail="",
+        published_at="2024-01-01T00:00:00Z",
+        duration=600,
+        view_count=10,
+        like_count=1,
+        order=1,
+        estimated_difficulty="beginner",
+        module_topic="Python",
+    )
+    record = VideoRecord(data)
+
+    assert not hasattr(record, "__dict__")
+    assert sys.getsizeof(record) < sys.getsizeof(data) / 2
+
+
+def test_as_records_and_field_values():
+    record = VideoRecord(SNIPPET, view_count=5)
+    records = as_records([record, dict(SNIPPET)])
+
+    assert records[0] is record
+    assert type(records[1]) is VideoRecord
+    mixed = [record, {"title": "Docker"}]
+    assert field_values(mixed, "title") == ["Python для начинающих", "Docker"]
+    assert field_values(mixed, "view_count", 0) == [5, 0]
+    assert field_values(mixed, "source", "search") == ["search", "search"]
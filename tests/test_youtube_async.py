@@ -0,0 +1,136 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.youtube_async import AsyncYouTubeClient, YouTubeAPIError, run_sync
+from app.services.youtube_service import YouTubeService
+
+
+def _make_app(state):
+    async def search(request):
+        state["search_calls"] += 1
+        ids = [f"vid{i}" for i in range(int(request.query["maxResults"]))]
+        items = [
+            {
+                "id": {"videoId": video_id},
+                "snippet": {
+                    "title": f"Видео {video_id}",
+                    "description": "Описание",
+                    "channelTitle": "Канал",
+                    "thumbnails": {"high": {"url": "thumb.jpg"}},
+                    "publishedAt": "2023-01-01T00:00:00Z",
+                },
+            }
+            for video_id in ids
+        ]
+        return web.json_response({"items": items})
+
+    async def videos(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.02)
+        state["in_flight"] -= 1
+
+        ids = request.query["id"].split(",")
+        state["batches"].append(len(ids))
+        if state.get("fail_batch") == len(state["batches"]):
+            return web.json_response(
+                {"error": {"errors": [{"reason": "backendError"}]}}, status=500
+            )
+        items = [
+            {
+                "id": video_id,
+                "contentDetails": {"duration": "PT2M"},
+                "statistics": {"viewCount": "42", "likeCount": "7"},
+            }
+            for video_id in reversed(ids)
+        ]
+        return web.json_response({"items": items})
+
+    async def forbidden(request):
+        return web.json_response(
+            {"error": {"message": "quota", "errors": [{"reason": "quotaExceeded"}]}},
+            status=403,
+        )
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    app.router.add_get("/videos", videos)
+    app.router.add_get("/channels", forbidden)
+    return app
+
+
+def _state():
+    return {"search_calls": 0, "batches": [], "in_flight": 0, "max_in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_videos_batches_run_concurrently_with_cap():
+    """Пачки videos.list идут параллельно, но не больше лимита"""
+    state = _state()
+    server = TestServer(_make_app(state))
+    await server.start_server()
+    client = AsyncYouTubeClient(
+        "key", base_url=str(server.make_url("")), max_concurrency=2
+    )
+    try:
+        items = await client.videos([f"vid{i}" for i in range(180)])
+    finally:
+        await client.close()
+        await server.close()
+
+    assert state["batches"] == [50, 50, 50, 30]
+    assert state["max_in_flight"] == 2
+    assert len(items) == 180
+
+
+@pytest.mark.asyncio
+async def test_api_error_is_raised_with_reason():
+    """Ошибка API превращается в YouTubeAPIError с причиной"""
+    server = TestServer(_make_app(_state()))
+    await server.start_server()
+    client = AsyncYouTubeClient("key", base_url=str(server.make_url("")))
+    try:
+        with pytest.raises(YouTubeAPIError) as exc_info:
+            await client.request("channels", part="statistics", id="chan")
+    finally:
+        await client.close()
+        await server.close()
+
+    assert exc_info.value.status == 403
+    assert exc_info.value.reason == "quotaExceeded"
+
+
+def test_search_videos_async_keeps_contract():
+    """search_videos через aiohttp возвращает те же словари, что и синхронный путь"""
+    state = _state()
+    state["fail_batch"] = 2
+
+    async def scenario():
+        server = TestServer(_make_app(state))
+        await server.start_server()
+        client = AsyncYouTubeClient("key", base_url=str(server.make_url("")))
+        service = YouTubeService()
+        service.api_key = "key"
+        service.async_client = client
+        try:
+            return await service.search_videos_async("Python", max_results=60)
+        finally:
+            await client.close()
+            await server.close()
+
+    videos = run_sync(scenario())
+
+    assert [v["id"] for v in videos] == [f"vid{i}" for i in range(60)]
+    assert videos[0]["duration"] == 120
+    assert videos[0]["view_count"] == 42
+    assert videos[0]["url"] == "https://youtube.com/watch?v=vid0"
+    # Вторая пачка упала - у ее видео нет деталей, но они остались в выдаче
+    assert "duration" not in videos[55]
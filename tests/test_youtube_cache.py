@@ -0,0 +1,116 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.models import YouTubeCacheEntry
+from app.services.youtube_cache import YouTubeCache
+from app.services.youtube_service import YouTubeService
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(engine)
+
+
+def test_search_roundtrip_keeps_order(session_factory):
+    """Результаты поиска возвращаются в исходном порядке"""
+    cache = YouTubeCache(session_factory)
+    params = {"maxResults": 3}
+    snippets = [{"id": "b"}, {"id": "a"}, {"id": "c"}]
+
+    assert cache.get_search("python", params) is None
+    cache.set_search("python", params, snippets)
+
+    assert cache.get_search("python", params) == snippets
+    assert cache.get_search("python", {"maxResults": 5}) is None
+
+
+def test_expired_entries_are_misses(session_factory):
+    """Просроченная запись считается промахом"""
+    cache = YouTubeCache(session_factory)
+    cache.set_videos({"vid1": {"duration": 60}})
+
+    db = session_factory()
+    db.query(YouTubeCacheEntry).update(
+        {"expires_at": datetime.now() - timedelta(seconds=1)}
+    )
+    db.commit()
+    db.close()
+
+    assert cache.get_videos(["vid1"]) == {}
+
+
+def test_eviction_keeps_recently_used(session_factory):
+    """При переполнении удаляются давно не использованные записи"""
+    cache = YouTubeCache(session_factory, max_entries=2)
+    cache.set_videos({"vid1": {"duration": 1}})
+    cache.set_videos({"vid2": {"duration": 2}})
+    cache.get_videos(["vid1"])
+    cache.set_videos({"vid3": {"duration": 3}})
+
+    assert set(cache.get_videos(["vid1", "vid2", "vid3"])) == {"vid1", "vid3"}
+
+
+def test_stats_are_persisted(session_factory):
+    """Счетчики хранятся в БД и видны новому экземпляру кэша"""
+    cache = YouTubeCache(session_factory)
+    cache.set_videos({"vid1": {"duration": 1}})
+    cache.get_videos(["vid1", "vid2"])
+    cache.get_search("python", {})
+
+    stats = YouTubeCache(session_factory).get_stats()
+
+    assert stats["video"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert stats["search"]["misses"] == 1
+
+
+def test_service_uses_cache(session_factory):
+    """Повторный поиск не обращается к API"""
+    mock_youtube = Mock()
+    mock_youtube.search.return_value.list.return_value.execute.return_value = {
+        "items": [
+            {
+                "id": {"videoId": "vid1"},
+                "snippet": {
+                    "title": "Python основы",
+                    "description": "Описание",
+                    "channelTitle": "Канал",
+                    "thumbnails": {"high": {"url": "thumb.jpg"}},
+                    "publishedAt": "2023-01-01T00:00:00Z",
+                },
+            }
+        ]
+    }
+    mock_youtube.videos.return_value.list.return_value.execute.return_value = {
+        "items": [
+            {
+                "id": "vid1",
+                "contentDetails": {"duration": "PT5M"},
+                "statistics": {"viewCount": "10", "likeCount": "1"},
+            }
+        ]
+    }
+
+    service = YouTubeService(cache=YouTubeCache(session_factory))
+    service.api_key = "test_key"
+    service.youtube = mock_youtube
+
+    first = service.search_videos("Python", max_results=5)
+    second = service.search_videos("Python", max_results=5)
+
+    assert first == second
+    assert second[0]["duration"] == 300
+    assert mock_youtube.search.return_value.list.call_count == 1
+    assert mock_youtube.videos.return_value.list.call_count == 1